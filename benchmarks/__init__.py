@@ -0,0 +1,11 @@
+"""
+Mikrobenchmarklar: python -m benchmarks.<nom>
+
+config.py import paytida BOT_TOKEN talab qiladi - bu yerda sinov qiymati beriladi,
+ma'lumotlar (jadvallar, SQLite) vaqtinchalik papkaga yoziladi.
+"""
+import os
+import tempfile
+
+os.environ.setdefault('BOT_TOKEN', '123456:BENCH')
+os.environ.setdefault('DATA_DIR', tempfile.mkdtemp(prefix='taqvim-bench-'))
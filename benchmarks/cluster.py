@@ -0,0 +1,70 @@
+"""
+Klaster: Dispatcher -> 1 / 2 / 4 / 8 worker jarayon, update/s.
+Worker o'rnida CPU ga og'ir stand-in handler: har update uchun bir oylik namoz
+vaqtlari hisoblanadi (Telegram API siz - faqat taqsimlash va jarayonlar masshtabi).
+Bo'sh handler bilan - dispatcher (bitta jarayon) o'tkazish qobiliyatining shifti.
+
+    python -m benchmarks.cluster [update_soni]
+"""
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+from utils.cluster import Dispatcher
+
+UPDATE_SONI = 4000
+WORKERLAR = (1, 2, 4, 8)
+LAT, LON = 41.2995, 69.2401
+
+
+def stand_in_worker(index, updates, tayyor, kunlar):
+    """Worker o'rnida: update -> `kunlar` kunlik calculate_prayer_times"""
+    from utils.prayer_calc import calculate_prayer_times
+
+    boshi = date(2026, 1, 1)
+    tayyor.put(index)
+    while True:
+        raw = updates.get()
+        if raw is None:
+            return
+        kun = raw["update_id"] % 300
+        for i in range(kunlar):
+            calculate_prayer_times(LAT, LON, boshi + timedelta(days=kun + i))
+
+
+def update(n):
+    return {"update_id": n, "message": {"message_id": n, "from": {"id": 1000 + n % 997}, "text": "/start"}}
+
+
+async def olchash(workers: int, soni: int, kunlar: int) -> float:
+    tayyor = multiprocessing.get_context("spawn").Queue()
+    dispatcher = Dispatcher(workers, target=stand_in_worker, args=(tayyor, kunlar))
+    dispatcher.start()
+    loop = asyncio.get_running_loop()
+    for _ in range(workers):
+        await loop.run_in_executor(None, tayyor.get)  # jarayonlar ishga tushishi hisoblanmaydi
+
+    boshlandi = time.perf_counter()
+    for n in range(soni):
+        await dispatcher.route(update(n))
+    await dispatcher.close()  # workerlar navbatini bajarib yopilguncha
+    return soni / (time.perf_counter() - boshlandi)
+
+
+def main():
+    soni = int(sys.argv[1]) if len(sys.argv) > 1 else UPDATE_SONI
+    print(f"CPU: {os.cpu_count()}, update: {soni}")
+    for nom, kunlar in (("30 kun hisob", 30), ("bo'sh handler", 0)):
+        print(f"\n{nom}\n{'workers':>8} {'update/s':>10} {'tezlashish':>10}")
+        asosiy = None
+        for workers in WORKERLAR:
+            tezlik = asyncio.run(olchash(workers, soni, kunlar))
+            asosiy = asosiy or tezlik
+            print(f"{workers:>8} {tezlik:10.0f} {tezlik / asosiy:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
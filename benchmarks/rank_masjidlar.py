@@ -0,0 +1,49 @@
+"""
+rank_masjidlar (kichik ro'yxat - Python, katta - NumPy argpartition) va oldingi skalyar usul (calculate_distance + to'liq saralash):
+10 / 1 000 / 100 000 nomzod.
+
+    python -m benchmarks.rank_masjidlar
+"""
+import random
+import time
+
+from utils.mosque_finder import MASJIDLAR_SONI, calculate_distance, rank_masjidlar
+
+LAT, LON = 41.2995, 69.2401
+
+
+def skalyar(lat, lon, masjidlar, k):
+    """Oldingi usul: har biriga calculate_distance, keyin sorted"""
+    natija = [{**m, "distance": round(calculate_distance(lat, lon, m["lat"], m["lon"]))} for m in masjidlar]
+    return sorted(natija, key=lambda m: m["distance"])[:k]
+
+
+def nomzodlar(n):
+    rng = random.Random(n)
+    return [
+        {"name": f"Masjid {i}", "lat": LAT + rng.uniform(-0.1, 0.1), "lon": LON + rng.uniform(-0.1, 0.1), "address": ""}
+        for i in range(n)
+    ]
+
+
+def olchash(fn, masjidlar):
+    takror = max(1, 200_000 // len(masjidlar))
+    boshlandi = time.perf_counter()
+    for _ in range(takror):
+        natija = fn(LAT, LON, masjidlar, k=MASJIDLAR_SONI)
+    return (time.perf_counter() - boshlandi) / takror, natija
+
+
+def main():
+    print(f"{'n':>8} {'skalyar':>12} {'rank':>12} {'tezlashish':>10}")
+    for n in (10, 1_000, 100_000):
+        masjidlar = nomzodlar(n)
+        t_skalyar, eski = olchash(skalyar, masjidlar)
+        t_rank, yangi = olchash(rank_masjidlar, masjidlar)
+        # Natijalar bir xil (masofa teng bo'lsa tartib farq qilishi mumkin)
+        assert [m["distance"] for m in eski] == [m["distance"] for m in yangi]
+        print(f"{n:>8} {t_skalyar * 1e6:10.1f}µs {t_rank * 1e6:10.1f}µs {t_skalyar / t_rank:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
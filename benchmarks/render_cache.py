@@ -0,0 +1,69 @@
+"""
+render_cache: sovuq (birinchi) va iliq (keshdan) render() - vaqt va xotira ajratish (tracemalloc).
+Vaqt tracemalloc yoqilgan holda o'lchanadi - faqat o'zaro taqqoslash uchun.
+Taqqoslash uchun keshsiz yo'l: har safar ma'lumot + formatlash + tugmalar.
+
+    python -m benchmarks.render_cache
+"""
+import asyncio
+import time
+import tracemalloc
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from utils import render_cache
+from utils.prayer_times import VILOYATLAR
+
+SO_ROVLAR = [(kind, viloyat, lang) for kind in render_cache.RENDERERS for viloyat in VILOYATLAR for lang in render_cache.TILLAR]
+
+
+async def keshsiz(kind, viloyat, lang):
+    """Kesh bo'lmaganda har bosishda bajariladigan ish"""
+    get_data, format_data = render_cache.RENDERERS[kind]
+    result = await get_data(viloyat, None)
+    menyu = render_cache.CALLBACKS[kind][1]
+    markup = InlineKeyboardMarkup([
+        [InlineKeyboardButton("🔄 Qaytadan", callback_data=menyu)],
+        [InlineKeyboardButton("🔙 Viloyatlar", callback_data=menyu)],
+        [InlineKeyboardButton("🔙 Asosiy menyu", callback_data="back_to_menu")]
+    ])
+    return format_data(result, lang), markup
+
+
+async def render(kind, viloyat, lang):
+    return await render_cache.render(kind, viloyat, lang)
+
+
+async def olchash(nom, fn, takror):
+    """Har chaqiruvdagi vaqtinchalik xotira cho'qqisi (tracemalloc peak) va qolgan xotira"""
+    tracemalloc.start()
+    n = 0
+    jami_peak = 0
+    boshida, _ = tracemalloc.get_traced_memory()
+    boshlandi = time.perf_counter()
+    for _ in range(takror):
+        for so_rov in SO_ROVLAR:
+            hozir, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await fn(*so_rov)
+            jami_peak += tracemalloc.get_traced_memory()[1] - hozir
+            n += 1
+    vaqt = time.perf_counter() - boshlandi
+    qolgan = tracemalloc.get_traced_memory()[0] - boshida
+    tracemalloc.stop()
+    print(f"{nom:<8} {n:>6} ta  {vaqt / n * 1e6:8.1f} µs  "
+          f"ajratish (peak) {jami_peak / n:8.1f} B  qolgan {qolgan / n:8.1f} B  (chaqiruv boshiga)")
+
+
+async def main():
+    # Jadval va matnlar tayyor bo'lsin (birinchi ochilish vaqti o'lchanmaydi)
+    await keshsiz(*SO_ROVLAR[0])
+
+    await olchash("keshsiz", keshsiz, 20)
+    await olchash("sovuq", render, 1)
+    await olchash("iliq", render, 20)
+    print(render_cache.get_stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""
+Skaner rejimi: 12 MP hujjat rasmi uchun to_bilevel vaqti va xotira cho'qqisi (tracemalloc),
+oldingi (int64 integral, to'liq kadr nusxalari) adaptive_threshold bilan taqqoslash.
+Bir xil rasmdan rangli (add_image) va skaner (add_scan) PDF hajmi.
+
+    python -m benchmarks.scan
+"""
+import io
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from utils.pdf import PdfWriter
+from utils.scan import SCAN_FARQ, adaptive_threshold, prepare_gray, to_bilevel
+
+
+def oldingi_threshold(gray, oyna=None, farq=SCAN_FARQ):
+    """user-018 dagi birinchi variant (taqqoslash uchun)"""
+    height, width = gray.shape
+    oyna = oyna or max(8, width // 16)
+    r = oyna // 2
+    integral = np.zeros((height + 1, width + 1), dtype=np.int64)
+    np.cumsum(gray, axis=0, dtype=np.int64, out=integral[1:, 1:])
+    np.cumsum(integral[1:, 1:], axis=1, out=integral[1:, 1:])
+    y0 = np.clip(np.arange(height) - r, 0, height)
+    y1 = np.clip(np.arange(height) + r + 1, 0, height)
+    x0 = np.clip(np.arange(width) - r, 0, width)
+    x1 = np.clip(np.arange(width) + r + 1, 0, width)
+    yig = integral[y1][:, x1]
+    yig -= integral[y0][:, x1]
+    yig -= integral[y1][:, x0]
+    yig += integral[y0][:, x0]
+    soni = (y1 - y0)[:, None] * (x1 - x0)[None, :]
+    return gray.astype(np.int64) * soni * 100 > yig * (100 - farq)
+
+
+def hujjat_rasmi(width=4000, height=3000) -> bytes:
+    """Telefon rasmiga o'xshash 12 MP JPEG: soyali fon, harf o'lchamidagi belgilar, sensor shovqini"""
+    rng = np.random.default_rng(18)
+    fon = np.linspace(150, 230, width, dtype=np.uint8)[None, :].repeat(height, axis=0)
+    image = Image.fromarray(fon, "L")
+    draw = ImageDraw.Draw(image)
+    for y in range(200, height - 200, 60):
+        x = 200
+        while x < width - 300:
+            harf = int(rng.integers(14, 30))
+            draw.rectangle((x, y + int(rng.integers(0, 8)), x + harf, y + 30), fill=int(rng.integers(20, 70)))
+            x += harf + int(rng.integers(6, 14)) + (40 if rng.random() < 0.15 else 0)
+    shovqin = rng.normal(0, 6, (height, width))
+    piksel = np.clip(np.asarray(image, dtype=np.float32) + shovqin, 0, 255).astype(np.uint8)
+    f = io.BytesIO()
+    Image.fromarray(piksel, "L").convert("RGB").save(f, "JPEG", quality=90)
+    return f.getvalue()
+
+
+def olchash(nom, fn):
+    tracemalloc.start()
+    boshlandi = time.perf_counter()
+    natija = fn()
+    vaqt = time.perf_counter() - boshlandi
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{nom:<26} {vaqt * 1000:8.1f} ms   peak {peak / 2 ** 20:7.1f} MB")
+    return natija
+
+
+def main():
+    jpeg = hujjat_rasmi()
+    with Image.open(io.BytesIO(jpeg)) as image:
+        gray = prepare_gray(image)
+    print(f"kulrang: {gray.shape[1]}x{gray.shape[0]}")
+
+    eski = olchash("oldingi threshold (int64)", lambda: oldingi_threshold(gray))
+    yangi = olchash("adaptive_threshold", lambda: adaptive_threshold(gray))
+    assert np.array_equal(eski, yangi)
+
+    def butun():
+        with Image.open(io.BytesIO(jpeg)) as image:
+            return to_bilevel(image)
+
+    width, height, bits = olchash("to_bilevel (12 MP JPEG)", butun)
+    print(f"natija: {width}x{height}, {len(bits) / 1024:.0f} KB 1-bit")
+
+    hajmlar = {}
+    for nom in ("add_image", "add_scan"):
+        out = io.BytesIO()
+        writer = PdfWriter(out)
+        getattr(writer, nom)(jpeg)
+        writer.close()
+        hajmlar[nom] = len(out.getvalue())
+        print(f"PDF ({nom}): {hajmlar[nom] / 1024:8.0f} KB")
+    print(f"rangli / skaner: {hajmlar['add_image'] / hajmlar['add_scan']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,20 @@
 import logging
+import os
 from telegram.ext import (
     Application,
     CommandHandler,
     CallbackQueryHandler,
+    ContextTypes,
     MessageHandler,
     filters
 )
-from config import BOT_TOKEN
+from config import (
+    BOT_TOKEN, MOSQUE_INDEX_PATH, MOSQUE_INDEX_REFRESH_HOURS, PDF_WORKERS, PDF_QUEUE_LIMIT,
+    PDF_USER_INFLIGHT, PDF_USER_QUEUE, PDF_CACHE_PATH, PDF_CACHE_SIZE,
+    PERSISTENCE_PATH, PERSISTENCE_INTERVAL, SESSION_SWEEP_INTERVAL,
+    CONCURRENT_UPDATES, UPDATE_QUEUE_LIMIT, WORKERS, WORKER_INDEX,
+    RUN_MODE, WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_SECRET, WEBHOOK_MAX_CONNECTIONS
+)
 
 # Handlerlar
 from handlers.start import start, show_main_menu
@@ -14,67 +22,70 @@ from handlers.language import language_selector, set_language
 from handlers.namoz import namoz_menu, show_namoz_vaqtlari
 from handlers.iftar import iftar_menu, show_roza_vaqtlari
 from handlers.mosque import mosque_start, handle_location, mosque_callback
-from handlers.image_to_pdf import pdf_start, handle_image
+from handlers.image_to_pdf import pdf_start, pdf_done, pdf_scan_toggle, handle_image
+from handlers.stats import stats_command
+from utils.prayer_calc import bugun
+from utils.timetable import load_timetable
+from utils.http_client import init_http, close_http
+from utils.prefetch import schedule_prefetch
+from utils.router import CallbackRouter
+from utils.mosque_index import refresh_index_job
+from utils.workers import WorkerPool
+from utils.pdf_cache import PdfCache
+from utils.persistence import SQLitePersistence
+from utils.user_state import UserState, evict_idle_sessions
+from utils.update_processor import ChatOrderedProcessor
+from utils.cluster import run_cluster
 
 # Logging
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     level=logging.INFO
 )
+# httpx har bir Bot API so'rovi URL ini (ichida bot<TOKEN>) INFO da yozadi
+logging.getLogger("httpx").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
 
-async def button_handler(update, context):
-    """Barcha tugmalar bosilganda ishlaydi"""
+async def unknown_button(update, context):
+    """Ro'yxatdan o'tmagan tugmalar"""
     query = update.callback_query
-    await query.answer()
-
     data = query.data
-    logger.info(f"🔘 Tugma bosildi: {data}")
-
-    # Til tanlash
-    if data.startswith('lang_'):
-        await set_language(update, context)
-
-    # Tilni o'zgartirish
-    elif data == 'change_language':
-        await language_selector(update, context)
-
-    # Namoz vaqtlari
-    elif data == 'namoz':
-        await namoz_menu(update, context)
-    elif data.startswith('viloyat_'):
-        await show_namoz_vaqtlari(update, context)
-
-    # Roza vaqtlari
-    elif data == 'iftar':
-        await iftar_menu(update, context)
-    elif data.startswith('iftar_'):
-        await show_roza_vaqtlari(update, context)
-
-    # Masjid
-    elif data == 'masjid':
-        await mosque_start(update, context)
-    elif data.startswith('mosque_') or data == 'mosque_back':
-        await mosque_callback(update, context)
-
-    # Rasm → PDF
-    elif data == 'pdf':
-        await pdf_start(update, context)
-
-    # Asosiy menyuga qaytish
-    elif data == 'back_to_menu':
-        await show_main_menu(update, context)
-
-    # Boshqa tugmalar
-    else:
-        lang = context.user_data.get('language', 'uz_latin')
-        messages = {
-            'uz_latin': f"✅ {data} tanlandi\n⏳ Bu funksiya tayyorlanmoqda...",
-            'uz_kiril': f"✅ {data} танланди\n⏳ Бу функция тайёрланмоқда...",
-            'en': f"✅ {data} selected\n⏳ This function is being prepared..."
-        }
-        await query.edit_message_text(messages.get(lang, messages['uz_latin']))
+    lang = context.user_data.get('language', 'uz_latin')
+    messages = {
+        'uz_latin': f"✅ {data} tanlandi\n⏳ Bu funksiya tayyorlanmoqda...",
+        'uz_kiril': f"✅ {data} танланди\n⏳ Бу функция тайёрланмоқда...",
+        'en': f"✅ {data} selected\n⏳ This function is being prepared..."
+    }
+    await query.edit_message_text(messages.get(lang, messages['uz_latin']))
+
+
+# Barcha tugmalar shu yerda ro'yxatdan o'tadi
+router = CallbackRouter(fallback=unknown_button)
+
+# Til
+router.prefix('lang_', set_language)
+router.exact('change_language', language_selector)
+
+# Namoz vaqtlari
+router.exact('namoz', namoz_menu)
+router.prefix('viloyat_', show_namoz_vaqtlari)
+
+# Roza vaqtlari
+router.exact('iftar', iftar_menu)
+router.prefix('iftar_', show_roza_vaqtlari)
+
+# Masjid
+router.exact('masjid', mosque_start)
+router.prefix('mosque_', mosque_callback)
+
+# Rasm → PDF
+router.exact('pdf', pdf_start)
+router.exact('pdf_done', pdf_done)
+router.exact('pdf_scan', pdf_scan_toggle)
+
+# Asosiy menyuga qaytish
+router.exact('back_to_menu', show_main_menu)
 
 
 async def handle_message(update, context):
@@ -83,7 +94,6 @@ async def handle_message(update, context):
         # Agar rasm kutilayotgan bo'lsa
         if context.user_data.get('waiting_for_image'):
             await handle_image(update, context)
-            context.user_data['waiting_for_image'] = False
             return
 
         # Agar lokatsiya kutilayotgan bo'lsa
@@ -114,7 +124,6 @@ async def handle_photo(update, context):
         # Agar rasm kutilayotgan bo'lsa
         if context.user_data.get('waiting_for_image'):
             await handle_image(update, context)
-            context.user_data['waiting_for_image'] = False
         else:
             # Rasm kutilmagan bo'lsa
             lang = context.user_data.get('language', 'uz_latin')
@@ -152,9 +161,92 @@ async def handle_location_message(update, context):
         logger.error(f"❌ Lokatsiya xatolik: {e}")
 
 
+async def post_init(app):
+    """Application ishga tushganda: umumiy resurslar"""
+    await init_http(app)
+    app.bot_data['pdf_pool'] = WorkerPool(
+        "pdf", PDF_WORKERS, PDF_QUEUE_LIMIT, per_user=PDF_USER_INFLIGHT, user_limit=PDF_USER_QUEUE
+    )
+    app.bot_data['pdf_cache'] = PdfCache(PDF_CACHE_PATH, PDF_CACHE_SIZE)
+
+
+async def post_shutdown(app):
+    """Application to'xtaganda: resurslarni yopish"""
+    pool = app.bot_data.pop('pdf_pool', None)
+    if pool is not None:
+        pool.shutdown()
+    cache = app.bot_data.pop('pdf_cache', None)
+    if cache is not None:
+        cache.close()
+    await close_http(app)
+
+
 async def error_handler(update, context):
     """Xatoliklarni boshqarish"""
-    logger.error(f"❌ Update {update} caused error {context.error}")
+    update_id = getattr(update, "update_id", None)
+    logger.error("❌ Update %s xatosi", update_id, exc_info=context.error)
+
+
+def build_application(updater: bool = True):
+    """Handlerlar va vazifalar bilan tayyor Application (updater=False - klaster workeri uchun)"""
+    builder = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .persistence(SQLitePersistence(PERSISTENCE_PATH, PERSISTENCE_INTERVAL))
+        .context_types(ContextTypes(user_data=UserState))
+        .concurrent_updates(ChatOrderedProcessor(CONCURRENT_UPDATES, UPDATE_QUEUE_LIMIT))
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+    )
+    if not updater:
+        # Update lar dispatcher jarayonidan keladi
+        builder = builder.updater(None)
+    app = builder.build()
+
+    # Handlerlarni qo'shish
+    app.bot_data['router'] = router
+    app.add_handler(CommandHandler("start", start))
+    app.add_handler(CommandHandler("stats", stats_command))
+    app.add_handler(CallbackQueryHandler(router.dispatch))
+    app.add_handler(MessageHandler(filters.PHOTO | filters.Document.IMAGE, handle_photo))
+    app.add_handler(MessageHandler(filters.LOCATION, handle_location_message))
+    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+
+    # Error handler
+    app.add_error_handler(error_handler)
+
+    # Har kuni yarim tunda vaqtlar va matnlarni oldindan tayyorlash
+    schedule_prefetch(app.job_queue)
+
+    # Faol bo'lmagan sessiyalarni xotiradan chiqarish (ma'lumot SQLite da qoladi)
+    app.job_queue.run_repeating(
+        evict_idle_sessions,
+        interval=SESSION_SWEEP_INTERVAL,
+        name="session_eviction"
+    )
+
+    # Masjid indeksini Overpass orqali davriy yangilash (ixtiyoriy, klasterda faqat 0-worker)
+    if MOSQUE_INDEX_REFRESH_HOURS > 0 and WORKER_INDEX == 0:
+        app.job_queue.run_repeating(
+            refresh_index_job,
+            interval=MOSQUE_INDEX_REFRESH_HOURS * 3600,
+            first=60 if not os.path.exists(MOSQUE_INDEX_PATH) else None,
+            name="mosque_index_refresh"
+        )
+
+    return app
+
+
+def webhook_options() -> dict:
+    """Webhook rejimi parametrlari (run_webhook / updater.start_webhook uchun)"""
+    return {
+        "listen": WEBHOOK_LISTEN,
+        "port": WEBHOOK_PORT,
+        "url_path": WEBHOOK_PATH,
+        "webhook_url": WEBHOOK_URL,
+        "secret_token": WEBHOOK_SECRET,
+        "max_connections": WEBHOOK_MAX_CONNECTIONS
+    }
 
 
 def main():
@@ -164,18 +256,19 @@ def main():
     print("=" * 60)
 
     try:
-        # Botni yaratish
-        app = Application.builder().token(BOT_TOKEN).build()
-
-        # Handlerlarni qo'shish
-        app.add_handler(CommandHandler("start", start))
-        app.add_handler(CallbackQueryHandler(button_handler))
-        app.add_handler(MessageHandler(filters.PHOTO, handle_photo))
-        app.add_handler(MessageHandler(filters.LOCATION, handle_location_message))
-        app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+        # Yillik namoz jadvallarini tayyorlash (joriy va keyingi yil)
+        yil = bugun().year
+        load_timetable(yil)
+        load_timetable(yil + 1)
+
+        if WORKERS > 1:
+            # Dispatcher + foydalanuvchi bo'yicha bo'lingan worker jarayonlar
+            print(f"🧩 Klaster rejimi: {WORKERS} ta worker")
+            run_cluster(WORKERS)
+            return
 
-        # Error handler
-        app.add_error_handler(error_handler)
+        # Botni yaratish
+        app = build_application()
 
         print("✅ Bot muvaffaqiyatli ishga tushdi!")
         print("=" * 60)
@@ -189,8 +282,13 @@ def main():
         print("⏳ Bot ishlamoqda...")
         print("=" * 60)
 
-        # Pollingni boshlash
-        app.run_polling()
+        if RUN_MODE == 'webhook':
+            # Telegram update larni o'zi yuboradi (bir nechta parallel ulanish)
+            print(f"🌐 Webhook: {WEBHOOK_LISTEN}:{WEBHOOK_PORT}/{WEBHOOK_PATH}")
+            app.run_webhook(**webhook_options())
+        else:
+            # Pollingni boshlash
+            app.run_polling()
 
     except Exception as e:
         print(f"❌ Xatolik: {e}")
@@ -3,4 +3,87 @@ from dotenv import load_dotenv
 load_dotenv()
 BOT_TOKEN = os.getenv('BOT_TOKEN')
 if not BOT_TOKEN:
-    raise ValueError("BOT_TOKEN topilmadi!")
\ No newline at end of file
+    raise ValueError("BOT_TOKEN topilmadi!")
+
+# Ishga tushirish rejimi: polling (standart) yoki webhook
+RUN_MODE = os.getenv('RUN_MODE', 'polling')
+if RUN_MODE not in ('polling', 'webhook'):
+    raise ValueError(f"RUN_MODE noto'g'ri: {RUN_MODE} (polling yoki webhook)")
+
+# Webhook sozlamalari (RUN_MODE=webhook bo'lsa)
+WEBHOOK_URL = os.getenv('WEBHOOK_URL')  # tashqi manzil, masalan https://bot.example.uz/telegram
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', 'telegram')
+WEBHOOK_LISTEN = os.getenv('WEBHOOK_LISTEN', '0.0.0.0')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 8443))
+WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET')  # X-Telegram-Bot-Api-Secret-Token tekshiruvi
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv('WEBHOOK_MAX_CONNECTIONS', 40))
+if RUN_MODE == 'webhook' and not (WEBHOOK_URL and WEBHOOK_SECRET):
+    raise ValueError("Webhook rejimi uchun WEBHOOK_URL va WEBHOOK_SECRET kerak!")
+
+# Update larni parallel qayta ishlash (bitta chat ichida tartib saqlanadi)
+CONCURRENT_UPDATES = int(os.getenv('CONCURRENT_UPDATES', 32))
+# Processor ichiga bir vaqtda kiradigan update lar chegarasi. PTB ortiqchasini rad etmaydi -
+# ular kutib turadi (/stats: updates.pending). Klasterda worker shundan ko'pini olmaydi.
+UPDATE_QUEUE_LIMIT = int(os.getenv('UPDATE_QUEUE_LIMIT', 1024))
+
+# Klaster rejimi: WORKERS > 1 bo'lsa dispatcher update larni foydalanuvchi id si bo'yicha
+# shuncha worker jarayonga taqsimlaydi. WORKER_INDEX - worker jarayonga dispatcher beradi.
+WORKERS = int(os.getenv('WORKERS', 1))
+WORKER_INDEX = int(os.getenv('WORKER_INDEX', 0))
+
+# Vaqt jadvallari va boshqa fayllar saqlanadigan papka
+DATA_DIR = os.getenv('DATA_DIR', 'data')
+
+# Umumiy HTTP klient sozlamalari
+HTTP_LIMIT = int(os.getenv('HTTP_LIMIT', 100))
+HTTP_LIMIT_PER_HOST = int(os.getenv('HTTP_LIMIT_PER_HOST', 10))
+HTTP_DNS_TTL = int(os.getenv('HTTP_DNS_TTL', 300))
+HTTP_KEEPALIVE = float(os.getenv('HTTP_KEEPALIVE', 30))
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 10))
+
+# Aladhan oylik kalendarini yuklab, mahalliy saqlash (0 - faqat mahalliy hisob)
+CALENDAR_INGEST = os.getenv('CALENDAR_INGEST', '1') == '1'
+
+# /stats buyrug'idan foydalana oladigan adminlar (vergul bilan: 123,456)
+ADMIN_IDS = {int(x) for x in os.getenv('ADMIN_IDS', '').split(',') if x.strip()}
+
+# Oflayn masjid indeksi (python -m utils.mosque_index <extract.json>)
+MOSQUE_INDEX_PATH = os.getenv('MOSQUE_INDEX_PATH', os.path.join(DATA_DIR, 'mosques.npz'))
+# Indeksdan qidirishda eng katta masofa (metr)
+INDEX_MAX_MASOFA = int(os.getenv('INDEX_MAX_MASOFA', 20000))
+# Indeksni Overpass orqali davriy yangilash (soat, 0 - o'chirilgan)
+MOSQUE_INDEX_REFRESH_HOURS = float(os.getenv('MOSQUE_INDEX_REFRESH_HOURS', 0))
+
+# Overpass natijalari keshi (geohash katagi bo'yicha)
+GEOHASH_ANIQLIGI = int(os.getenv('GEOHASH_ANIQLIGI', 6))  # 6 ~ 1.2 x 0.6 km
+MOSQUE_CACHE_TTL = float(os.getenv('MOSQUE_CACHE_TTL', 6 * 3600))
+MOSQUE_CACHE_SIZE = int(os.getenv('MOSQUE_CACHE_SIZE', 5000))
+# Katak keshi fayli - klasterdagi workerlar Overpass natijalarini ulashadi
+MOSQUE_CACHE_PATH = os.getenv('MOSQUE_CACHE_PATH', os.path.join(DATA_DIR, 'mosque_cache.sqlite3'))
+# Foydalanuvchilarga ko'rsatilgan masjid ro'yxatlari (user_data da faqat kalit). Jarayon ichida:
+# klasterda foydalanuvchi doim bitta workerga tushadi
+MOSQUE_RESULT_TTL = float(os.getenv('MOSQUE_RESULT_TTL', 3600))
+MOSQUE_RESULT_CACHE_SIZE = int(os.getenv('MOSQUE_RESULT_CACHE_SIZE', 20000))
+
+# Rasm → PDF worker pool
+PDF_WORKERS = int(os.getenv('PDF_WORKERS', min(4, os.cpu_count() or 1)))
+PDF_QUEUE_LIMIT = int(os.getenv('PDF_QUEUE_LIMIT', 16))
+# Foydalanuvchi boshiga: bir vaqtda bajariladigan va navbatdagi bilan jami ishlar
+PDF_USER_INFLIGHT = int(os.getenv('PDF_USER_INFLIGHT', 1))
+PDF_USER_QUEUE = int(os.getenv('PDF_USER_QUEUE', 2))
+# Ko'p sahifali PDF: foydalanuvchi boshiga limitlar va albom debounce (soniya)
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', 50))
+PDF_MAX_BYTES = int(os.getenv('PDF_MAX_BYTES', 20 * 1024 * 1024))
+PDF_DEBOUNCE = float(os.getenv('PDF_DEBOUNCE', 1.5))
+# Rasm/PDF fayllari shu hajmgacha xotirada, kattasi vaqtinchalik faylda (bayt)
+PDF_SPOOL_BYTES = int(os.getenv('PDF_SPOOL_BYTES', 1024 * 1024))
+# Tayyor PDF lar keshi (file_unique_id lar -> PDF file_id)
+PDF_CACHE_PATH = os.getenv('PDF_CACHE_PATH', os.path.join(DATA_DIR, 'pdf_cache.sqlite3'))
+PDF_CACHE_SIZE = int(os.getenv('PDF_CACHE_SIZE', 10000))
+
+# Foydalanuvchi sozlamalari (user_data) saqlanadigan SQLite fayli va yozish oralig'i (soniya)
+PERSISTENCE_PATH = os.getenv('PERSISTENCE_PATH', os.path.join(DATA_DIR, 'users.sqlite3'))
+PERSISTENCE_INTERVAL = float(os.getenv('PERSISTENCE_INTERVAL', 30))
+# Faol bo'lmagan sessiyalar shuncha vaqtdan keyin xotiradan chiqariladi (soniya)
+SESSION_TTL = float(os.getenv('SESSION_TTL', 1800))
+SESSION_SWEEP_INTERVAL = float(os.getenv('SESSION_SWEEP_INTERVAL', 300))
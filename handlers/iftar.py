@@ -1,68 +1,35 @@
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Update
 from telegram.ext import ContextTypes
-from utils.iftar_times import VILOYATLAR, get_roza_vaqtlari, format_roza_vaqtlari
+from handlers.image_to_pdf import reset_collect
+from utils.render_cache import get_menu, render, result_markup
 
 
 async def iftar_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
-    await query.answer()
     lang = context.user_data.get('language', 'uz_latin')
 
-    keyboard = []
-    row = []
-    for i, viloyat in enumerate(VILOYATLAR):
-        row.append(InlineKeyboardButton(viloyat, callback_data=f"iftar_{viloyat}"))
-        if (i + 1) % 3 == 0:
-            keyboard.append(row)
-            row = []
-    if row:
-        keyboard.append(row)
+    # Boshqa bo'limga o'tildi - yig'ilayotgan rasmlar bekor qilinadi
+    reset_collect(context.user_data)
 
-    back_text = {
-        'uz_latin': "🔙 Asosiy menyu",
-        'uz_kiril': "🔙 Асосий меню",
-        'en': "🔙 Main menu"
-    }.get(lang, "🔙 Asosiy menyu")
-    keyboard.append([InlineKeyboardButton(back_text, callback_data="back_to_menu")])
+    title, reply_markup = get_menu('roza', lang)
 
-    title = {
-        'uz_latin': "🌍 Viloyatni tanlang:",
-        'uz_kiril': "🌍 Вилоятни танланг:",
-        'en': "🌍 Choose region:"
-    }.get(lang, "🌍 Viloyatni tanlang:")
-
-    await query.edit_message_text(title, reply_markup=InlineKeyboardMarkup(keyboard))
+    await query.edit_message_text(title, reply_markup=reply_markup)
 
 
 async def show_roza_vaqtlari(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
-    await query.answer()
     viloyat = query.data.replace('iftar_', '')
     lang = context.user_data.get('language', 'uz_latin')
 
-    loading = {
-        'uz_latin': f"⏳ {viloyat} uchun roza vaqtlari olinmoqda...",
-        'uz_kiril': f"⏳ {viloyat} учун роза вақтлари олинмоқда...",
-        'en': f"⏳ Getting fasting times for {viloyat}..."
-    }.get(lang, f"⏳ {viloyat} uchun roza vaqtlari olinmoqda...")
-
-    await query.edit_message_text(loading)
-
-    result = await get_roza_vaqtlari(viloyat)
+    xabar = await render('roza', viloyat, lang)
 
-    if result["success"]:
-        text = format_roza_vaqtlari(result, lang)
-    else:
-        text = "❌ Roza vaqtlarini olishda xatolik."
+    if xabar is None:
+        xabar = ("❌ Roza vaqtlarini olishda xatolik.", result_markup('roza'))
 
-    keyboard = [
-        [InlineKeyboardButton("🔄 Qaytadan", callback_data="iftar")],
-        [InlineKeyboardButton("🔙 Viloyatlar", callback_data="iftar")],
-        [InlineKeyboardButton("🔙 Asosiy menyu", callback_data="back_to_menu")]
-    ]
+    text, reply_markup = xabar
 
     await query.edit_message_text(
         text,
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=reply_markup,
         parse_mode='Markdown'
-    )
\ No newline at end of file
+    )
@@ -1,112 +1,313 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest
 from telegram.ext import ContextTypes
-from PIL import Image
-import io
 import logging
+from tempfile import SpooledTemporaryFile
+
+from config import PDF_MAX_PAGES, PDF_MAX_BYTES, PDF_DEBOUNCE, PDF_SPOOL_BYTES
+from utils.http_client import download_to, safe_error
+from utils.pdf import PdfWriter
+from utils.pdf_cache import make_key
+from utils.workers import PoolBusy
 
 logger = logging.getLogger(__name__)
 
+# Fayl sifatida qabul qilinadigan rasm turlari (Pillow ochadiganlari; HEIC, SVG - yo'q)
+QABUL_TURLARI = frozenset({'image/jpeg', 'image/png', 'image/bmp', 'image/x-ms-bmp'})
+
+
+def _done_markup(lang: str, scan: bool = False) -> InlineKeyboardMarkup:
+    done = {
+        'uz_latin': "✅ Tayyor - PDF qilish",
+        'uz_kiril': "✅ Тайёр - PDF қилиш",
+        'en': "✅ Done - make PDF"
+    }
+    scan_text = {
+        'uz_latin': "🖨 Skaner rejimi",
+        'uz_kiril': "🖨 Сканер режими",
+        'en': "🖨 Scan mode"
+    }
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton(done.get(lang, done['uz_latin']), callback_data="pdf_done")],
+        [InlineKeyboardButton(
+            f"{scan_text.get(lang, scan_text['uz_latin'])}: {'✅' if scan else '❌'}",
+            callback_data="pdf_scan"
+        )],
+        [InlineKeyboardButton("🔙 Asosiy menyu", callback_data="back_to_menu")]
+    ])
+
+
+def reset_collect(user_data):
+    """Yig'ilgan sahifalar va kutish holatini tozalash"""
+    user_data['waiting_for_image'] = False
+    user_data['pdf_pages'] = []
+    user_data['pdf_bytes'] = 0
+
+
+def _restore_pages(user_data, pages, hajm: int):
+    """Yig'ish bo'lmasa - sahifalar va hajmini (shu orada kelganlari oldiga) qaytarish"""
+    user_data['pdf_pages'] = pages + user_data.get('pdf_pages', [])
+    user_data['pdf_bytes'] = hajm + user_data.get('pdf_bytes', 0)
+
 
 async def pdf_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Rasm → PDF funksiyasini boshlash"""
     query = update.callback_query
-    await query.answer()
-
     lang = context.user_data.get('language', 'uz_latin')
 
     texts = {
         'uz_latin': "📸 **Rasmni PDF ga aylantirish**\n\n"
-                    "Menga rasm yuboring, men uni PDF ga o‘giraman.\n\n"
-                    "Qabul qilinadigan formatlar: JPG, PNG, BMP",
+                    "Menga bitta yoki bir nechta rasm (albom ham bo‘ladi) yuboring, "
+                    "so‘ng «✅ Tayyor» tugmasini bosing - barchasi bitta PDF bo‘ladi.\n\n"
+                    "🖨 Skaner rejimi hujjat rasmlarini oq-qora va ancha kichik PDF qiladi.\n"
+                    f"Ko‘pi bilan {PDF_MAX_PAGES} sahifa.\n"
+                    "Qabul qilinadigan formatlar: JPG, PNG, BMP (fayl sifatida ham)",
         'uz_kiril': "📸 **Расмни PDF га айлантириш**\n\n"
-                    "Менга расм юборинг, мен уни PDF га ўгираман.\n\n"
-                    "Қабул қилинадиган форматлар: JPG, PNG, BMP",
+                    "Менга битта ёки бир нечта расм (албом ҳам бўлади) юборинг, "
+                    "сўнг «✅ Тайёр» тугмасини босинг - барчаси битта PDF бўлади.\n\n"
+                    "🖨 Сканер режими ҳужжат расмларини оқ-қора ва анча кичик PDF қилади.\n"
+                    f"Кўпи билан {PDF_MAX_PAGES} саҳифа.\n"
+                    "Қабул қилинадиган форматлар: JPG, PNG, BMP (файл сифатида ҳам)",
         'en': "📸 **Image to PDF converter**\n\n"
-              "Send me an image, I'll convert it to PDF.\n\n"
-              "Supported formats: JPG, PNG, BMP"
+              "Send me one or more images (albums too), then press «✅ Done» - "
+              "they will be combined into one PDF.\n\n"
+              "🖨 Scan mode turns document photos into a much smaller black-and-white PDF.\n"
+              f"Up to {PDF_MAX_PAGES} pages.\n"
+              "Supported formats: JPG, PNG, BMP (also as files)"
     }
 
-    keyboard = [[InlineKeyboardButton("🔙 Asosiy menyu", callback_data="back_to_menu")]]
-
+    reset_collect(context.user_data)
     context.user_data['waiting_for_image'] = True
+    context.user_data['waiting_for_location'] = False
 
     await query.edit_message_text(
         texts.get(lang, texts['uz_latin']),
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=_done_markup(lang, context.user_data.get('pdf_scan', False)),
         parse_mode='Markdown'
     )
 
 
+async def pdf_scan_toggle(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Skaner rejimini yoqish/o'chirish (tanlov saqlanib qoladi)"""
+    query = update.callback_query
+    lang = context.user_data.get('language', 'uz_latin')
+    scan = not context.user_data.get('pdf_scan', False)
+    context.user_data['pdf_scan'] = scan
+    await query.edit_message_reply_markup(reply_markup=_done_markup(lang, scan))
+
+
+async def reply_busy(update: Update, lang: str):
+    """Navbat to'lganda javob"""
+    busy = {
+        'uz_latin': "⏳ Hozir juda ko'p rasm navbatda. Birozdan keyin qayta yuboring.",
+        'uz_kiril': "⏳ Ҳозир жуда кўп расм навбатда. Бироздан кейин қайта юборинг.",
+        'en': "⏳ Too many images are queued right now. Please try again shortly."
+    }
+    await update.effective_message.reply_text(busy.get(lang, busy['uz_latin']))
+
+
+async def _send_status(context: ContextTypes.DEFAULT_TYPE):
+    """JobQueue: rasmlar oqimi to'xtagach bitta holat xabarini yuborish"""
+    user_data = context.user_data
+    lang = user_data.get('language', 'uz_latin')
+    soni = len(user_data.get('pdf_pages', []))
+    if not soni:
+        return
+
+    texts = {
+        'uz_latin': f"📄 {soni} ta sahifa qo'shildi.\nYana rasm yuboring yoki «✅ Tayyor» ni bosing.",
+        'uz_kiril': f"📄 {soni} та саҳифа қўшилди.\nЯна расм юборинг ёки «✅ Тайёр» ни босинг.",
+        'en': f"📄 {soni} page(s) added.\nSend more images or press «✅ Done»."
+    }
+
+    # Oldingi holat xabarini o'chirish - chatda bittasi qoladi
+    eski = user_data.pop('pdf_status_msg', None)
+    if eski:
+        try:
+            await context.bot.delete_message(context.job.chat_id, eski)
+        except Exception:
+            pass
+
+    msg = await context.bot.send_message(
+        context.job.chat_id,
+        texts.get(lang, texts['uz_latin']),
+        reply_markup=_done_markup(lang, user_data.get('pdf_scan', False))
+    )
+    user_data['pdf_status_msg'] = msg.message_id
+
+
 async def handle_image(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Rasmni qabul qilish va PDF ga aylantirish"""
-    try:
-        lang = context.user_data.get('language', 'uz_latin')
+    """Rasmni qabul qilish - PDF sahifasi sifatida navbatga qo'shish"""
+    lang = context.user_data.get('language', 'uz_latin')
 
-        # "Ishlayapman..." xabari
-        processing = {
-            'uz_latin': "⏳ Rasm qayta ishlanmoqda...",
-            'uz_kiril': "⏳ Расм қайта ишланмоқда...",
-            'en': "⏳ Processing image..."
+    # Siqilgan rasm yoki fayl sifatida yuborilgan rasm (asl sifatda)
+    if update.message.photo:
+        photo = update.message.photo[-1]
+    elif update.message.document and update.message.document.mime_type in QABUL_TURLARI:
+        photo = update.message.document
+    elif update.message.document:
+        unsupported = {
+            'uz_latin': "❌ Bu format qo'llab-quvvatlanmaydi. JPG, PNG yoki BMP yuboring.",
+            'uz_kiril': "❌ Бу формат қўллаб-қувватланмайди. JPG, PNG ёки BMP юборинг.",
+            'en': "❌ This format is not supported. Please send JPG, PNG or BMP."
         }
-        msg = await update.message.reply_text(processing.get(lang, processing['uz_latin']))
-
-        # Rasmni olish
-        if update.message.photo:
-            photo = update.message.photo[-1]
-            file = await context.bot.get_file(photo.file_id)
-        else:
-            await msg.delete()
-            await update.message.reply_text("❌ Rasm yuboring!")
-            return
+        await update.message.reply_text(unsupported.get(lang, unsupported['uz_latin']))
+        return
+    else:
+        await update.message.reply_text("❌ Rasm yuboring!")
+        return
 
-        # Rasmni yuklab olish
-        image_bytes = io.BytesIO()
-        await file.download_to_memory(image_bytes)
-        image_bytes.seek(0)
+    pages = context.user_data.setdefault('pdf_pages', [])
+    hajm = context.user_data.get('pdf_bytes', 0) + (photo.file_size or 0)
 
-        # PDF ga aylantirish
-        image = Image.open(image_bytes)
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
+    if len(pages) >= PDF_MAX_PAGES or hajm > PDF_MAX_BYTES:
+        limit = {
+            'uz_latin': f"⚠️ Limitga yetildi ({PDF_MAX_PAGES} sahifa / {PDF_MAX_BYTES // 2**20} MB). "
+                        "«✅ Tayyor» ni bosing.",
+            'uz_kiril': f"⚠️ Лимитга етилди ({PDF_MAX_PAGES} саҳифа / {PDF_MAX_BYTES // 2**20} MB). "
+                        "«✅ Тайёр» ни босинг.",
+            'en': f"⚠️ Limit reached ({PDF_MAX_PAGES} pages / {PDF_MAX_BYTES // 2**20} MB). "
+                  "Press «✅ Done»."
+        }
+        await update.message.reply_text(limit.get(lang, limit['uz_latin']), reply_markup=_done_markup(lang, context.user_data.get('pdf_scan', False)))
+        return
 
-        pdf_bytes = io.BytesIO()
-        image.save(pdf_bytes, format='PDF')
-        pdf_bytes.seek(0)
+    # Faqat id lar saqlanadi - rasm PDF yig'ilayotganda yuklab olinadi
+    pages.append([photo.file_id, photo.file_unique_id])
+    context.user_data['pdf_bytes'] = hajm
 
-        # PDF nomi
-        pdf_name = f"rasm_{update.message.from_user.id}.pdf"
+    # Albom yoki ketma-ket rasmlar uchun bitta javob (debounce)
+    name = f"pdf_status_{update.effective_user.id}"
+    for job in context.job_queue.get_jobs_by_name(name):
+        job.schedule_removal()
+    context.job_queue.run_once(
+        _send_status,
+        PDF_DEBOUNCE,
+        chat_id=update.effective_chat.id,
+        user_id=update.effective_user.id,
+        name=name
+    )
 
-        # "Ishlayapman..." xabarini o'chirish
-        await msg.delete()
 
-        # PDF ni yuborish
-        success = {
-            'uz_latin': "✅ PDF ga aylantirildi!",
-            'uz_kiril': "✅ PDF га айлантирилди!",
-            'en': "✅ Converted to PDF!"
-        }
+async def pdf_done(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Yig'ilgan rasmlardan bitta ko'p sahifali PDF yasash"""
+    query = update.callback_query
+    lang = context.user_data.get('language', 'uz_latin')
+    pages = context.user_data.get('pdf_pages') or []
 
-        await update.message.reply_document(
-            document=pdf_bytes,
-            filename=pdf_name,
-            caption=success.get(lang, success['uz_latin'])
-        )
-
-        # Yana rasm so'rash
-        again = {
-            'uz_latin': "📸 Yana rasm yuborishingiz mumkin:",
-            'uz_kiril': "📸 Яна расм юборишингиз мумкин:",
-            'en': "📸 You can send another image:"
+    if not pages:
+        empty = {
+            'uz_latin': "📸 Avval rasm yuboring.",
+            'uz_kiril': "📸 Аввал расм юборинг.",
+            'en': "📸 Send an image first."
         }
+        await query.message.reply_text(empty.get(lang, empty['uz_latin']))
+        return
+
+    scan = context.user_data.get('pdf_scan', False)
+    cache = context.bot_data.get('pdf_cache')
+    key = make_key([unique_id for _, unique_id in pages], scan)
+
+    # Xuddi shu rasmlar oldin ham aylantirilgan - tayyor PDF ni file_id bilan qayta yuborish
+    cached = cache.get(key) if cache else None
+    if cached:
+        try:
+            await _send_pdf(query, update, lang, cached, len(pages))
+            await query.delete_message()
+            reset_collect(context.user_data)
+            context.user_data['waiting_for_image'] = True
+            return
+        except BadRequest as e:
+            logger.warning(f"Keshdagi PDF yuborilmadi: {e}")
+            cache.delete(key)
 
-        keyboard = [[InlineKeyboardButton("🔙 Asosiy menyu", callback_data="back_to_menu")]]
-        await update.message.reply_text(
-            again.get(lang, again['uz_latin']),
-            reply_markup=InlineKeyboardMarkup(keyboard)
-        )
+    # Bitta foydalanuvchi bir vaqtda bitta PDF yig'adi; umumiy navbat to'lsa - rad
+    user_id = update.effective_user.id
+    pool = context.bot_data['pdf_pool']
+    if context.user_data.get('pdf_building') or pool.is_full(user_id):
+        await reply_busy(update, lang)
+        return
+
+    # Ikki marta bosilsa ikkinchisi bo'sh ro'yxat ko'radi
+    hajm = context.user_data.get('pdf_bytes', 0)
+    reset_collect(context.user_data)
+    context.user_data['waiting_for_image'] = True
+    context.user_data.pop('pdf_status_msg', None)
+
+    processing = {
+        'uz_latin': f"⏳ PDF tayyorlanmoqda ({len(pages)} sahifa)...",
+        'uz_kiril': f"⏳ PDF тайёрланмоқда ({len(pages)} саҳифа)...",
+        'en': f"⏳ Building PDF ({len(pages)} pages)..."
+    }
+    await query.edit_message_text(processing.get(lang, processing['uz_latin']))
+
+    # Yig'ish tugaguncha shu foydalanuvchining yangi "Tayyor" bosishlari rad etiladi
+    context.user_data['pdf_building'] = True
+    try:
+        # Kichik fayllar xotirada, PDF_SPOOL_BYTES dan kattasi diskka o'tadi
+        with SpooledTemporaryFile(max_size=PDF_SPOOL_BYTES) as pdf_file:
+            try:
+                # Sahifalar birma-bir: bo'laklab yuklab olish → worker'da PDF ga yozish
+                writer = PdfWriter(pdf_file)
+                add_page = writer.add_scan if scan else writer.add_image
+                for file_id, _ in pages:
+                    file = await context.bot.get_file(file_id)
+                    with SpooledTemporaryFile(max_size=PDF_SPOOL_BYTES) as image_file:
+                        await download_to(file.file_path, image_file)
+                        await pool.run(user_id, add_page, image_file)
+                writer.close()
+                pdf_file.seek(0)
+            except PoolBusy:
+                # Sahifalar yo'qolmasin - keyinroq qayta bosish mumkin
+                _restore_pages(context.user_data, pages, hajm)
+                await query.delete_message()
+                await reply_busy(update, lang)
+                return
+            except Exception as e:
+                logger.error(f"PDF xatolik: {safe_error(e)}")
+                _restore_pages(context.user_data, pages, hajm)
+                failed = {
+                    'uz_latin': "❌ Xatolik yuz berdi. Rasmlar saqlandi - «✅ Tayyor» ni qayta bosing.",
+                    'uz_kiril': "❌ Хатолик юз берди. Расмлар сақланди - «✅ Тайёр» ни қайта босинг.",
+                    'en': "❌ An error occurred. Your images are kept - press «✅ Done» again."
+                }
+                await query.edit_message_text(
+                    failed.get(lang, failed['uz_latin']),
+                    reply_markup=_done_markup(lang, scan)
+                )
+                return
+
+            await query.delete_message()
+            message = await _send_pdf(query, update, lang, pdf_file, len(pages))
+            if cache is not None and message.document:
+                cache.set(key, message.document.file_id)
+    finally:
+        context.user_data.pop('pdf_building', None)
 
-    except Exception as e:
-        logger.error(f"PDF xatolik: {e}")
-        await update.message.reply_text("❌ Xatolik yuz berdi.")
 
-    context.user_data['waiting_for_image'] = False
\ No newline at end of file
+async def _send_pdf(query, update: Update, lang: str, pdf_file, soni: int):
+    """Tayyor PDF ni (fayl yoki file_id) yuborish va yangi rasm so'rash"""
+    success = {
+        'uz_latin': f"✅ PDF ga aylantirildi! ({soni} sahifa)",
+        'uz_kiril': f"✅ PDF га айлантирилди! ({soni} саҳифа)",
+        'en': f"✅ Converted to PDF! ({soni} pages)"
+    }
+    message = await query.message.reply_document(
+        document=pdf_file,
+        # Keshdan boshqa foydalanuvchiga ham shu nom bilan boradi - shaxsiy ma'lumotsiz
+        filename="rasm.pdf",
+        caption=success.get(lang, success['uz_latin'])
+    )
+
+    # Yana rasm so'rash
+    again = {
+        'uz_latin': "📸 Yangi PDF uchun yana rasm yuborishingiz mumkin:",
+        'uz_kiril': "📸 Янги PDF учун яна расм юборишингиз мумкин:",
+        'en': "📸 You can send images for a new PDF:"
+    }
+    keyboard = [[InlineKeyboardButton("🔙 Asosiy menyu", callback_data="back_to_menu")]]
+    await query.message.reply_text(
+        again.get(lang, again['uz_latin']),
+        reply_markup=InlineKeyboardMarkup(keyboard)
+    )
+    return message
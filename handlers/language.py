@@ -1,8 +1,12 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
+from handlers.image_to_pdf import reset_collect
 
 
 async def language_selector(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    # /start yoki til tanlash - yig'ilayotgan rasmlar bekor qilinadi
+    reset_collect(context.user_data)
+
     keyboard = [
         [InlineKeyboardButton("🇺🇿 O'zbek lotin", callback_data='lang_uz_latin')],
         [InlineKeyboardButton("🇺🇿 Ўзбек кирил", callback_data='lang_uz_kiril')],
@@ -14,13 +18,11 @@ async def language_selector(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("🌐 Tilni tanlang:", reply_markup=reply_markup)
     else:
         query = update.callback_query
-        await query.answer()
         await query.edit_message_text("🌐 Tilni tanlang:", reply_markup=reply_markup)
 
 
 async def set_language(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
-    await query.answer()
     lang = query.data.replace('lang_', '')
     context.user_data['language'] = lang
     from handlers.start import show_main_menu
@@ -1,6 +1,9 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from utils.mosque_finder import find_masjid, format_masjid_list, format_masjid_detail
+from handlers.image_to_pdf import reset_collect
+from utils.mosque_finder import (
+    find_masjid, format_masjid_list, format_masjid_detail, save_results, get_results
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -8,10 +11,11 @@ logger = logging.getLogger(__name__)
 
 async def mosque_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
-    await query.answer()
-
     lang = context.user_data.get('language', 'uz_latin')
 
+    # Boshqa bo'limga o'tildi - yig'ilayotgan rasmlar bekor qilinadi (matn handle_image ga ketmasin)
+    reset_collect(context.user_data)
+
     texts = {
         'uz_latin': "📍 <b>Joylashuvingizni yuboring</b>\n\n📎 → Joylashuv → Yuborish",
         'uz_kiril': "📍 <b>Жойлашувингизни юборинг</b>\n\n📎 → Жойлашув → Юбориш",
@@ -62,7 +66,8 @@ async def handle_location(update: Update, context: ContextTypes.DEFAULT_TYPE):
             keyboard.append([InlineKeyboardButton("🔄 Qaytadan", callback_data="masjid")])
             keyboard.append([InlineKeyboardButton("🔙 Asosiy menyu", callback_data="back_to_menu")])
 
-            context.user_data['last_mosques'] = masjidlar
+            # Ro'yxatning o'zi umumiy keshda, foydalanuvchida faqat kaliti
+            context.user_data['mosque_ref'] = save_results(lat, lon, masjidlar)
 
             await update.message.reply_text(
                 text,
@@ -88,15 +93,27 @@ async def handle_location(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ Xatolik yuz berdi.")
 
 
+async def _results_expired(query, lang: str):
+    """Umumiy keshdagi natija eskirgan - joylashuvni qayta so'rash"""
+    texts = {
+        'uz_latin': "⌛ Natijalar eskirdi. Joylashuvingizni qayta yuboring.",
+        'uz_kiril': "⌛ Натижалар эскирди. Жойлашувингизни қайта юборинг.",
+        'en': "⌛ These results have expired. Please send your location again."
+    }
+    keyboard = [[InlineKeyboardButton("🔄 Qaytadan", callback_data="masjid")]]
+    await query.edit_message_text(
+        texts.get(lang, texts['uz_latin']),
+        reply_markup=InlineKeyboardMarkup(keyboard)
+    )
+
+
 async def mosque_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
-    await query.answer()
-
     data = query.data
     lang = context.user_data.get('language', 'uz_latin')
 
     if data == "mosque_back":
-        masjidlar = context.user_data.get('last_mosques', [])
+        masjidlar = get_results(context.user_data.get('mosque_ref'))
         if masjidlar:
             text = format_masjid_list(masjidlar, lang)
 
@@ -115,11 +132,13 @@ async def mosque_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 reply_markup=InlineKeyboardMarkup(keyboard),
                 parse_mode='HTML'
             )
+        else:
+            await _results_expired(query, lang)
         return
 
     if data.startswith("mosque_"):
         idx = int(data.replace("mosque_", ""))
-        masjidlar = context.user_data.get('last_mosques', [])
+        masjidlar = get_results(context.user_data.get('mosque_ref'))
 
         if 0 <= idx < len(masjidlar):
             masjid = masjidlar[idx]
@@ -138,4 +157,6 @@ async def mosque_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 reply_markup=InlineKeyboardMarkup(keyboard),
                 parse_mode='HTML',
                 disable_web_page_preview=False
-            )
\ No newline at end of file
+            )
+        elif not masjidlar:
+            await _results_expired(query, lang)
@@ -1,84 +1,44 @@
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Update
 from telegram.ext import ContextTypes
-from utils.prayer_times import VILOYATLAR, get_namoz_vaqtlari, format_namoz_vaqtlari
+from handlers.image_to_pdf import reset_collect
+from utils.render_cache import get_menu, render, result_markup
 
 
 async def namoz_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Viloyat tanlash menyusi"""
     query = update.callback_query
-    await query.answer()
-
     lang = context.user_data.get('language', 'uz_latin')
 
-    # Tugmalarni yaratish (3 qatorli)
-    keyboard = []
-    row = []
-    for i, viloyat in enumerate(VILOYATLAR):
-        row.append(InlineKeyboardButton(viloyat, callback_data=f"viloyat_{viloyat}"))
-        if (i + 1) % 3 == 0:
-            keyboard.append(row)
-            row = []
-    if row:
-        keyboard.append(row)
-
-    # Ortga tugmasi
-    back_text = {
-        'uz_latin': "🔙 Asosiy menyu",
-        'uz_kiril': "🔙 Асосий меню",
-        'en': "🔙 Main menu"
-    }.get(lang, "🔙 Asosiy menyu")
-
-    keyboard.append([InlineKeyboardButton(back_text, callback_data="back_to_menu")])
+    # Boshqa bo'limga o'tildi - yig'ilayotgan rasmlar bekor qilinadi
+    reset_collect(context.user_data)
 
-    # Sarlavha
-    title = {
-        'uz_latin': "🌍 Viloyatni tanlang:",
-        'uz_kiril': "🌍 Вилоятни танланг:",
-        'en': "🌍 Choose region:"
-    }.get(lang, "🌍 Viloyatni tanlang:")
+    # Sarlavha va tugmalar (keshdan)
+    title, reply_markup = get_menu('namoz', lang)
 
-    await query.edit_message_text(title, reply_markup=InlineKeyboardMarkup(keyboard))
+    await query.edit_message_text(title, reply_markup=reply_markup)
 
 
 async def show_namoz_vaqtlari(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Tanlangan viloyat namoz vaqtlarini ko‘rsatish"""
     query = update.callback_query
-    await query.answer()
-
     viloyat = query.data.replace('viloyat_', '')
     lang = context.user_data.get('language', 'uz_latin')
 
-    # Kutish xabari
-    loading = {
-        'uz_latin': f"⏳ {viloyat} uchun namoz vaqtlari olinmoqda...",
-        'uz_kiril': f"⏳ {viloyat} учун намоз вақтлари олинмоқда...",
-        'en': f"⏳ Getting prayer times for {viloyat}..."
-    }.get(lang, f"⏳ {viloyat} uchun namoz vaqtlari olinmoqda...")
-
-    await query.edit_message_text(loading)
-
-    # Namoz vaqtlarini olish
-    result = await get_namoz_vaqtlari(viloyat)
+    # Tayyor xabar (sana o'zgarguncha keshda)
+    xabar = await render('namoz', viloyat, lang)
 
-    if result["success"]:
-        text = format_namoz_vaqtlari(result, lang)
-    else:
+    if xabar is None:
         error_texts = {
             'uz_latin': "❌ Namoz vaqtlarini olishda xatolik yuz berdi.",
             'uz_kiril': "❌ Намоз вақтларини олишда хато юз берди.",
             'en': "❌ Error getting prayer times."
         }
-        text = error_texts.get(lang, error_texts['uz_latin'])
+        xabar = (error_texts.get(lang, error_texts['uz_latin']), result_markup('namoz'))
 
-    # Tugmalar
-    keyboard = [
-        [InlineKeyboardButton("🔄 Qaytadan", callback_data="namoz")],
-        [InlineKeyboardButton("🔙 Viloyatlar", callback_data="namoz")],
-        [InlineKeyboardButton("🔙 Asosiy menyu", callback_data="back_to_menu")]
-    ]
+    text, reply_markup = xabar
 
     await query.edit_message_text(
         text,
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=reply_markup,
         parse_mode='Markdown'
-    )
\ No newline at end of file
+    )
@@ -1,6 +1,8 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
+from handlers.image_to_pdf import reset_collect
+
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     from handlers.language import language_selector
@@ -11,6 +13,9 @@ async def show_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     lang = context.user_data.get('language', 'uz_latin')
 
+    # Menyuga qaytganda yig'ilayotgan rasmlar bekor qilinadi
+    reset_collect(context.user_data)
+
     texts = {
         'uz_latin': {
             'welcome': "Assalomu alaykum! 👋",
@@ -0,0 +1,51 @@
+import html
+import json
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from config import ADMIN_IDS, WORKERS, WORKER_INDEX
+from utils import render_cache, timings
+from utils.mosque_finder import get_stats as mosque_stats
+from utils.user_state import session_stats
+from utils.pdf import get_stats as pdf_stats
+
+
+def collect_stats(context: ContextTypes.DEFAULT_TYPE) -> dict:
+    """Keshlar va yo'nalishlar statistikasi"""
+    stats = {
+        "timings": timings.get_stats(),
+        "render_cache": render_cache.get_stats(),
+        "mosque": mosque_stats(),
+        "pdf": pdf_stats(),
+        "sessions": session_stats(context.application.user_data)
+    }
+    if WORKERS > 1:
+        # Klasterda statistika faqat shu worker jarayonniki
+        stats["worker"] = {"index": WORKER_INDEX, "workers": WORKERS}
+    pool = context.bot_data.get('pdf_pool')
+    if pool is not None:
+        stats["pdf_pool"] = pool.get_stats()
+    cache = context.bot_data.get('pdf_cache')
+    if cache is not None:
+        stats["pdf_cache"] = cache.get_stats()
+    persistence = context.application.persistence
+    if persistence is not None and hasattr(persistence, 'get_stats'):
+        stats["persistence"] = persistence.get_stats()
+    processor = context.application.update_processor
+    if hasattr(processor, 'get_stats'):
+        stats["updates"] = processor.get_stats()
+    router = context.bot_data.get('router')
+    if router is not None:
+        stats["routes"] = router.get_stats()
+    return stats
+
+
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/stats - faqat adminlar uchun"""
+    if update.effective_user.id not in ADMIN_IDS:
+        return
+
+    text = json.dumps(collect_stats(context), ensure_ascii=False, indent=1, default=str)
+    # Telegram xabari 4096 belgidan oshmasin
+    await update.message.reply_text(f"<pre>{html.escape(text[:4000])}</pre>", parse_mode='HTML')
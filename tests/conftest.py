@@ -0,0 +1,20 @@
+import os
+import socket
+import sys
+import tempfile
+
+# config.py import paytida BOT_TOKEN talab qiladi; ma'lumotlar vaqtinchalik papkaga
+os.environ.setdefault('BOT_TOKEN', '123456:TEST')
+os.environ.setdefault('DATA_DIR', tempfile.mkdtemp(prefix='taqvim-test-'))
+# Testlar internetga chiqmasin (app.start() da aladhan kalendarlari yuklanmaydi)
+os.environ.setdefault('CALENDAR_INGEST', '0')
+
+# Webhook testi uchun (RUN_MODE o'zgarmaydi - faqat qiymatlar)
+with socket.socket() as _s:
+    _s.bind(('127.0.0.1', 0))
+    os.environ.setdefault('WEBHOOK_PORT', str(_s.getsockname()[1]))
+os.environ.setdefault('WEBHOOK_LISTEN', '127.0.0.1')
+os.environ.setdefault('WEBHOOK_URL', 'https://bot.example.uz/telegram')
+os.environ.setdefault('WEBHOOK_SECRET', 'test-secret')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,85 @@
+"""
+Mahalliy soxta Telegram Bot API: har bir metod chaqiruvini yozib boradi va
+PTB kutadigan eng oddiy javoblarni qaytaradi.
+"""
+import json
+import time
+
+from aiohttp import web
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Taqvim", "username": "taqvim_test_bot"}
+
+
+class FakeTelegram:
+    def __init__(self):
+        self.calls = []  # (metod, parametrlar)
+        self.updates = []  # getUpdates uchun navbat
+        self._runner = None
+        self.port = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/bot"
+
+    def methods(self, name: str) -> list:
+        return [params for method, params in self.calls if method == name]
+
+    async def _handle(self, request):
+        method = request.match_info["method"]
+        if request.content_type == "application/json":
+            params = await request.json()
+        else:
+            params = dict(await request.post())
+        for key, value in params.items():
+            if isinstance(value, str) and value[:1] in "[{":
+                try:
+                    params[key] = json.loads(value)
+                except ValueError:
+                    pass
+        self.calls.append((method, params))
+        return web.json_response({"ok": True, "result": self._result(method, params)})
+
+    def _result(self, method: str, params: dict):
+        if method == "getMe":
+            return BOT_USER
+        if method == "getUpdates":
+            updates, self.updates = self.updates, []
+            return updates
+        if method in ("sendMessage", "sendDocument"):
+            chat_id = int(params.get("chat_id", 0))
+            return {
+                "message_id": len(self.calls),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": BOT_USER,
+                "text": params.get("text", "")
+            }
+        return True
+
+    async def start(self):
+        server = web.Application()
+        server.router.add_route("*", "/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(server, access_log=None)  # yo'llarda bot<TOKEN> bor
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+
+def message_update(update_id: int, user_id: int, text: str) -> dict:
+    """Foydalanuvchidan matnli xabar (xom JSON)"""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Test"},
+            "text": text,
+            **({"entities": [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]}
+               if text.startswith("/") else {})
+        }
+    }
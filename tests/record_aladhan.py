@@ -0,0 +1,41 @@
+"""
+engine_timings.json dagi shahar/sanalar uchun haqiqiy Aladhan javoblarini
+aladhan_timings.json ga yozib olish (internet kerak):
+
+    python -m tests.record_aladhan
+"""
+import asyncio
+import json
+from datetime import date
+
+from tests import conftest  # noqa: F401 - BOT_TOKEN va sys.path
+from tests.test_prayer_calc import ALADHAN_FIXTURE, ENGINE_FIXTURE
+from utils.http_client import close_http, get_json
+
+URL = "https://api.aladhan.com/v1/timingsByCity/{date}"
+
+
+async def record():
+    with open(ENGINE_FIXTURE, encoding='utf-8') as f:
+        fixture = json.load(f)
+
+    try:
+        for case in fixture['cases']:
+            case['response'] = await get_json(URL.format(date=case['date']), params={
+                "city": case['city'],
+                "country": case['country'],
+                "method": 2,  # Muslim World League
+                "school": 1  # Hanafi
+            }, timeout=30)
+            print(f"✅ {case['city']} {case['date']}")
+    finally:
+        await close_http()
+
+    fixture['_source'] = f"api.aladhan.com timingsByCity (method=2, school=1), {date.today()} da yozib olingan"
+    with open(ALADHAN_FIXTURE, 'w', encoding='utf-8') as f:
+        json.dump(fixture, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(record())
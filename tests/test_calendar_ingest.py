@@ -0,0 +1,46 @@
+import asyncio
+import json
+import os
+from datetime import date
+
+from utils import calendar_ingest
+from utils.prayer_calc import KOORDINATALAR
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'aladhan_calendar_tashkent_2026_03.json')
+
+with open(FIXTURE, encoding='utf-8') as f:
+    PAYLOAD = json.load(f)
+
+
+def test_normalize_day_strips_timezone_suffix_and_keys_by_iso_date():
+    sana, kun = calendar_ingest.normalize_day(PAYLOAD['data'][0])
+
+    assert sana == '2026-03-01'  # DD-MM-YYYY -> ISO kalit
+    assert kun['bomdod'] == '05:26'  # "05:26 (+05)"
+    assert kun['shom'] == '18:13'
+    assert all(len(kun[k]) == 5 for k in calendar_ingest.NAMOZ_KALITLARI.values())
+    assert kun['sana'] == '01 Mar 2026'
+    assert kun['hafta_kuni'] == 'Yakshanba'
+    assert kun['hijriy'] == '12 Ramaḍān 1447'
+
+    kunlar = dict(calendar_ingest.normalize_day(day) for day in PAYLOAD['data'])
+    assert list(kunlar) == ['2026-03-01', '2026-03-02']
+
+
+def test_ingest_missing_continues_after_a_failed_city(monkeypatch, tmp_path):
+    monkeypatch.setattr(calendar_ingest, 'CALENDAR_DIR', str(tmp_path))
+    monkeypatch.setattr(calendar_ingest, '_oylar', {})
+    shaharlar = list(KOORDINATALAR)
+
+    async def get_json(url, params=None, timeout=None):
+        if params['city'] == shaharlar[1]:
+            raise OSError("Cannot connect to host api.aladhan.com")
+        return PAYLOAD
+
+    monkeypatch.setattr(calendar_ingest, 'get_json', get_json)
+    assert asyncio.run(calendar_ingest.ingest_missing(2026, 3)) == len(shaharlar) - 1
+
+    assert not os.path.exists(calendar_ingest.month_path(shaharlar[1], 2026, 3))
+    for api_nom in shaharlar[:1] + shaharlar[2:]:
+        assert os.path.exists(calendar_ingest.month_path(api_nom, 2026, 3))
+    assert calendar_ingest.load_day(shaharlar[-1], date(2026, 3, 2))['bomdod'] == PAYLOAD['data'][1]['timings']['Fajr'][:5]
@@ -0,0 +1,63 @@
+import asyncio
+import multiprocessing
+
+import pytest
+
+from config import BOT_TOKEN, UPDATE_QUEUE_LIMIT
+from tests.fake_telegram import message_update
+from utils import cluster
+
+
+def test_user_of_and_shard_for():
+    assert cluster.user_of(message_update(1, 42, "salom")) == 42
+    callback = {"update_id": 2, "callback_query": {"id": "x", "from": {"id": 7}, "data": "uz"}}
+    assert cluster.user_of(callback) == 7
+    assert cluster.user_of({"update_id": 3}) is None
+
+    assert cluster.shard_for(42, 4) == 2
+    assert cluster.shard_for(None, 4) == 0
+
+
+def test_api_error_hides_token(monkeypatch):
+    async def get_json(url, params=None, timeout=None):
+        raise OSError(f"Cannot connect to {url}")
+
+    monkeypatch.setattr(cluster, "get_json", get_json)
+    with pytest.raises(RuntimeError) as e:
+        asyncio.run(cluster._api("getUpdates"))
+    assert BOT_TOKEN not in str(e.value)
+    assert str(e.value).startswith("getUpdates: OSError")
+
+
+def _stub_worker(index, updates, natijalar, ochiq):
+    """Worker o'rnida: 0-worker `ochiq` gacha hech narsa olmaydi"""
+    if index == 0:
+        ochiq.wait()
+    while True:
+        raw = updates.get()
+        if raw is None:
+            return
+        natijalar.put((index, raw["update_id"]))
+
+
+def test_stuck_shard_does_not_hold_back_others():
+    async def run():
+        ctx = multiprocessing.get_context("spawn")
+        natijalar, ochiq = ctx.Queue(), ctx.Event()
+        dispatcher = cluster.Dispatcher(2, target=_stub_worker, args=(natijalar, ochiq))
+        dispatcher.start()
+        loop = asyncio.get_running_loop()
+
+        # 0-shard: worker navbati to'ladi, qolgani buferda
+        for n in range(UPDATE_QUEUE_LIMIT + 10):
+            await dispatcher.route(message_update(n, 2, "salom"))
+        await dispatcher.route(message_update(100000, 1, "salom"))
+        assert await loop.run_in_executor(None, natijalar.get, True, 30) == (1, 100000)
+
+        ochiq.set()
+        await dispatcher.close()
+        olingan = [natijalar.get(timeout=5) for _ in range(UPDATE_QUEUE_LIMIT + 10)]
+        assert [n for _, n in olingan] == list(range(UPDATE_QUEUE_LIMIT + 10))  # tartib saqlandi
+        assert dispatcher.stats["routed"] == [UPDATE_QUEUE_LIMIT + 10, 1]
+
+    asyncio.run(run())
@@ -0,0 +1,42 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from handlers.iftar import iftar_menu
+from handlers.image_to_pdf import pdf_start
+from handlers.language import language_selector
+from handlers.mosque import mosque_start
+from handlers.namoz import namoz_menu
+
+
+class _Query:
+    async def edit_message_text(self, text, reply_markup=None, parse_mode=None):
+        self.text = text
+
+
+def _run(handler, user_data):
+    update = SimpleNamespace(callback_query=_Query(), message=None)
+    asyncio.run(handler(update, SimpleNamespace(user_data=user_data)))
+
+
+def _pdf_rejimi():
+    # Yig'ish muvaffaqiyatsiz tugagandan keyingi holat: sahifalar qaytarilgan, rasm kutilmoqda
+    return {'language': 'en', 'waiting_for_image': True, 'pdf_pages': [("f", "u")], 'pdf_bytes': 10}
+
+
+@pytest.mark.parametrize('handler', [mosque_start, namoz_menu, iftar_menu, language_selector])
+def test_menu_entry_points_leave_pdf_mode(handler):
+    user_data = _pdf_rejimi()
+    _run(handler, user_data)
+    assert user_data['waiting_for_image'] is False
+    assert user_data['pdf_pages'] == []
+
+
+def test_mosque_and_pdf_modes_do_not_overlap():
+    user_data = _pdf_rejimi()
+    _run(mosque_start, user_data)
+    assert (user_data['waiting_for_image'], user_data['waiting_for_location']) == (False, True)
+
+    _run(pdf_start, user_data)
+    assert (user_data['waiting_for_image'], user_data['waiting_for_location']) == (True, False)
@@ -0,0 +1,65 @@
+import asyncio
+
+from utils import mosque_finder
+from utils.ttl_cache import SharedTTLCache
+
+
+def test_shared_cache_is_seen_by_another_process_instance(tmp_path):
+    path = str(tmp_path / "mosque_cache.sqlite3")
+    birinchi = SharedTTLCache(path, "mosque_cells", 10, 60)
+    ikkinchi = SharedTTLCache(path, "mosque_cells", 10, 60)  # boshqa worker o'rnida
+
+    async def run():
+        await ikkinchi.load(["txc8"])
+        assert ikkinchi.get("txc8") is None
+        await birinchi.store("txc8", (3000, [{"lat": 41.3, "lon": 69.2}]))
+
+        # get/peek faqat xotiradan - fayl load() bilan o'qiladi
+        assert ikkinchi.peek("txc8") is None
+        await ikkinchi.load(["txc8", "txc9"])
+        assert ikkinchi.get("txc8") == [3000, [{"lat": 41.3, "lon": 69.2}]]
+        assert ikkinchi.get_stats()["shared"] == 1
+
+    asyncio.run(run())
+
+
+def test_expired_shared_entry_is_ignored(tmp_path):
+    path = str(tmp_path / "mosque_cache.sqlite3")
+
+    async def run():
+        await SharedTTLCache(path, "mosque_cells", 10, -1).store("txc8", (500, []))
+        yangi = SharedTTLCache(path, "mosque_cells", 10, 60)
+        await yangi.load(["txc8"])
+        assert yangi.get("txc8") is None
+
+    asyncio.run(run())
+
+
+def test_find_masjid_reuses_cell_fetched_by_another_worker(monkeypatch, tmp_path):
+    path = str(tmp_path / "mosque_cache.sqlite3")
+    chaqiruvlar = []
+
+    async def fetch_elements(lat, lon, radius):
+        chaqiruvlar.append(radius)
+        return [
+            {"lat": 41.311 + i * 0.001, "lon": 69.279, "tags": {"name": f"Masjid {i}"}}
+            for i in range(6)
+        ]
+
+    monkeypatch.setattr(mosque_finder, "_fetch_elements", fetch_elements)
+    kesh = SharedTTLCache(path, "mosque_cells", 10, 60)
+    oqishlar = []
+    _read = kesh._read
+    monkeypatch.setattr(kesh, "_read", lambda keys: oqishlar.append(keys) or _read(keys))
+    monkeypatch.setattr(mosque_finder, "_cell_cache", kesh)
+    birinchi = asyncio.run(mosque_finder.find_masjid(41.311, 69.279))
+    assert chaqiruvlar
+    # Katak va 8 qo'shnisi - bitta so'rov (qo'shnilar har radius qadamida xotiradan)
+    assert len(oqishlar) == 1 and len(oqishlar[0]) == 9
+
+    # Ikkinchi worker: xotirasi bo'sh, lekin fayl umumiy - Overpass ga bormaydi
+    chaqiruvlar.clear()
+    monkeypatch.setattr(mosque_finder, "_cell_cache", SharedTTLCache(path, "mosque_cells", 10, 60))
+    ikkinchi = asyncio.run(mosque_finder.find_masjid(41.311, 69.279))
+    assert chaqiruvlar == []
+    assert [m["name"] for m in ikkinchi] == [m["name"] for m in birinchi]
@@ -0,0 +1,94 @@
+import asyncio
+
+import numpy as np
+
+from config import INDEX_MAX_MASOFA
+from utils import mosque_index
+from utils.mosque_finder import calculate_distances
+
+
+def _masjidlar(n, rng):
+    # Toshkent atrofida zich, chetlarida siyrak - bo'sh kataklar va uzoq halqalar ham bo'ladi
+    lat = np.concatenate([rng.normal(41.3, 0.05, n // 2), rng.uniform(40.5, 42.0, n - n // 2)])
+    lon = np.concatenate([rng.normal(69.25, 0.07, n // 2), rng.uniform(68.5, 70.5, n - n // 2)])
+    return [
+        {"name": f"Masjid {i}", "lat": float(a), "lon": float(b), "address": ""}
+        for i, (a, b) in enumerate(zip(lat, lon))
+    ]
+
+
+def test_nearest_matches_brute_force_haversine(tmp_path):
+    rng = np.random.default_rng(10)
+    masjidlar = _masjidlar(3000, rng)
+    index = mosque_index.load_index(mosque_index.build_index(masjidlar, str(tmp_path / "mosques.npz")))
+    assert len(index) == len(masjidlar)
+
+    lats = np.array([m["lat"] for m in masjidlar])
+    lons = np.array([m["lon"] for m in masjidlar])
+    for lat, lon in zip(rng.uniform(40.3, 42.2, 2000), rng.uniform(68.3, 70.7, 2000)):
+        d = calculate_distances(lat, lon, lats, lons)
+        kutilgan = [round(x) for x in np.sort(d)[:5] if x <= INDEX_MAX_MASOFA]
+        assert [m["distance"] for m in index.nearest(lat, lon, k=5)] == kutilgan
+
+
+def test_parse_overpass_elements():
+    tags = {"amenity": "place_of_worship", "religion": "muslim"}
+    data = {"elements": [
+        {"type": "node", "id": 1, "lat": 41.3, "lon": 69.2, "tags": {**tags, "name": "Nuqta"}},
+        {"type": "way", "id": 2, "center": {"lat": 41.31, "lon": 69.21}, "tags": {**tags, "name": "Markaz"}},
+        {"type": "node", "id": 10, "lat": 41.0, "lon": 69.0},
+        {"type": "node", "id": 11, "lat": 41.2, "lon": 69.4},
+        {"type": "way", "id": 3, "nodes": [10, 11], "tags": {**tags, "name": "Tugunlar"}},
+        {"type": "relation", "id": 4, "tags": {**tags, "name": "Geometriya"},
+         "geometry": [{"lat": 40.0, "lon": 70.0}, {"lat": 40.2, "lon": 70.2}]},
+        {"type": "node", "id": 5, "lat": 41.5, "lon": 69.5, "tags": {"amenity": "place_of_worship", "religion": "christian"}},
+        {"type": "way", "id": 6, "nodes": [99], "tags": tags}  # tugunlari faylda yo'q
+    ]}
+    masjidlar = {m["name"]: (m["lat"], m["lon"]) for m in mosque_index.parse_osm_json(data)}
+    assert masjidlar == {
+        "Nuqta": (41.3, 69.2),
+        "Markaz": (41.31, 69.21),
+        "Tugunlar": (41.1, 69.2),
+        "Geometriya": (40.1, 70.1)
+    }
+
+
+def test_parse_geojson_features():
+    props = {"amenity": "place_of_worship", "religion": "muslim"}
+    halqa = [[69.0, 41.0], [69.2, 41.0], [69.2, 41.2], [69.0, 41.2]]
+    data = {"type": "FeatureCollection", "features": [
+        {"properties": {**props, "name": "Nuqta"}, "geometry": {"type": "Point", "coordinates": [69.2, 41.3]}},
+        {"properties": {**props, "name": "Poligon"}, "geometry": {"type": "Polygon", "coordinates": [halqa]}},
+        {"properties": {**props, "name": "Multi"}, "geometry": {"type": "MultiPolygon", "coordinates": [[halqa]]}},
+        {"properties": {**props, "name": "Chiziq"}, "geometry": {"type": "LineString", "coordinates": halqa}},
+        {"properties": {"amenity": "school"}, "geometry": {"type": "Point", "coordinates": [69.0, 41.0]}}
+    ]}
+    masjidlar = {m["name"]: (round(m["lat"], 6), round(m["lon"], 6)) for m in mosque_index.parse_osm_json(data)}
+    assert masjidlar == {"Nuqta": (41.3, 69.2), "Poligon": (41.1, 69.1), "Multi": (41.1, 69.1)}
+
+
+def test_index_file_is_checked_on_a_timer_and_reloaded_after_refresh(monkeypatch, tmp_path):
+    path = str(tmp_path / "mosques.npz")
+    monkeypatch.setattr(mosque_index, "MOSQUE_INDEX_PATH", path)
+    monkeypatch.setattr(mosque_index, "_index", None)
+    monkeypatch.setattr(mosque_index, "_index_mtime", None)
+    monkeypatch.setattr(mosque_index, "_index_checked", None)
+    mosque_index.build_index(_masjidlar(10, np.random.default_rng(1)), path)
+
+    statlar = []
+    getmtime = mosque_index.os.path.getmtime
+    monkeypatch.setattr(mosque_index.os.path, "getmtime", lambda p: statlar.append(p) or getmtime(p))
+    for _ in range(100):
+        assert len(mosque_index.get_index()) == 10
+    assert len(statlar) == 1
+
+    async def get_json(url, params=None, timeout=None):
+        return {"elements": [
+            {"type": "node", "id": i, "lat": 41.3 + i / 100, "lon": 69.2,
+             "tags": {"amenity": "place_of_worship", "religion": "muslim"}}
+            for i in range(3)
+        ]}
+
+    monkeypatch.setattr(mosque_index, "get_json", get_json)
+    asyncio.run(mosque_index.refresh_index_job())
+    assert len(mosque_index.get_index()) == 3  # taymerni kutmasdan
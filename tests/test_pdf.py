@@ -0,0 +1,63 @@
+import io
+
+import aiohttp
+import pytest
+from PIL import Image
+
+from utils.http_client import safe_error
+from utils.pdf import PdfWriter, jpeg_info
+
+
+def _jpeg(width=40, height=20, orientation=None) -> io.BytesIO:
+    image = Image.new("RGB", (width, height), "white")
+    f = io.BytesIO()
+    if orientation is None:
+        image.save(f, "JPEG")
+    else:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        image.save(f, "JPEG", exif=exif)
+    f.seek(0)
+    return f
+
+
+def _pdf(add) -> bytes:
+    out = io.BytesIO()
+    writer = PdfWriter(out)
+    add(writer)
+    writer.close()
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("orientation, rotate", [(None, None), (1, None), (3, 180), (6, 90), (8, 270)])
+def test_jpeg_passthrough_rotation(orientation, rotate):
+    f = _jpeg(orientation=orientation)
+    assert jpeg_info(f)[4] == (orientation or 1)
+
+    pdf = _pdf(lambda w: w.add_image(f))
+    assert b"/DCTDecode" in pdf
+    if rotate is None:
+        assert b"/Rotate" not in pdf
+    else:
+        assert b"/Rotate %d " % rotate in pdf
+
+
+def test_mirrored_jpeg_goes_through_pillow():
+    # 5 - transpose: 40x20 -> 20x40
+    pdf = _pdf(lambda w: w.add_image(_jpeg(orientation=5)))
+    assert b"/FlateDecode" in pdf and b"/DCTDecode" not in pdf
+    assert b"/Width 20 /Height 40" in pdf
+
+
+def test_scan_applies_orientation():
+    pdf = _pdf(lambda w: w.add_scan(_jpeg(orientation=6)))
+    assert b"/Width 20 /Height 40" in pdf
+
+
+def test_safe_error_hides_token():
+    url = "https://api.telegram.org/file/bot123456:TEST/photos/file_1.jpg"
+    xato = aiohttp.ClientResponseError(
+        aiohttp.RequestInfo(url, "GET", {}, url), (), status=404, message="Not Found"
+    )
+    assert "123456:TEST" not in safe_error(xato) and "404" in safe_error(xato)
+    assert "123456:TEST" not in safe_error(aiohttp.InvalidURL(url))
@@ -0,0 +1,105 @@
+import asyncio
+from types import SimpleNamespace
+
+from telegram.error import BadRequest
+
+from handlers import image_to_pdf
+from utils.pdf_cache import PdfCache, make_key
+
+
+def test_make_key_depends_on_pages_order_and_scan_flag():
+    assert make_key(["a", "b"]) == make_key(["a", "b"], scan=False)
+    assert make_key(["a", "b"]) != make_key(["b", "a"])
+    assert make_key(["a", "b"]) != make_key(["a", "b"], scan=True)
+    assert make_key(["ab"]) != make_key(["a", "b"])
+
+
+def test_lru_eviction_and_persistence(tmp_path):
+    path = str(tmp_path / "pdf_cache.sqlite3")
+    cache = PdfCache(path, maxsize=2)
+    cache.set("a", "file-a")
+    cache.set("b", "file-b")
+    assert cache.get("a") == "file-a"  # a endi eng yangi
+    cache.set("c", "file-c")  # b chiqariladi (xotiradan ham, fayldan ham)
+
+    assert cache.get("b") is None
+    assert cache.get_stats()["evicted"] == 1
+    cache.close()
+
+    # Restartdan keyin ham; kichikroq maxsize bilan eng yaqinda ishlatilganlari qoladi
+    qayta = PdfCache(path, maxsize=1)
+    assert len(qayta) == 1
+    assert qayta.get("c") == "file-c"
+    assert qayta.get("a") is None
+    qayta.delete("c")
+    qayta.close()
+    assert PdfCache(path, maxsize=2).get("c") is None
+
+
+class _Query:
+    def __init__(self, yuborish_xatosi=None):
+        self.yuborilgan = []
+        self.matnlar = []
+        self.ochirildi = False
+        self._xato = yuborish_xatosi
+        self.message = SimpleNamespace(reply_document=self._reply_document, reply_text=self._reply_text)
+
+    async def _reply_document(self, document, filename, caption):
+        if self._xato:
+            raise self._xato
+        self.yuborilgan.append((document, filename))
+        return SimpleNamespace(document=SimpleNamespace(file_id=document))
+
+    async def _reply_text(self, text, reply_markup=None):
+        self.matnlar.append(text)
+
+    async def delete_message(self):
+        self.ochirildi = True
+
+
+def _context(tmp_path, pages, **bot_data):
+    cache = PdfCache(str(tmp_path / "pdf_cache.sqlite3"), maxsize=10)
+    user_data = {'language': 'en', 'pdf_pages': pages, 'pdf_bytes': 1000, 'waiting_for_image': True}
+    # pdf_pool berilmasa: yig'ishga o'tilsa KeyError bo'ladi
+    return SimpleNamespace(user_data=user_data, bot_data={'pdf_cache': cache, **bot_data}), cache
+
+
+def test_pdf_done_resends_cached_file_id_without_building(tmp_path):
+    pages = [("file-1", "uniq-1"), ("file-2", "uniq-2")]
+    context, cache = _context(tmp_path, pages)
+    cache.set(make_key(["uniq-1", "uniq-2"]), "cached-pdf")
+    query = _Query()
+    update = SimpleNamespace(callback_query=query, effective_user=SimpleNamespace(id=7))
+
+    asyncio.run(image_to_pdf.pdf_done(update, context))
+
+    assert query.yuborilgan == [("cached-pdf", "rasm.pdf")]
+    assert query.ochirildi
+    assert context.user_data['pdf_pages'] == [] and context.user_data['pdf_bytes'] == 0
+    assert context.user_data['waiting_for_image'] is True
+    assert cache.get_stats()["hit"] == 1
+
+
+def test_pdf_done_drops_stale_cached_file_id(tmp_path):
+    pages = [("file-1", "uniq-1")]
+    band_pool = SimpleNamespace(is_full=lambda user_id: True)
+    context, cache = _context(tmp_path, pages, pdf_pool=band_pool)
+    key = make_key(["uniq-1"])
+    cache.set(key, "eskirgan")
+    query = _Query(yuborish_xatosi=BadRequest("Wrong file identifier"))
+    xabarlar = []
+
+    async def reply_text(text):
+        xabarlar.append(text)
+
+    update = SimpleNamespace(
+        callback_query=query, effective_user=SimpleNamespace(id=7),
+        effective_message=SimpleNamespace(reply_text=reply_text)
+    )
+    asyncio.run(image_to_pdf.pdf_done(update, context))
+
+    assert cache.get(key) is None
+    assert cache.get_stats()["invalid"] == 1
+    # Yig'ish (bu yerda - band) ga o'tdi, sahifalar joyida
+    assert xabarlar and xabarlar[0].startswith("⏳")
+    assert context.user_data['pdf_pages'] == pages
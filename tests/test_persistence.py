@@ -0,0 +1,61 @@
+import asyncio
+from copy import deepcopy
+
+from utils.persistence import SQLitePersistence
+from utils.user_state import UserState
+
+
+async def _load(path, user_id):
+    persistence = SQLitePersistence(path)
+    state = UserState()
+    await persistence.refresh_user_data(user_id, state)
+    await persistence.flush()
+    return state
+
+
+def test_evicted_user_returning_before_persistence_run_is_saved(tmp_path):
+    path = str(tmp_path / "users.sqlite3")
+
+    async def run():
+        persistence = SQLitePersistence(path)
+        state = UserState()
+        await persistence.refresh_user_data(1, state)
+        state['language'] = 'en'
+        await persistence.update_user_data(1, state)
+
+        # Sessiya xotiradan chiqarildi (app.drop_user_data - keyingi update_persistence da)
+        await persistence.evict_user_data(1, deepcopy(state))
+
+        # Shu orada foydalanuvchi qaytib, tilni o'zgartirdi
+        qaytgan = UserState()
+        await persistence.refresh_user_data(1, qaytgan)
+        assert qaytgan['language'] == 'en'
+        qaytgan['language'] = 'uz_kiril'
+
+        # PTB: update_ids -= delete_ids - faqat drop chaqiriladi
+        await persistence.drop_user_data(1)
+        await persistence.flush()
+
+    asyncio.run(run())
+    assert asyncio.run(_load(path, 1))['language'] == 'uz_kiril'
+
+
+def test_eviction_keeps_row_and_real_drop_deletes_it(tmp_path):
+    path = str(tmp_path / "users.sqlite3")
+
+    async def run():
+        persistence = SQLitePersistence(path)
+        holatlar = {}
+        for user_id in (1, 2):
+            state = holatlar[user_id] = UserState()
+            await persistence.refresh_user_data(user_id, state)
+            state['language'] = 'en'
+            await persistence.update_user_data(user_id, state)
+        await persistence.evict_user_data(1, deepcopy(holatlar[1]))
+        await persistence.drop_user_data(1)
+        await persistence.drop_user_data(2)
+        await persistence.flush()
+
+    asyncio.run(run())
+    assert 'language' in asyncio.run(_load(path, 1))
+    assert 'language' not in asyncio.run(_load(path, 2))
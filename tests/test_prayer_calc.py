@@ -0,0 +1,95 @@
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from utils.prayer_calc import KOORDINATALAR, calculate_prayer_times, format_vaqt, get_kun_malumoti
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+# Dvigatel regressiyasi: PrayTimes 2.3 (xuddi shu usul) natijalari - Aladhan bilan moslik emas
+ENGINE_FIXTURE = os.path.join(FIXTURES, 'engine_timings.json')
+# Haqiqiy Aladhan javoblari (python -m tests.record_aladhan) - yozib olinganda moslik testi ishlaydi
+ALADHAN_FIXTURE = os.path.join(FIXTURES, 'aladhan_timings.json')
+
+# Bizning kalit -> Aladhan timings kaliti
+VAQTLAR = {
+    'bomdod': 'Fajr',
+    'quyosh': 'Sunrise',
+    'peshin': 'Dhuhr',
+    'asr': 'Asr',
+    'shom': 'Maghrib',
+    'xufton': 'Isha'
+}
+
+HAFTA_KUNLARI = {
+    'Monday': 'Dushanba', 'Tuesday': 'Seshanba', 'Wednesday': 'Chorshanba',
+    'Thursday': 'Payshanba', 'Friday': 'Juma', 'Saturday': 'Shanba', 'Sunday': 'Yakshanba'
+}
+
+
+def _cases(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['cases']
+
+
+ENGINE_CASES = _cases(ENGINE_FIXTURE)
+ALADHAN_CASES = _cases(ALADHAN_FIXTURE)
+aladhan_yozilgan = pytest.mark.skipif(
+    not ALADHAN_CASES, reason="aladhan_timings.json yo'q - python -m tests.record_aladhan"
+)
+
+
+def _case_id(case):
+    return f"{case['city']}-{case['date']}"
+
+
+def _daqiqa(vaqt: str) -> int:
+    soat, daqiqa = vaqt[:5].split(':')
+    return int(soat) * 60 + int(daqiqa)
+
+
+def _check_times(case, tolerance: int):
+    sana = datetime.strptime(case['date'], '%d-%m-%Y').date()
+    lat, lon = KOORDINATALAR[case['city']]
+    vaqtlar = calculate_prayer_times(lat, lon, sana)
+    timings = case['response']['data']['timings']
+
+    for kalit, nom in VAQTLAR.items():
+        farq = abs(_daqiqa(format_vaqt(vaqtlar[kalit])) - _daqiqa(timings[nom]))
+        assert min(farq, 1440 - farq) <= tolerance, f"{kalit}: {format_vaqt(vaqtlar[kalit])} != {timings[nom]}"
+
+
+def _check_date_strings(case):
+    sana = datetime.strptime(case['date'], '%d-%m-%Y').date()
+    kun = get_kun_malumoti(sana)
+    date = case['response']['data']['date']
+    hijri = date['hijri']
+
+    assert kun['sana'] == date['readable']
+    assert kun['hafta_kuni'] == HAFTA_KUNLARI[date['gregorian']['weekday']['en']]
+    assert kun['hijriy'] == f"{hijri['day']} {hijri['month']['en']} {hijri['year']}"
+
+
+@pytest.mark.parametrize('case', ENGINE_CASES, ids=_case_id)
+def test_times_match_engine_reference(case):
+    _check_times(case, tolerance=0)
+
+
+@pytest.mark.parametrize('case', ENGINE_CASES, ids=_case_id)
+def test_date_strings_match_engine_reference(case):
+    _check_date_strings(case)
+
+
+@aladhan_yozilgan
+@pytest.mark.parametrize('case', ALADHAN_CASES or [None], ids=lambda c: _case_id(c) if c else "none")
+def test_times_match_aladhan(case):
+    _check_times(case, tolerance=1)
+
+
+@aladhan_yozilgan
+@pytest.mark.parametrize('case', ALADHAN_CASES or [None], ids=lambda c: _case_id(c) if c else "none")
+def test_date_strings_match_aladhan(case):
+    _check_date_strings(case)
@@ -0,0 +1,58 @@
+import asyncio
+from types import SimpleNamespace
+
+from utils.router import CallbackRouter
+
+
+class _Query:
+    def __init__(self, data):
+        self.data = data
+        self.answers = 0
+
+    async def answer(self):
+        self.answers += 1
+
+
+def _router(chaqirilgan):
+    def handler(nom):
+        async def handle(update, context):
+            chaqirilgan.append(nom)
+        return handle
+
+    router = CallbackRouter(fallback=handler("fallback"))
+    router.exact("iftar", handler("iftar"))
+    router.prefix("iftar_", handler("iftar_"))
+    router.prefix("i", handler("i"))
+    router.exact("pdf_done", handler("pdf_done"))
+    router.prefix("pdf_", handler("pdf_"))
+    return router
+
+
+def _dispatch(router, data):
+    query = _Query(data)
+    asyncio.run(router.dispatch(SimpleNamespace(callback_query=query), None))
+    return query
+
+
+def test_exact_before_prefix_and_longest_prefix():
+    chaqirilgan = []
+    router = _router(chaqirilgan)
+
+    assert router.resolve("iftar")[0] == "iftar"  # "i" va "iftar_" dan oldin
+    assert router.resolve("iftar_toshkent")[0] == "iftar_*"  # "i*" emas
+    assert router.resolve("ixtiyoriy")[0] == "i*"
+    assert router.resolve("pdf_done")[0] == "pdf_done"
+    assert router.resolve("pdf_scan")[0] == "pdf_*"
+    assert router.resolve("noma'lum")[0] is None
+
+    for data in ("iftar", "iftar_toshkent", "pdf_scan", "noma'lum"):
+        assert _dispatch(router, data).answers == 1  # har bosishga bitta answer()
+    assert chaqirilgan == ["iftar", "iftar_", "pdf_", "fallback"]
+    assert set(router.get_stats()) == {"iftar", "iftar_*", "pdf_*", "fallback"}
+
+
+def test_no_fallback_still_answers_once():
+    router = CallbackRouter()
+    query = _dispatch(router, "yoq")
+    assert query.answers == 1
+    assert router.get_stats() == {}
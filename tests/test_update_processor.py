@@ -0,0 +1,69 @@
+import asyncio
+
+from telegram import Update
+
+from tests.fake_telegram import message_update
+from utils.update_processor import ChatOrderedProcessor
+
+
+def test_backlog_beyond_limit_is_counted_and_chat_order_kept():
+    async def run():
+        processor = ChatOrderedProcessor(concurrency=2, queue_limit=4)
+        ochiq = asyncio.Event()
+        tartib = {}
+
+        async def handler(user_id, n):
+            await ochiq.wait()
+            tartib.setdefault(user_id, []).append(n)
+
+        # PTB kabi: har bir update uchun darhol task
+        tasks = []
+        for n in range(20):
+            user_id = n % 3
+            update = Update.de_json(message_update(n, user_id, "salom"), None)
+            tasks.append(asyncio.create_task(processor.process_update(update, handler(user_id, n))))
+        await asyncio.sleep(0.05)
+
+        stats = processor.get_stats()
+        assert stats["pending"] == 20  # PTB semaforida kutayotganlari ham
+        assert stats["admitted"] == 4  # queue_limit
+        assert stats["waiting_admission"] == 16
+        assert stats["running"] == 2  # concurrency
+
+        ochiq.set()
+        await asyncio.gather(*tasks)
+        stats = processor.get_stats()
+        assert stats["pending"] == 0 and stats["max_pending"] == 20 and stats["processed"] == 20
+        assert stats["queue_wait"]["count"] == 20
+        for user_id, raqamlar in tartib.items():
+            assert raqamlar == sorted(raqamlar)
+
+    asyncio.run(run())
+
+
+def test_room_freed_wakes_when_an_update_finishes():
+    async def run():
+        processor = ChatOrderedProcessor(concurrency=1, queue_limit=2)
+        ochiq = asyncio.Event()
+
+        async def handler():
+            await ochiq.wait()
+
+        tasks = [
+            asyncio.create_task(processor.process_update(
+                Update.de_json(message_update(n, n, "salom"), None), handler()
+            ))
+            for n in range(2)
+        ]
+        await asyncio.sleep(0)
+        assert processor.pending == processor.max_concurrent_updates
+
+        kutish = asyncio.create_task(processor.room_freed())
+        await asyncio.sleep(0.01)
+        assert not kutish.done()
+
+        ochiq.set()
+        await asyncio.wait_for(kutish, 1)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
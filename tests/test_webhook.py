@@ -0,0 +1,86 @@
+import asyncio
+import logging
+
+import aiohttp
+import pytest
+
+pytest.importorskip("tornado")  # python-telegram-bot[webhooks]
+
+import bot  # noqa: E402
+from config import BOT_TOKEN, WEBHOOK_SECRET  # noqa: E402
+from telegram.ext import Application, ApplicationBuilder  # noqa: E402
+from tests.fake_telegram import FakeTelegram, message_update  # noqa: E402
+
+
+class _FakeApiApplication:
+    """bot.Application o'rniga: builder soxta Bot API manziliga ulanadi"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def builder(self):
+        return ApplicationBuilder().base_url(self.base_url)
+
+
+async def _wait_for(predicate, timeout=5):
+    oxiri = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > oxiri:
+            return False
+        await asyncio.sleep(0.02)
+    return True
+
+
+def test_webhook_secret_and_dispatch(monkeypatch, caplog):
+    caplog.set_level(logging.INFO)
+
+    async def run():
+        telegram = FakeTelegram()
+        await telegram.start()
+        monkeypatch.setattr(bot, "Application", _FakeApiApplication(telegram.base_url))
+
+        app = bot.build_application()
+        assert isinstance(app, Application)
+        options = bot.webhook_options()
+        url = f"http://127.0.0.1:{options['port']}/{options['url_path']}"
+
+        await app.initialize()
+        await app.post_init(app)
+        await app.updater.start_webhook(**options)
+        await app.start()
+        try:
+            # Webhook Telegram da secret bilan ro'yxatdan o'tdi
+            (set_webhook,) = telegram.methods("setWebhook")
+            assert set_webhook["url"] == options["webhook_url"]
+            assert set_webhook["secret_token"] == WEBHOOK_SECRET
+
+            async with aiohttp.ClientSession() as session:
+                # Noto'g'ri secret - rad etiladi, handler ishlamaydi
+                async with session.post(
+                    url, json=message_update(1, 42, "/start"),
+                    headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"}
+                ) as response:
+                    assert response.status == 403
+                async with session.post(url, json=message_update(2, 42, "/start")) as response:
+                    assert response.status == 403
+                await asyncio.sleep(0.2)
+                assert not telegram.methods("sendMessage")
+
+                # To'g'ri secret - /start handleriga yetib boradi
+                async with session.post(
+                    url, json=message_update(3, 42, "/start"),
+                    headers={"X-Telegram-Bot-Api-Secret-Token": WEBHOOK_SECRET}
+                ) as response:
+                    assert response.status == 200
+                assert await _wait_for(lambda: telegram.methods("sendMessage"))
+                assert int(telegram.methods("sendMessage")[0]["chat_id"]) == 42
+        finally:
+            await app.updater.stop()
+            await app.stop()
+            await app.shutdown()
+            await app.post_shutdown(app)
+            await telegram.stop()
+
+    asyncio.run(run())
+    # Bot API URL lari (bot<TOKEN>) loglarga tushmaydi
+    assert BOT_TOKEN not in caplog.text
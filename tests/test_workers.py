@@ -0,0 +1,62 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utils.workers import WorkerPool
+
+
+def test_cancelled_waiter_popped_by_another_release_does_not_break_the_pool():
+    async def run():
+        pool = WorkerPool("test", workers=1, queue_limit=4)
+        ochiq = threading.Event()
+        try:
+            birinchi = asyncio.create_task(pool.run(1, ochiq.wait))
+            await asyncio.sleep(0.01)
+            ikkinchi = asyncio.create_task(pool.run(2, lambda: "ikkinchi"))
+            await asyncio.sleep(0.01)
+            assert pool.get_stats()["queued"] == 1
+
+            # 1-ish threadda tugaydi va uning natijasi loop navbatiga tushadi...
+            ochiq.set()
+            time.sleep(0.05)
+            await asyncio.sleep(0)
+            # ...shu tickda navbatdagi 2-ish bekor qilinadi
+            ikkinchi.cancel()
+
+            assert await birinchi is True
+            with pytest.raises(asyncio.CancelledError):
+                await ikkinchi
+            stats = pool.get_stats()
+            assert (stats["running"], stats["queued"], pool._active) == (0, 0, {})
+            assert await asyncio.wait_for(pool.run(3, lambda: "ok"), 1) == "ok"
+        finally:
+            pool.shutdown()
+
+    asyncio.run(run())
+
+
+def test_cancelled_running_job_keeps_its_slot_until_the_thread_finishes():
+    async def run():
+        pool = WorkerPool("test", workers=1, queue_limit=4)
+        ochiq = threading.Event()
+        try:
+            task = asyncio.create_task(pool.run(1, ochiq.wait))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert pool.get_stats()["running"] == 1  # thread hali ishlayapti
+
+            keyingi = asyncio.create_task(pool.run(2, lambda: "ok"))
+            await asyncio.sleep(0.01)
+            assert not keyingi.done()
+
+            ochiq.set()
+            assert await asyncio.wait_for(keyingi, 1) == "ok"
+            assert pool.get_stats()["running"] == 0
+        finally:
+            pool.shutdown()
+
+    asyncio.run(run())
@@ -0,0 +1,134 @@
+import json
+import logging
+import os
+from datetime import date, datetime
+
+from config import DATA_DIR
+from utils.http_client import get_json, safe_error
+from utils.prayer_calc import HAFTA_KUNLARI, KOORDINATALAR
+from utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_URL = "http://api.aladhan.com/v1/calendarByCity"
+CALENDAR_DIR = os.path.join(DATA_DIR, "calendar")
+
+# Aladhan kalitlari -> bizning kalitlar
+NAMOZ_KALITLARI = {
+    "Fajr": "bomdod",
+    "Sunrise": "quyosh",
+    "Dhuhr": "peshin",
+    "Asr": "asr",
+    "Maghrib": "shom",
+    "Isha": "xufton"
+}
+
+# Yuklangan oylar: (shahar, yil, oy) -> {ISO sana: kun}
+_oylar = {}
+
+_flight = SingleFlight("calendar")
+
+
+def month_path(api_nom: str, yil: int, oy: int) -> str:
+    return os.path.join(CALENDAR_DIR, f"{yil}-{oy:02d}", f"{api_nom}.json")
+
+
+def normalize_day(day: dict) -> tuple:
+    """Aladhan kalendar kunini get_timings sxemasiga o'tkazish"""
+    sana = datetime.strptime(day["date"]["gregorian"]["date"], "%d-%m-%Y").date()
+    hijri = day["date"]["hijri"]
+    timings = day["timings"]
+
+    kun = {
+        "sana": day["date"]["readable"],
+        "hafta_kuni": HAFTA_KUNLARI[sana.weekday()],
+        "hijriy": f"{hijri['day']} {hijri['month']['en']} {hijri['year']}"
+    }
+    for api_kalit, kalit in NAMOZ_KALITLARI.items():
+        kun[kalit] = timings[api_kalit][:5]
+    return sana.isoformat(), kun
+
+
+async def ingest_month(api_nom: str, yil: int, oy: int) -> dict:
+    """Bitta shahar uchun butun oyni bitta so'rovda olish va saqlash"""
+    params = {
+        "city": api_nom,
+        "country": "Uzbekistan",
+        "method": 2,  # Muslim World League
+        "school": 1,  # Hanafi
+        "month": oy,
+        "year": yil
+    }
+    data = await get_json(CALENDAR_URL, params=params)
+    if data.get("code") != 200:
+        raise RuntimeError(f"Aladhan xatolik: {data.get('status')}")
+
+    kunlar = dict(normalize_day(day) for day in data["data"])
+
+    path = month_path(api_nom, yil, oy)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(kunlar, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+    _oylar[(api_nom, yil, oy)] = kunlar
+    logger.info("📅 %s %d-%02d kalendari saqlandi (%d kun)", api_nom, yil, oy, len(kunlar))
+    return kunlar
+
+
+async def ingest_missing(yil: int, oy: int) -> int:
+    """
+    Saqlanmagan shaharlar uchun oyni yuklash (har shahar uchun 1 so'rov).
+    Bitta shahar yuklanmasa qolganlari davom etadi; yuklanganlar soni qaytariladi.
+    """
+    soni = 0
+    for api_nom in KOORDINATALAR:
+        if os.path.exists(month_path(api_nom, yil, oy)):
+            continue
+        kalit = (api_nom, yil, oy)
+        try:
+            await _flight.do(kalit, lambda: ingest_month(api_nom, yil, oy))
+        except Exception as e:
+            logger.warning(f"📅 {api_nom} {yil}-{oy:02d} kalendari yuklanmadi: {safe_error(e)}")
+            continue
+        soni += 1
+    return soni
+
+
+def load_day(api_nom: str, sana: date):
+    """Saqlangan kalendardan kun ma'lumoti (yo'q bo'lsa None)"""
+    kalit = (api_nom, sana.year, sana.month)
+    kunlar = _oylar.get(kalit)
+    if kunlar is None:
+        path = month_path(*kalit)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                kunlar = json.load(f)
+        except Exception as e:
+            logger.error(f"Kalendar fayli o'qilmadi ({path}): {e}")
+            return None
+        _oylar[kalit] = kunlar
+    return kunlar.get(sana.isoformat())
+
+
+if __name__ == "__main__":
+    # Oflayn yuklash: python -m utils.calendar_ingest 2026 3
+    import asyncio
+    import sys
+    from utils.http_client import close_http
+
+    logging.basicConfig(level=logging.INFO)
+    bugungi = date.today()
+    yil = int(sys.argv[1]) if len(sys.argv) > 1 else bugungi.year
+    oy = int(sys.argv[2]) if len(sys.argv) > 2 else bugungi.month
+
+    async def _main():
+        try:
+            print(f"{await ingest_missing(yil, oy)} ta shahar yuklandi")
+        finally:
+            await close_http()
+
+    asyncio.run(_main())
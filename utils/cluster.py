@@ -0,0 +1,276 @@
+import asyncio
+import hmac
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from aiohttp import web
+from telegram import Update
+
+from config import (
+    BOT_TOKEN, RUN_MODE, UPDATE_QUEUE_LIMIT, WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_LISTEN,
+    WEBHOOK_PORT, WEBHOOK_SECRET, WEBHOOK_MAX_CONNECTIONS
+)
+from utils.http_client import init_http, close_http, get_json, safe_error
+
+logger = logging.getLogger(__name__)
+
+API_URL = f"https://api.telegram.org/bot{BOT_TOKEN}"
+POLL_TIMEOUT = 50  # getUpdates long polling (soniya)
+
+
+async def _api(method: str, params: dict = None, timeout: float = None):
+    """Bot API chaqiruvi. Xato matnidan URL (ichida token) olib tashlanadi"""
+    try:
+        return await get_json(f"{API_URL}/{method}", params=params, timeout=timeout)
+    except Exception as e:
+        raise RuntimeError(f"{method}: {safe_error(e)}") from None
+
+
+def user_of(raw: dict):
+    """Xom update (JSON) dan foydalanuvchi id si: message.from, callback_query.from, ..."""
+    for key, value in raw.items():
+        if key == "update_id" or not isinstance(value, dict):
+            continue
+        kimdan = value.get("from") or value.get("user")
+        if isinstance(kimdan, dict) and "id" in kimdan:
+            return kimdan["id"]
+        chat = value.get("chat")
+        if isinstance(chat, dict) and "id" in chat:
+            return chat["id"]
+    return None
+
+
+def shard_for(user_id, workers: int) -> int:
+    """Foydalanuvchi doim bitta workerga tushadi (holati va navbati o'sha jarayonda)"""
+    if user_id is None:
+        return 0
+    return user_id % workers
+
+
+class Dispatcher:
+    """
+    Update larni foydalanuvchi id si bo'yicha worker jarayonlarga taqsimlash.
+    Har shardning o'z buferi va uzatuvchi (feeder) taski bor: sekin worker faqat o'z
+    shardini to'xtatadi. Bufer to'lsagina route() kutadi (polling ham sekinlashadi).
+    """
+
+    def __init__(self, workers: int, target=None, args: tuple = ()):
+        self.workers = workers
+        self._target = target or worker_main
+        self._args = args
+        self._ctx = multiprocessing.get_context("spawn")
+        self._queues = [self._ctx.Queue(maxsize=UPDATE_QUEUE_LIMIT) for _ in range(workers)]
+        self._buffers = []  # asyncio.Queue lar - start() da (event loop ichida)
+        self._feeders = []
+        self._executor = None
+        self._procs = [None] * workers
+        self.stats = {"routed": [0] * workers, "backpressure": 0, "restarted": 0}
+
+    def _start_worker(self, index: int):
+        # WORKER_INDEX config.py da o'qiladi (spawn - yangi interpreter)
+        eski = os.environ.get('WORKER_INDEX')
+        os.environ['WORKER_INDEX'] = str(index)
+        try:
+            proc = self._ctx.Process(
+                target=self._target, args=(index, self._queues[index], *self._args),
+                name=f"taqvim-worker-{index}"
+            )
+            proc.start()
+        finally:
+            if eski is None:
+                os.environ.pop('WORKER_INDEX', None)
+            else:
+                os.environ['WORKER_INDEX'] = eski
+        self._procs[index] = proc
+
+    def start(self):
+        """Workerlar va ularning feeder tasklari (event loop ichida chaqiriladi)"""
+        # Har shardga bitta oqim: bloklovchi put lar bir-birini kutmaydi
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="taqvim-feeder")
+        self._buffers = [asyncio.Queue(maxsize=UPDATE_QUEUE_LIMIT) for _ in range(self.workers)]
+        for index in range(self.workers):
+            self._start_worker(index)
+        self._feeders = [asyncio.create_task(self._feed(index)) for index in range(self.workers)]
+        logger.info("🧩 %d ta worker jarayon ishga tushdi", self.workers)
+
+    async def route(self, raw: dict):
+        index = shard_for(user_of(raw), self.workers)
+        bufer = self._buffers[index]
+        try:
+            bufer.put_nowait(raw)
+        except asyncio.QueueFull:
+            self.stats["backpressure"] += 1
+            await bufer.put(raw)
+        self.stats["routed"][index] += 1
+
+    async def _feed(self, index: int):
+        """Shard buferidan worker navbatiga, kelgan tartibida. None - to'xtash belgisi"""
+        bufer = self._buffers[index]
+        navbat = self._queues[index]
+        loop = asyncio.get_running_loop()
+        while True:
+            raw = await bufer.get()
+            while True:
+                if not self._procs[index].is_alive():
+                    if raw is None:
+                        return
+                    logger.error("🧩 Worker %d to'xtab qolgan - qayta ishga tushirilmoqda", index)
+                    self.stats["restarted"] += 1
+                    self._start_worker(index)
+                try:
+                    navbat.put_nowait(raw)
+                    break
+                except queue.Full:
+                    pass
+                try:
+                    # Timeout - navbat to'la turganda worker o'lib qolsa ham sezish uchun
+                    await loop.run_in_executor(self._executor, partial(navbat.put, raw, timeout=1))
+                    break
+                except queue.Full:
+                    continue
+            if raw is None:
+                return
+
+    async def close(self, timeout: float = 30):
+        """Buferdagilar workerlarga yetkaziladi, workerlar navbatini bajarib o'zlari yopiladi"""
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.wait_for(self._drain(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("🧩 Buferlar %ss da bo'shamadi", timeout)
+            for feeder in self._feeders:
+                feeder.cancel()
+
+        for proc in self._procs:
+            if proc is None:
+                continue
+            await loop.run_in_executor(None, proc.join, timeout)
+            if proc.is_alive():
+                logger.warning("🧩 %s to'xtamadi - majburan yopilmoqda", proc.name)
+                proc.terminate()
+                await loop.run_in_executor(None, proc.join)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        logger.info("🧩 Klaster to'xtadi: %s", self.stats)
+
+    async def _drain(self):
+        for bufer in self._buffers:
+            await bufer.put(None)
+        await asyncio.gather(*self._feeders, return_exceptions=True)
+
+
+async def _poll(dispatcher: Dispatcher):
+    """getUpdates (long polling) - bitta jarayon o'qiydi, workerlarga taqsimlaydi"""
+    await _api("deleteWebhook")
+    offset = None
+    while True:
+        params = {"timeout": POLL_TIMEOUT}
+        if offset is not None:
+            params["offset"] = offset
+        try:
+            javob = await _api("getUpdates", params=params, timeout=POLL_TIMEOUT + 10)
+        except RuntimeError as e:
+            logger.warning(f"Bot API xatosi: {e}")
+            await asyncio.sleep(3)
+            continue
+        for raw in javob.get("result", []):
+            offset = raw["update_id"] + 1
+            await dispatcher.route(raw)
+
+
+async def _serve_webhook(dispatcher: Dispatcher):
+    """Webhook qabul qiluvchi: secret tekshiriladi, update workerga uzatiladi"""
+    secret = WEBHOOK_SECRET.encode()
+
+    async def handle(request):
+        token = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "").encode()
+        if not hmac.compare_digest(token, secret):
+            return web.Response(status=403)
+        try:
+            raw = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+        await dispatcher.route(raw)
+        return web.Response()
+
+    server = web.Application()
+    server.router.add_post(f"/{WEBHOOK_PATH.strip('/')}", handle)
+    runner = web.AppRunner(server)
+    await runner.setup()
+    await web.TCPSite(runner, WEBHOOK_LISTEN, WEBHOOK_PORT).start()
+    try:
+        await _api("setWebhook", params={
+            "url": WEBHOOK_URL,
+            "secret_token": WEBHOOK_SECRET,
+            "max_connections": WEBHOOK_MAX_CONNECTIONS
+        })
+        logger.info("🌐 Webhook: %s:%d/%s", WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH)
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def _main(workers: int):
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    dispatcher = Dispatcher(workers)
+    dispatcher.start()
+    await init_http()
+    try:
+        if RUN_MODE == 'webhook':
+            await _serve_webhook(dispatcher)
+        else:
+            await _poll(dispatcher)
+    finally:
+        await close_http()
+        await dispatcher.close()
+
+
+def run_cluster(workers: int):
+    """Dispatcher (shu jarayon) + `workers` ta worker jarayon"""
+    try:
+        asyncio.run(_main(workers))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+def worker_main(index: int, updates) -> None:
+    """Worker jarayon: dispatcher yuborgan update larni odatiy Application bilan bajarish"""
+    # To'xtatishni dispatcher boshqaradi (None belgisi) - navbatdagilar yo'qolmaydi
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    asyncio.run(_worker(index, updates))
+
+
+async def _worker(index: int, updates):
+    from bot import build_application  # bot.py bu modulni import qiladi
+
+    app = build_application(updater=False)
+    loop = asyncio.get_running_loop()
+    await app.initialize()
+    if app.post_init is not None:
+        await app.post_init(app)
+    await app.start()
+    logger.info("🧩 Worker %d ishga tushdi (pid %d)", index, os.getpid())
+
+    processor = app.update_processor
+    try:
+        while True:
+            # Processor to'la bo'lsa olmaymiz: ortiqchasi cheklangan navbatda qoladi va
+            # dispatcher shu shard uchun kutadi (PTB o'zi rad etmaydi)
+            while processor.pending + app.update_queue.qsize() >= processor.max_concurrent_updates:
+                await processor.room_freed()
+            raw = await loop.run_in_executor(None, updates.get)
+            if raw is None:
+                break
+            await app.update_queue.put(Update.de_json(raw, app.bot))
+    finally:
+        await app.stop()
+        await app.shutdown()
+        if app.post_shutdown is not None:
+            await app.post_shutdown(app)
+        logger.info("🧩 Worker %d to'xtadi", index)
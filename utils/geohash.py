@@ -0,0 +1,86 @@
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(BASE32)}
+
+
+def encode(lat: float, lon: float, precision: int = 6) -> str:
+    """Koordinatalarni geohash satriga o'girish"""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    natija = []
+    bit = 0
+    ch = 0
+    even = True
+    while len(natija) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                ch = (ch << 1) | 1
+                lon_lo = mid
+            else:
+                ch <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch = (ch << 1) | 1
+                lat_lo = mid
+            else:
+                ch <<= 1
+                lat_hi = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            natija.append(BASE32[ch])
+            bit = 0
+            ch = 0
+    return "".join(natija)
+
+
+def bbox(geohash: str):
+    """Katak chegaralari: (lat_min, lat_max, lon_min, lon_max)"""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+    for c in geohash:
+        n = _DECODE[c]
+        for shift in range(4, -1, -1):
+            b = (n >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                if b:
+                    lon_lo = mid
+                else:
+                    lon_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if b:
+                    lat_lo = mid
+                else:
+                    lat_hi = mid
+            even = not even
+    return lat_lo, lat_hi, lon_lo, lon_hi
+
+
+def center(geohash: str):
+    """Katak markazi (lat, lon)"""
+    lat_lo, lat_hi, lon_lo, lon_hi = bbox(geohash)
+    return (lat_lo + lat_hi) / 2, (lon_lo + lon_hi) / 2
+
+
+def neighbours(geohash: str) -> list:
+    """Atrofdagi 8 ta qo'shni katak"""
+    lat_lo, lat_hi, lon_lo, lon_hi = bbox(geohash)
+    d_lat = lat_hi - lat_lo
+    d_lon = lon_hi - lon_lo
+    lat, lon = (lat_lo + lat_hi) / 2, (lon_lo + lon_hi) / 2
+    natija = []
+    for i in (-1, 0, 1):
+        for j in (-1, 0, 1):
+            if i == 0 and j == 0:
+                continue
+            n_lat = lat + i * d_lat
+            if not -90 <= n_lat <= 90:
+                continue
+            n_lon = (lon + j * d_lon + 180) % 360 - 180
+            natija.append(encode(n_lat, n_lon, len(geohash)))
+    return natija
@@ -0,0 +1,77 @@
+import logging
+
+import aiohttp
+
+from config import BOT_TOKEN, HTTP_LIMIT, HTTP_LIMIT_PER_HOST, HTTP_DNS_TTL, HTTP_KEEPALIVE, HTTP_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Butun bot uchun bitta umumiy sessiya (Application post_init da yaratiladi)
+_session = None
+
+
+async def init_http(app=None):
+    """Umumiy HTTP sessiyani yaratish (Application.post_init)"""
+    global _session
+    if _session is not None and not _session.closed:
+        return
+
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_LIMIT,
+        limit_per_host=HTTP_LIMIT_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_TTL,
+        keepalive_timeout=HTTP_KEEPALIVE
+    )
+    _session = aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+        raise_for_status=True
+    )
+    logger.info("🌐 HTTP sessiya ochildi")
+
+
+async def close_http(app=None):
+    """Umumiy HTTP sessiyani yopish (Application.post_shutdown)"""
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+        logger.info("🌐 HTTP sessiya yopildi")
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Umumiy sessiya (post_init chaqirilmagan bo'lsa - shu yerda yaratiladi)"""
+    if _session is None or _session.closed:
+        await init_http()
+    return _session
+
+
+async def get_json(url: str, params: dict = None, timeout: float = None):
+    """GET so'rov va JSON javob"""
+    session = await get_session()
+    kwargs = {"params": params}
+    if timeout is not None:
+        kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+    async with session.get(url, **kwargs) as response:
+        return await response.json(content_type=None)
+
+
+async def download_to(url: str, out, timeout: float = 60, chunk_size: int = 64 * 1024) -> int:
+    """Faylni bo'laklab yuklab, out ga yozish (butun javob xotirada saqlanmaydi)"""
+    session = await get_session()
+    hajm = 0
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+        async for chunk in response.content.iter_chunked(chunk_size):
+            out.write(chunk)
+            hajm += len(chunk)
+    return hajm
+
+
+def safe_error(e: Exception) -> str:
+    """
+    Log uchun xato matni. aiohttp xatolari URL ni o'z ichiga oladi, Telegram URL larida esa
+    bot tokeni bor - javob xatosida faqat status, qolganlarida token yashiriladi.
+    """
+    if isinstance(e, aiohttp.ClientResponseError):
+        return f"{type(e).__name__}: HTTP {e.status} {e.message}"
+    return f"{type(e).__name__}: {e}".replace(BOT_TOKEN, "***")
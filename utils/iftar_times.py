@@ -1,6 +1,6 @@
-import requests
 import logging
-from datetime import datetime
+from datetime import date
+from utils.timings import get_timings
 
 logger = logging.getLogger(__name__)
 
@@ -40,44 +40,22 @@ IFTORLIK_DUO = {
 }
 
 
-async def get_roza_vaqtlari(viloyat: str):
+async def get_roza_vaqtlari(viloyat: str, sana: date = None):
     try:
         api_nom = API_VILOYATLAR.get(viloyat, "Tashkent")
-
-        url = "http://api.aladhan.com/v1/timingsByCity"
-        params = {
-            "city": api_nom,
-            "country": "Uzbekistan",
-            "method": 2,
-            "school": 1
+        t = await get_timings(api_nom, sana)
+
+        return {
+            "success": True,
+            "viloyat": viloyat,
+            "sana": t["sana"],
+            "hafta_kuni": t["hafta_kuni"],
+            "hijriy": t["hijriy"],
+            "saharlik": t["bomdod"],
+            "iftorlik": t["shom"]
         }
-
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
-
-        if data["code"] == 200:
-            timings = data["data"]["timings"]
-            date = data["data"]["date"]["readable"]
-            hijri = data["data"]["date"]["hijri"]
-            weekday = data["data"]["date"]["hijri"]["weekday"]["en"]
-
-            weekdays = {
-                'Monday': 'Dushanba', 'Tuesday': 'Seshanba', 'Wednesday': 'Chorshanba',
-                'Thursday': 'Payshanba', 'Friday': 'Juma', 'Saturday': 'Shanba', 'Sunday': 'Yakshanba'
-            }
-            weekday_uz = weekdays.get(weekday, weekday)
-
-            return {
-                "success": True,
-                "viloyat": viloyat,
-                "sana": date,
-                "hafta_kuni": weekday_uz,
-                "hijriy": f"{hijri['day']} {hijri['month']['en']} {hijri['year']}",
-                "saharlik": timings["Fajr"][:5],
-                "iftorlik": timings["Maghrib"][:5]
-            }
-        return {"success": False}
-    except:
+    except Exception as e:
+        logger.error(f"Xatolik: {e}")
         return {"success": False}
 
 
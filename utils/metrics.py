@@ -0,0 +1,52 @@
+import bisect
+
+# Kechikish gistogrammasi chegaralari (millisekund)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Oddiy kechikish gistogrammasi (soni, yig'indi, chegaralar bo'yicha)"""
+
+    __slots__ = ("buckets", "counts", "count", "total", "max")
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # oxirgisi - cheksiz
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, p: float) -> float:
+        """Taxminiy persentil (chegara bo'yicha, ms)"""
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return float(self.buckets[i]) if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 2) if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max, 2),
+            "buckets": {
+                (f"<={b}" if i < len(self.buckets) else "inf"): n
+                for i, (b, n) in enumerate(zip(self.buckets + (None,), self.counts))
+                if n
+            }
+        }
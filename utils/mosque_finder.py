@@ -1,78 +1,181 @@
-import aiohttp
 import logging
-from math import radians, sin, cos, sqrt, atan2
+from math import radians, sin, cos, sqrt, atan2, ceil
 from typing import List, Dict
 import asyncio
 
+import numpy as np
+
+from config import (
+    MOSQUE_CACHE_SIZE, MOSQUE_CACHE_TTL, MOSQUE_CACHE_PATH, GEOHASH_ANIQLIGI,
+    MOSQUE_RESULT_TTL, MOSQUE_RESULT_CACHE_SIZE
+)
+from utils import geohash
+from utils.http_client import get_json
+from utils.singleflight import SingleFlight
+from utils.ttl_cache import TTLCache, SharedTTLCache
+
 logger = logging.getLogger(__name__)
 
-# Qidiruv radiusi (metr)
-QIDIRUV_RADIUSI = 3000  # 3 km
+# Qidiruv radiuslari (metr): kichigidan boshlab, k ta masjid topilguncha kengayadi.
+# Qadamlar keskin - qishloqda ham ko'pi bilan 3 ta Overpass so'rovi.
+QIDIRUV_RADIUSLARI = (500, 3000, 10000)
+QIDIRUV_RADIUSI = QIDIRUV_RADIUSLARI[-1]  # eng kattasi - 10 km
+
+# Ro'yxatda ko'rsatiladigan masjidlar soni
+MASJIDLAR_SONI = 5
+
+# Shundan kam nomzodni oddiy Python bilan saralash tezroq (benchmarks/rank_masjidlar.py)
+NUMPY_CHEGARASI = 20
+
+# Bir xil geohash katagi uchun bir vaqtdagi Overpass so'rovlarini birlashtirish
+_overpass_flight = SingleFlight("overpass")
+
+# Geohash katagi -> (qamrab olingan radius, katak atrofidagi masjidlar).
+# SQLite faylida ham: klasterda bir worker olgan natijani boshqalari qayta so'ramaydi
+_cell_cache = SharedTTLCache(MOSQUE_CACHE_PATH, "mosque_cells", MOSQUE_CACHE_SIZE, MOSQUE_CACHE_TTL)
+
+# Foydalanuvchiga ko'rsatilgan natijalar: kalit (~10 m aniqlikdagi nuqta) -> masjidlar.
+# user_data da ro'yxat nusxasi emas, faqat shu kalit saqlanadi. Jarayon ichida qoladi:
+# klasterda foydalanuvchi doim o'z workeriga tushadi (cluster.shard_for).
+_natijalar = TTLCache(MOSQUE_RESULT_CACHE_SIZE, MOSQUE_RESULT_TTL)
+
+
+def save_results(lat: float, lon: float, masjidlar: List[Dict]) -> str:
+    """Natijani keshga qo'yib, kalitini qaytarish"""
+    ref = f"{lat:.4f},{lon:.4f}"
+    _natijalar.set(ref, masjidlar)
+    return ref
+
+
+def get_results(ref) -> List[Dict]:
+    """Kalit bo'yicha natija (eskirgan yoki yo'q bo'lsa - bo'sh ro'yxat)"""
+    if not ref:
+        return []
+    return _natijalar.get(ref, [])
+
+
+async def _fetch_elements(lat: float, lon: float, radius: int = QIDIRUV_RADIUSI) -> List[Dict]:
+    """Overpass API dan nuqta atrofidagi masjidlar (xom elementlar)"""
+    overpass_url = "https://overpass-api.de/api/interpreter"
+
+    query = f"""
+    [out:json][timeout:5];
+    (
+      node["amenity"="place_of_worship"]["religion"="muslim"](around:{radius},{lat},{lon});
+      way["amenity"="place_of_worship"]["religion"="muslim"](around:{radius},{lat},{lon});
+      relation["amenity"="place_of_worship"]["religion"="muslim"](around:{radius},{lat},{lon});
+    );
+    out center tags;
+    """
+
+    data = await get_json(overpass_url, params={"data": query}, timeout=5)
+    return data.get("elements", [])
+
+
+async def _fetch_cell(cell: str, radius: int):
+    """
+    Katak markazi atrofidagi masjidlar. Radius katak yarim diagonaliga kengaytiriladi,
+    shunda katak ichidagi istalgan nuqta uchun radius to'liq qamraladi.
+    """
+    _, lat_max, _, lon_max = geohash.bbox(cell)
+    c_lat, c_lon = geohash.center(cell)
+    yarim_diagonal = calculate_distance(c_lat, c_lon, lat_max, lon_max)
+
+    elements = await _fetch_elements(c_lat, c_lon, radius + ceil(yarim_diagonal))
+
+    candidates = []
+    for element in elements:
+        masjid = element_to_masjid(element)
+        if masjid:
+            candidates.append(masjid)
+
+    entry = (radius, candidates)
+    # Parallel so'rovlar kattaroq radiusli natijani kichigi bilan almashtirmasin
+    eski = _cell_cache.peek(cell)
+    if eski is None or eski[0] <= radius:
+        await _cell_cache.store(cell, entry)
+    return entry
 
 
 async def find_masjid(lat: float, lon: float) -> List[Dict]:
     """
     Joylashuvga eng yaqin masjidlarni topish
     """
+    # Oflayn indeks bo'lsa - Overpass'siz javob
     try:
-        # Overpass API so'rovi
-        overpass_url = "https://overpass-api.de/api/interpreter"
-
-        query = f"""
-        [out:json][timeout:5];
-        (
-          node["amenity"="place_of_worship"]["religion"="muslim"](around:{QIDIRUV_RADIUSI},{lat},{lon});
-          way["amenity"="place_of_worship"]["religion"="muslim"](around:{QIDIRUV_RADIUSI},{lat},{lon});
-        );
-        out body;
-        """
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(overpass_url, params={"data": query}, timeout=5) as response:
-                data = await response.json()
-
-                elements = data.get("elements", [])
-                masjidlar = []
-
-                for element in elements[:15]:
-                    element_lat = element.get("lat")
-                    element_lon = element.get("lon")
-
-                    if not element_lat and "center" in element:
-                        element_lat = element["center"].get("lat")
-                        element_lon = element["center"].get("lon")
-
-                    if element_lat and element_lon:
-                        distance = calculate_distance(lat, lon, element_lat, element_lon)
-
-                        tags = element.get("tags", {})
-                        name = tags.get("name", "🏢 Masjid")
-
-                        address = ""
-                        if "addr:street" in tags:
-                            address += tags["addr:street"]
-                        if "addr:housenumber" in tags:
-                            address += " " + tags["addr:housenumber"]
-                        if "addr:city" in tags:
-                            address += f", {tags['addr:city']}" if address else tags["addr:city"]
-
-                        masjidlar.append({
-                            "name": name,
-                            "lat": element_lat,
-                            "lon": element_lon,
-                            "distance": round(distance),
-                            "address": address or "Manzil mavjud emas"
-                        })
-
-                masjidlar.sort(key=lambda x: x["distance"])
-                return masjidlar[:5]
-
-    except asyncio.TimeoutError:
-        logger.warning("Overpass API timeout")
-        return []
+        from utils.mosque_index import get_index
+        index = get_index()
+        if index is not None:
+            return index.nearest(lat, lon, k=MASJIDLAR_SONI)
     except Exception as e:
-        logger.error(f"Xatolik: {e}")
-        return []
+        logger.error(f"Masjid indeksi xatosi: {e}")
+
+    # Bir katakdagi foydalanuvchilar bitta Overpass natijasini ulashadi,
+    # masofalar esa har bir foydalanuvchining aniq nuqtasidan hisoblanadi
+    cell = geohash.encode(lat, lon, GEOHASH_ANIQLIGI)
+    qoshnilar = geohash.neighbours(cell)
+    # Xotirada yo'q katak va qo'shnilar - fayldan bitta so'rov bilan (thread'da)
+    await _cell_cache.load([cell, *qoshnilar])
+    entry = _cell_cache.get(cell)
+
+    # Kichik radiusdan boshlab, MASJIDLAR_SONI ta topilguncha kengaytirish.
+    # Kengroq so'rov muvaffaqiyatsiz bo'lsa - shu paytgacha topilganlari qaytariladi.
+    masjidlar = []
+    for radius in QIDIRUV_RADIUSLARI:
+        if entry is None or entry[0] < radius:
+            try:
+                entry = await _overpass_flight.do(
+                    (cell, radius), lambda: _fetch_cell(cell, radius)
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"Overpass API timeout ({radius} m)")
+                break
+            except Exception as e:
+                logger.error(f"Overpass xatosi ({radius} m): {type(e).__name__}")
+                break
+
+        # Qo'shni kataklarda keshlangan masjidlar ham hisobga olinadi
+        nomzodlar = {(m["lat"], m["lon"]): m for m in entry[1]}
+        for qoshni in qoshnilar:
+            for m in _cell_cache.peek(qoshni, (0, ()))[1]:
+                nomzodlar.setdefault((m["lat"], m["lon"]), m)
+
+        masjidlar = rank_masjidlar(lat, lon, list(nomzodlar.values()), k=MASJIDLAR_SONI, max_m=radius)
+        if len(masjidlar) >= MASJIDLAR_SONI:
+            break
+
+    return masjidlar
+
+
+def element_to_masjid(element: Dict):
+    """OSM elementidan masjid lug'ati (koordinatasiz bo'lsa None)"""
+    element_lat = element.get("lat")
+    element_lon = element.get("lon")
+
+    if not element_lat and "center" in element:
+        element_lat = element["center"].get("lat")
+        element_lon = element["center"].get("lon")
+
+    if not (element_lat and element_lon):
+        return None
+
+    tags = element.get("tags", {})
+    name = tags.get("name", "🏢 Masjid")
+
+    address = ""
+    if "addr:street" in tags:
+        address += tags["addr:street"]
+    if "addr:housenumber" in tags:
+        address += " " + tags["addr:housenumber"]
+    if "addr:city" in tags:
+        address += f", {tags['addr:city']}" if address else tags["addr:city"]
+
+    return {
+        "name": name,
+        "lat": element_lat,
+        "lon": element_lon,
+        "address": address or "Manzil mavjud emas"
+    }
 
 
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -87,6 +190,53 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return R * c
 
 
+def calculate_distances(lat: float, lon: float, lats, lons) -> np.ndarray:
+    """calculate_distance ning vektorlashtirilgan varianti (metr, NumPy massiv)"""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    delta_lat = lat2 - lat1
+    delta_lon = np.radians(np.asarray(lons, dtype=np.float64) - lon)
+
+    a = np.sin(delta_lat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(delta_lon / 2) ** 2
+    return 2 * 6371000 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def nearest_k(distances: np.ndarray, k: int) -> np.ndarray:
+    """k ta eng kichik masofa indekslari (o'sish tartibida) - to'liq saralashsiz"""
+    if len(distances) > k:
+        idx = np.argpartition(distances, k - 1)[:k]
+    else:
+        idx = np.arange(len(distances))
+    return idx[np.argsort(distances[idx], kind="stable")]
+
+
+def rank_masjidlar(lat: float, lon: float, masjidlar: List[Dict], k: int = 5, max_m: float = None) -> List[Dict]:
+    """Masjidlarni nuqtagacha masofa bo'yicha saralab, k ta eng yaqinini qaytarish"""
+    if not masjidlar:
+        return []
+
+    if len(masjidlar) < NUMPY_CHEGARASI:
+        # Kichik ro'yxatda NumPy massivlarini yaratish hisoblashdan qimmat
+        masofalar = [calculate_distance(lat, lon, m["lat"], m["lon"]) for m in masjidlar]
+        natija = []
+        for i in sorted(range(len(masjidlar)), key=masofalar.__getitem__)[:k]:
+            if max_m is not None and masofalar[i] > max_m:
+                break
+            natija.append({**masjidlar[i], "distance": round(masofalar[i])})
+        return natija
+
+    lats = np.fromiter((m["lat"] for m in masjidlar), dtype=np.float64, count=len(masjidlar))
+    lons = np.fromiter((m["lon"] for m in masjidlar), dtype=np.float64, count=len(masjidlar))
+    distances = calculate_distances(lat, lon, lats, lons)
+
+    natija = []
+    for i in nearest_k(distances, k):
+        if max_m is not None and distances[i] > max_m:
+            break
+        natija.append({**masjidlar[i], "distance": round(float(distances[i]))})
+    return natija
+
+
 def format_masjid_list(masjidlar: List[Dict], lang: str = "uz_latin") -> str:
     """Masjidlar ro'yxatini formatlash (HTML)"""
     if not masjidlar:
@@ -162,4 +312,11 @@ def format_masjid_detail(masjid: Dict, lang: str = "uz_latin") -> str:
 """
     }
 
-    return texts.get(lang, texts['uz_latin']).strip()
\ No newline at end of file
+    return texts.get(lang, texts['uz_latin']).strip()
+
+def get_stats() -> dict:
+    return {
+        "overpass": _overpass_flight.get_stats(),
+        "cell_cache": _cell_cache.get_stats(),
+        "results": _natijalar.get_stats()
+    }
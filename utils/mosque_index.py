@@ -0,0 +1,271 @@
+import json
+import logging
+import os
+import time
+from math import cos, floor, radians
+from typing import Dict, List
+
+import numpy as np
+
+from config import MOSQUE_INDEX_PATH, INDEX_MAX_MASOFA
+from utils.http_client import get_json
+from utils.mosque_finder import element_to_masjid, calculate_distances, nearest_k
+
+logger = logging.getLogger(__name__)
+
+# Panjara katakchasi (gradus) ~ 2.2 km
+KATAK = 0.02
+
+# Metr / gradus (kenglik bo'yicha)
+METR_GRADUS = 111320.0
+
+# Butun O'zbekiston bo'yicha masjidlar (davriy yangilash uchun)
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+UZB_QUERY = """
+[out:json][timeout:180];
+area["ISO3166-1"="UZ"][admin_level=2]->.uz;
+(
+  node["amenity"="place_of_worship"]["religion"="muslim"](area.uz);
+  way["amenity"="place_of_worship"]["religion"="muslim"](area.uz);
+  relation["amenity"="place_of_worship"]["religion"="muslim"](area.uz);
+);
+out center tags;
+"""
+
+# Indeks fayli o'zgarganini tekshirish oralig'i (soniya)
+INDEX_TEKSHIRUV = 60
+
+_index = None
+_index_mtime = None
+_index_checked = None
+
+
+def _cell(lat: float, lon: float):
+    return floor(lat / KATAK), floor(lon / KATAK)
+
+
+class MosqueIndex:
+    """Panjara (grid) bo'yicha guruhlangan masjidlar - k ta eng yaqinini topish"""
+
+    def __init__(self, lat, lon, names, addresses, cell_i, cell_j, cell_start):
+        self.lat = lat
+        self.lon = lon
+        self.names = names
+        self.addresses = addresses
+        # (i, j) katak -> elementlar oralig'i [start, end)
+        self._cells = {
+            (int(i), int(j)): (int(cell_start[n]), int(cell_start[n + 1]))
+            for n, (i, j) in enumerate(zip(cell_i, cell_j))
+        }
+
+    def __len__(self):
+        return len(self.lat)
+
+    def _ring(self, ci: int, cj: int, r: int):
+        """Markazdan r katak uzoqlikdagi (Chebyshev halqasi) elementlar oraliqlari"""
+        if r == 0:
+            cells = [(ci, cj)]
+        else:
+            cells = [(ci + di, cj + dj) for di in (-r, r) for dj in range(-r, r + 1)]
+            cells += [(ci + di, cj + dj) for dj in (-r, r) for di in range(-r + 1, r)]
+        return [self._cells[c] for c in cells if c in self._cells]
+
+    def nearest(self, lat: float, lon: float, k: int = 5, max_m: float = INDEX_MAX_MASOFA) -> List[Dict]:
+        """k ta eng yaqin masjid (max_m metrdan uzoq bo'lmagan)"""
+        ci, cj = _cell(lat, lon)
+        # Halqa r dan tashqaridagi har qanday nuqtagacha eng kam masofa: r * katak
+        katak_m = KATAK * METR_GRADUS * min(1.0, cos(radians(min(abs(lat) + 1, 89))))
+
+        oraliqlar = []
+        r = 0
+        while True:
+            oraliqlar += self._ring(ci, cj, r)
+            chegara = r * katak_m
+            if oraliqlar:
+                idx = np.concatenate([np.arange(a, b) for a, b in oraliqlar])
+                if len(idx) >= k:
+                    d = calculate_distances(lat, lon, self.lat[idx], self.lon[idx])
+                    if np.partition(d, k - 1)[k - 1] <= chegara:
+                        break
+            if chegara > max_m:
+                break
+            r += 1
+
+        if not oraliqlar:
+            return []
+
+        d = calculate_distances(lat, lon, self.lat[idx], self.lon[idx])
+        tartib = nearest_k(d, k)
+        natija = []
+        for n in tartib:
+            if d[n] > max_m:
+                break
+            i = idx[n]
+            natija.append({
+                "name": str(self.names[i]),
+                "lat": float(self.lat[i]),
+                "lon": float(self.lon[i]),
+                "distance": round(float(d[n])),
+                "address": str(self.addresses[i])
+            })
+        return natija
+
+
+def _centroid(coords):
+    lats = [c[0] for c in coords]
+    lons = [c[1] for c in coords]
+    return sum(lats) / len(lats), sum(lons) / len(lons)
+
+
+def _is_mosque(tags: Dict) -> bool:
+    return tags.get("amenity") == "place_of_worship" and tags.get("religion") == "muslim"
+
+
+def parse_osm_json(data: Dict) -> List[Dict]:
+    """
+    OSM JSON (Overpass 'elements' yoki osmium GeoJSON 'features') dan masjidlar.
+    Way/relation koordinatasi: center, geometry yoki fayldagi tugunlar bo'yicha markaz.
+    """
+    masjidlar = []
+
+    if "features" in data:
+        for feature in data["features"]:
+            tags = feature.get("properties") or {}
+            geometry = feature.get("geometry") or {}
+            if not _is_mosque(tags) or not geometry:
+                continue
+            coords = geometry.get("coordinates")
+            if geometry.get("type") == "Point":
+                lat, lon = coords[1], coords[0]
+            elif geometry.get("type") == "Polygon":
+                lat, lon = _centroid([(c[1], c[0]) for c in coords[0]])
+            elif geometry.get("type") == "MultiPolygon":
+                lat, lon = _centroid([(c[1], c[0]) for c in coords[0][0]])
+            else:
+                continue
+            masjid = element_to_masjid({"lat": lat, "lon": lon, "tags": tags})
+            if masjid:
+                masjidlar.append(masjid)
+        return masjidlar
+
+    elements = data.get("elements", [])
+    nodes = {e["id"]: (e["lat"], e["lon"]) for e in elements if e.get("type") == "node" and "lat" in e}
+
+    for element in elements:
+        if not _is_mosque(element.get("tags", {})):
+            continue
+        if "lat" not in element and "center" not in element:
+            if element.get("geometry"):
+                coords = [(p["lat"], p["lon"]) for p in element["geometry"]]
+            else:
+                coords = [nodes[n] for n in element.get("nodes", []) if n in nodes]
+            if not coords:
+                continue
+            lat, lon = _centroid(coords)
+            element = {**element, "center": {"lat": lat, "lon": lon}}
+        masjid = element_to_masjid(element)
+        if masjid:
+            masjidlar.append(masjid)
+    return masjidlar
+
+
+def build_index(masjidlar: List[Dict], path: str = MOSQUE_INDEX_PATH) -> str:
+    """Masjidlar ro'yxatidan panjara indeksini yaratib faylga yozish (atomar)"""
+    lat = np.array([m["lat"] for m in masjidlar], dtype=np.float64)
+    lon = np.array([m["lon"] for m in masjidlar], dtype=np.float64)
+    ci = np.floor(lat / KATAK).astype(np.int32)
+    cj = np.floor(lon / KATAK).astype(np.int32)
+
+    tartib = np.lexsort((cj, ci))
+    ci, cj = ci[tartib], cj[tartib]
+    yangi = np.ones(len(tartib), dtype=bool)
+    yangi[1:] = (ci[1:] != ci[:-1]) | (cj[1:] != cj[:-1])
+    boshlar = np.flatnonzero(yangi)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(
+        tmp,
+        lat=lat[tartib],
+        lon=lon[tartib],
+        names=np.array([masjidlar[i]["name"] for i in tartib], dtype=str),
+        addresses=np.array([masjidlar[i]["address"] for i in tartib], dtype=str),
+        cell_i=ci[boshlar],
+        cell_j=cj[boshlar],
+        cell_start=np.append(boshlar, len(tartib)).astype(np.int32)
+    )
+    os.replace(tmp, path)
+    logger.info("🕌 Masjid indeksi yaratildi: %s (%d ta)", path, len(masjidlar))
+    return path
+
+
+def load_index(path: str = MOSQUE_INDEX_PATH) -> MosqueIndex:
+    with np.load(path) as f:
+        return MosqueIndex(
+            f["lat"], f["lon"], f["names"], f["addresses"],
+            f["cell_i"], f["cell_j"], f["cell_start"]
+        )
+
+
+def _reload_if_changed(force: bool = False):
+    """Fayl o'zgargan bo'lsa (force - baribir) indeksni qayta o'qish"""
+    global _index, _index_mtime
+    try:
+        mtime = os.path.getmtime(MOSQUE_INDEX_PATH)
+    except OSError:
+        _index = _index_mtime = None
+        return
+    if force or mtime != _index_mtime:
+        try:
+            _index = load_index(MOSQUE_INDEX_PATH)
+        except Exception as e:
+            logger.error(f"Masjid indeksi o'qilmadi: {e}")
+            _index = None
+        _index_mtime = mtime
+
+
+def get_index():
+    """
+    Yuklangan indeks (fayl yo'q yoki bo'sh bo'lsa None).
+    Fayl har qidiruvda emas, INDEX_TEKSHIRUV soniyada bir tekshiriladi
+    (klasterda 0-worker yangilagan faylni boshqalari shu bilan ko'radi).
+    """
+    global _index_checked
+    hozir = time.monotonic()
+    if _index_checked is None or hozir - _index_checked >= INDEX_TEKSHIRUV:
+        _index_checked = hozir
+        _reload_if_changed()
+    return _index if _index else None
+
+
+async def refresh_index_job(context=None):
+    """JobQueue vazifasi: Overpass'dan butun O'zbekiston masjidlarini olib, indeksni yangilash"""
+    try:
+        boshlanish = time.perf_counter()
+        data = await get_json(OVERPASS_URL, params={"data": UZB_QUERY}, timeout=200)
+        masjidlar = parse_osm_json(data)
+        if not masjidlar:
+            logger.warning("Overpass bo'sh javob qaytardi - indeks o'zgarmadi")
+            return
+        build_index(masjidlar, MOSQUE_INDEX_PATH)
+        _reload_if_changed(force=True)
+        logger.info("Masjid indeksi yangilandi (%.1f s)", time.perf_counter() - boshlanish)
+    except Exception as e:
+        logger.error(f"Masjid indeksini yangilashda xatolik: {e}")
+
+
+if __name__ == "__main__":
+    # Oflayn import: python -m utils.mosque_index extract.json
+    # (PBF fayl avval GeoJSON ga o'tkaziladi: osmium export uzbekistan.osm.pbf -o extract.geojson)
+    import sys
+    logging.basicConfig(level=logging.INFO)
+
+    if len(sys.argv) < 2:
+        print("Foydalanish: python -m utils.mosque_index <extract.json|extract.geojson>")
+        sys.exit(1)
+    if sys.argv[1].endswith(".pbf"):
+        print("PBF ni avval GeoJSON ga o'tkazing: osmium export <fayl>.osm.pbf -o <fayl>.geojson")
+        sys.exit(1)
+
+    with open(sys.argv[1], encoding="utf-8") as f:
+        build_index(parse_osm_json(json.load(f)))
@@ -0,0 +1,229 @@
+import io
+import logging
+import shutil
+import struct
+import zlib
+
+from PIL import Image
+
+from utils.scan import EXIF_TRANSPOSE, to_bilevel
+
+logger = logging.getLogger(__name__)
+
+# SOF markerlari (C4 - DHT, C8 - JPG, CC - DAC emas)
+SOF_MARKERLAR = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# Komponentlar soni -> PDF rang fazosi (CMYK JPEG lar Pillow orqali)
+RANG_FAZOLARI = {1: b"/DeviceGray", 3: b"/DeviceRGB"}
+
+# EXIF Orientation -> sahifa /Rotate (soat yo'nalishida). Ko'zgu holatlari (2, 4, 5, 7)
+# burish bilan ifodalanmaydi - ular Pillow orqali to'g'rilanadi.
+EXIF_BURISH = {1: 0, 3: 180, 6: 90, 8: 270}
+
+STATS = {"jpeg_passthrough": 0, "pillow": 0, "scan": 0}
+
+
+def exif_orientation(segment: bytes) -> int:
+    """APP1 (Exif) segmentidan Orientation teg qiymati; topilmasa 1"""
+    if segment[:6] != b"Exif\0\0":
+        return 1
+    tiff = segment[6:]
+    if tiff[:2] == b"II":
+        tartib = "<"
+    elif tiff[:2] == b"MM":
+        tartib = ">"
+    else:
+        return 1
+    try:
+        (ifd,) = struct.unpack(tartib + "I", tiff[4:8])
+        (soni,) = struct.unpack(tartib + "H", tiff[ifd:ifd + 2])
+        for i in range(soni):
+            joy = ifd + 2 + 12 * i
+            tag, tur = struct.unpack(tartib + "HH", tiff[joy:joy + 4])
+            if tag == 0x0112 and tur == 3:  # SHORT
+                return struct.unpack(tartib + "H", tiff[joy + 8:joy + 10])[0]
+    except struct.error:
+        pass
+    return 1
+
+
+def jpeg_info(f):
+    """JPEG sarlavhasidan (kenglik, balandlik, komponentlar, bit, EXIF orientation); JPEG bo'lmasa None"""
+    f.seek(0)
+    orientation = 1
+    if f.read(2) != b"\xff\xd8":
+        return None
+    while True:
+        head = f.read(2)
+        if len(head) < 2 or head[0] != 0xFF:
+            return None
+        marker = head[1]
+        while marker == 0xFF:  # to'ldiruvchi baytlar
+            b = f.read(1)
+            if not b:
+                return None
+            marker = b[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:  # uzunliksiz markerlar
+            continue
+        if marker in (0xD9, 0xDA):  # SOF dan oldin EOI/SOS - buzuq fayl
+            return None
+        segment = f.read(2)
+        if len(segment) < 2:
+            return None
+        length = struct.unpack(">H", segment)[0]
+        if marker in SOF_MARKERLAR:
+            sof = f.read(6)
+            if len(sof) < 6:
+                return None
+            bits, height, width, components = struct.unpack(">BHHB", sof)
+            return width, height, components, bits, orientation
+        if marker == 0xE1 and orientation == 1:  # APP1 - Exif (SOF dan oldin keladi)
+            orientation = exif_orientation(f.read(length - 2))
+            continue
+        f.seek(length - 2, io.SEEK_CUR)
+
+
+class PdfWriter:
+    """
+    Minimal PDF yozuvchi: har bir sahifa - bitta rasm.
+    Obyektlar darhol faylga yoziladi, xotirada faqat offsetlar qoladi.
+    """
+
+    def __init__(self, out):
+        self._out = out
+        self._offsets = {}
+        self._pages = []
+        self._next_id = 3  # 1 - katalog, 2 - sahifalar daraxti
+        self._pos = 0
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write(self, data: bytes):
+        self._out.write(data)
+        self._pos += len(data)
+
+    def _new_id(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _object(self, obj_id: int, body: bytes, stream=None):
+        """stream - bytes yoki fayl obyekti (fayldan bo'laklab ko'chiriladi)"""
+        self._offsets[obj_id] = self._pos
+        self._write(b"%d 0 obj\n" % obj_id)
+        if stream is None:
+            self._write(body + b"\nendobj\n")
+            return
+        if isinstance(stream, bytes):
+            self._write(body[:-2] + b" /Length %d >>\nstream\n" % len(stream))
+            self._write(stream)
+        else:
+            length = stream.seek(0, io.SEEK_END)
+            stream.seek(0)
+            self._write(body[:-2] + b" /Length %d >>\nstream\n" % length)
+            shutil.copyfileobj(stream, self._out)
+            self._pos += length
+        self._write(b"\nendstream\nendobj\n")
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages)
+
+    def _add_image_page(self, width: int, height: int, dict_body: bytes, stream, rotate: int = 0):
+        image_id, content_id, page_id = self._new_id(), self._new_id(), self._new_id()
+        self._object(
+            image_id,
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d %s >>" % (width, height, dict_body),
+            stream
+        )
+        # Sahifa o'lchami - piksel = punkt (72 dpi), Pillow bilan bir xil
+        self._object(content_id, b"<< >>", b"q %d 0 0 %d 0 0 cm /Im0 Do Q" % (width, height))
+        self._object(
+            page_id,
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] %s"
+            b"/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>"
+            % (width, height, b"/Rotate %d " % rotate if rotate else b"", image_id, content_id)
+        )
+        self._pages.append(page_id)
+
+    def add_jpeg(self, f) -> bool:
+        """JPEG faylini dekodlamasdan (DCTDecode) sahifa qilib qo'shish; mos kelmasa False"""
+        info = jpeg_info(f)
+        if info is None:
+            return False
+        width, height, components, bits, orientation = info
+        if components not in RANG_FAZOLARI or bits != 8 or not width or not height:
+            return False
+        if orientation not in EXIF_BURISH:
+            return False
+        self._add_image_page(
+            width, height,
+            b"/ColorSpace %s /BitsPerComponent 8 /Filter /DCTDecode" % RANG_FAZOLARI[components],
+            f,
+            rotate=EXIF_BURISH[orientation]
+        )
+        STATS["jpeg_passthrough"] += 1
+        return True
+
+    def add_pillow(self, image: Image.Image):
+        """Pillow rasmini yo'qotishsiz (FlateDecode) sahifa qilib qo'shish"""
+        orientation = image.getexif().get(0x0112, 1)
+        if orientation in EXIF_TRANSPOSE:
+            image = image.transpose(EXIF_TRANSPOSE[orientation])
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        components = 3 if image.mode == "RGB" else 1
+        self._add_image_page(
+            image.width, image.height,
+            b"/ColorSpace %s /BitsPerComponent 8 /Filter /FlateDecode" % RANG_FAZOLARI[components],
+            zlib.compress(image.tobytes(), 6)
+        )
+        STATS["pillow"] += 1
+
+    def add_image(self, f):
+        """Rasm (bytes yoki fayl obyekti): JPEG bo'lsa to'g'ridan-to'g'ri, aks holda Pillow orqali"""
+        if isinstance(f, bytes):
+            f = io.BytesIO(f)
+        if not self.add_jpeg(f):
+            f.seek(0)
+            with Image.open(f) as image:
+                self.add_pillow(image)
+
+    def add_scan(self, f):
+        """Hujjat skaneri: kulrang → moslashuvchan chegara → 1-bit (FlateDecode) sahifa"""
+        if isinstance(f, bytes):
+            f = io.BytesIO(f)
+        f.seek(0)
+        with Image.open(f) as image:
+            width, height, bits = to_bilevel(image)
+        self._add_image_page(
+            width, height,
+            b"/ColorSpace /DeviceGray /BitsPerComponent 1 /Filter /FlateDecode",
+            zlib.compress(bits, 6)
+        )
+        STATS["scan"] += 1
+
+    def close(self):
+        """Sahifalar daraxti, katalog, xref va trailer ni yozish"""
+        kids = b" ".join(b"%d 0 R" % p for p in self._pages)
+        self._object(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._pages)))
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref = self._pos
+        size = self._next_id
+        self._write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for obj_id in range(1, size):
+            self._write(b"%010d 00000 n \n" % self._offsets[obj_id])
+        self._write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref))
+
+
+def image_to_pdf(image_bytes: bytes) -> bytes:
+    """Rasmni bir sahifali PDF ga aylantirish (worker thread'da ishlaydi)"""
+    pdf_bytes = io.BytesIO()
+    writer = PdfWriter(pdf_bytes)
+    writer.add_image(image_bytes)
+    writer.close()
+    return pdf_bytes.getvalue()
+
+
+def get_stats() -> dict:
+    return dict(STATS)
@@ -0,0 +1,93 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(unique_ids, scan: bool = False) -> str:
+    """Sahifalar file_unique_id lari (tartibi bilan) va sozlamalardan kalit (v2 - EXIF burish bilan)"""
+    manba = f"v2|scan={int(scan)}|" + ",".join(unique_ids)
+    return hashlib.sha1(manba.encode()).hexdigest()
+
+
+class PdfCache:
+    """
+    Tayyor PDF lar keshi: kalit -> yuborilgan PDF ning Telegram file_id si.
+    Xotirada LRU (OrderedDict), SQLite faylida saqlanadi - restartdan keyin ham ishlaydi.
+    """
+
+    def __init__(self, path: str, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.stats = {"hit": 0, "miss": 0, "shared": 0, "evicted": 0, "invalid": 0}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pdf_cache (key TEXT PRIMARY KEY, file_id TEXT NOT NULL, used REAL NOT NULL)"
+        )
+        # Eng yaqinda ishlatilganlari (eskidan yangiga - LRU tartibi)
+        rows = self._db.execute(
+            "SELECT key, file_id FROM (SELECT * FROM pdf_cache ORDER BY used DESC LIMIT ?) ORDER BY used",
+            (maxsize,)
+        ).fetchall()
+        self._data.update(rows)
+        self._db.execute(
+            "DELETE FROM pdf_cache WHERE key NOT IN (SELECT key FROM pdf_cache ORDER BY used DESC LIMIT ?)",
+            (maxsize,)
+        )
+        self._db.commit()
+        logger.info("📄 PDF keshi yuklandi: %d ta", len(self._data))
+
+    def get(self, key: str):
+        file_id = self._data.get(key)
+        if file_id is None:
+            # Klasterda boshqa worker jarayon yozgan bo'lishi mumkin - faylga qaraymiz
+            row = self._db.execute("SELECT file_id FROM pdf_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["miss"] += 1
+                return None
+            file_id = self._data[key] = row[0]
+            self.stats["shared"] += 1
+        self._data.move_to_end(key)
+        self.stats["hit"] += 1
+        self._db.execute("UPDATE pdf_cache SET used = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
+        return file_id
+
+    def set(self, key: str, file_id: str):
+        self._data[key] = file_id
+        self._data.move_to_end(key)
+        self._db.execute("INSERT OR REPLACE INTO pdf_cache VALUES (?, ?, ?)", (key, file_id, time.time()))
+        while len(self._data) > self.maxsize:
+            eski, _ = self._data.popitem(last=False)
+            self._db.execute("DELETE FROM pdf_cache WHERE key = ?", (eski,))
+            self.stats["evicted"] += 1
+        self._db.commit()
+
+    def delete(self, key: str):
+        """Telegram file_id ni rad etsa (eskirgan) - yozuvni o'chirish"""
+        if self._data.pop(key, None) is not None:
+            self.stats["invalid"] += 1
+        self._db.execute("DELETE FROM pdf_cache WHERE key = ?", (key,))
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get_stats(self) -> dict:
+        jami = self.stats["hit"] + self.stats["miss"]
+        return {
+            **self.stats,
+            "size": len(self._data),
+            "hit_ratio": round(self.stats["hit"] / jami, 3) if jami else 0.0
+        }
@@ -0,0 +1,217 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+logger = logging.getLogger(__name__)
+
+# Saqlanmaydigan (faqat jarayon ichidagi) kalitlar
+VAQTINCHALIK_KALITLAR = frozenset({'pdf_building'})
+
+
+class SQLitePersistence(BasePersistence):
+    """
+    Faqat user_data uchun SQLite (WAL) persistence.
+
+    - Ishga tushganda hech narsa o'qilmaydi: foydalanuvchi ma'lumoti birinchi
+      update kelganda refresh_user_data orqali bitta qatordan yuklanadi.
+    - Application har update_interval da faqat o'zgargan foydalanuvchilarni beradi;
+      ular JSON ga o'tkazilib, bitta tranzaksiyada alohida thread'da yoziladi.
+    """
+
+    def __init__(self, path: str, update_interval: float = 30):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=update_interval
+        )
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        # O'qish - event loop'da (PK bo'yicha bitta qator), yozish - alohida ulanish, thread'da
+        self._reader = sqlite3.connect(path)
+        self._reader.execute("PRAGMA journal_mode=WAL")
+        self._reader.execute(
+            "CREATE TABLE IF NOT EXISTS user_data (user_id INTEGER PRIMARY KEY, data TEXT NOT NULL, updated REAL NOT NULL)"
+        )
+        self._reader.commit()
+        self._writer_db = sqlite3.connect(path, check_same_thread=False)
+        self._writer_db.execute("PRAGMA synchronous=NORMAL")
+
+        self._loaded = set()  # xotiraga yuklangan foydalanuvchilar
+        self._written = {}  # foydalanuvchi -> oxirgi yozilgan JSON xeshi (o'zgarmaganini qayta yozmaslik)
+        self._dirty = {}  # foydalanuvchi -> JSON (None - o'chirish)
+        self._inflight = {}  # hozir thread'da yozilayotgan to'plam
+        self._evicted = set()  # xotiradan chiqarilgan (qatori saqlanadi)
+        self._returned = {}  # chiqarilgach drop kelmasdan qaytganlar -> joriy user_data
+        self._writer = None
+        self.stats = {"loaded": 0, "written": 0, "skipped": 0, "deleted": 0, "batches": 0, "evicted": 0}
+
+    # --- user_data ---
+
+    async def get_user_data(self) -> dict:
+        # Hammasini oldindan yuklamaymiz - refresh_user_data da bittalab
+        return {}
+
+    async def refresh_user_data(self, user_id: int, user_data) -> None:
+        if hasattr(user_data, 'touch'):
+            user_data.touch()
+        if user_id in self._loaded:
+            return
+        self._loaded.add(user_id)
+
+        # Chiqarilgan foydalanuvchi keyingi update_persistence dan oldin qaytdi: PTB uning
+        # yangilanishini o'tkazib yuborib, faqat drop_user_data ni chaqiradi - o'shanda yoziladi
+        if user_id in self._evicted:
+            self._evicted.discard(user_id)
+            self._returned[user_id] = user_data
+
+        # Hali diskka yetib bormagan yozuv bo'lsa - o'sha eng yangisi
+        if user_id in self._dirty:
+            encoded = self._dirty[user_id]
+        elif user_id in self._inflight:
+            encoded = self._inflight[user_id]
+        else:
+            row = self._reader.execute("SELECT data FROM user_data WHERE user_id = ?", (user_id,)).fetchone()
+            encoded = row[0] if row else None
+            if encoded is not None:
+                self._written[user_id] = hash(encoded)
+        if encoded is None:
+            return
+
+        try:
+            saqlangan = json.loads(encoded)
+        except ValueError as e:
+            logger.error(f"user_data o'qilmadi ({user_id}): {e}")
+            return
+        # Shu update davomida yozilgan qiymatlar ustun; eski/noma'lum kalitlar tashlab ketiladi
+        for key, value in saqlangan.items():
+            try:
+                user_data.setdefault(key, value)
+            except KeyError:
+                pass
+        self.stats["loaded"] += 1
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        encoded = json.dumps(
+            {k: v for k, v in data.items() if k not in VAQTINCHALIK_KALITLAR},
+            ensure_ascii=False, separators=(",", ":"), default=str
+        )
+        if self._written.get(user_id) == hash(encoded):
+            self.stats["skipped"] += 1
+            return
+        self._dirty[user_id] = encoded
+        self._schedule_write()
+
+    async def evict_user_data(self, user_id: int, data) -> None:
+        """Sessiyani xotiradan chiqarish: oxirgi holat yoziladi, qator o'chirilmaydi"""
+        await self.update_user_data(user_id, data)
+        self._loaded.discard(user_id)
+        self._written.pop(user_id, None)
+        self._returned.pop(user_id, None)
+        self._evicted.add(user_id)
+        self.stats["evicted"] += 1
+
+    async def drop_user_data(self, user_id: int) -> None:
+        # Application.drop_user_data evict_user_data dan keyin ham shu yerga keladi
+        if user_id in self._evicted:
+            self._evicted.discard(user_id)
+            return
+        returned = self._returned.pop(user_id, None)
+        if returned is not None:
+            await self.update_user_data(user_id, returned)
+            return
+        self._loaded.discard(user_id)
+        self._written.pop(user_id, None)
+        self._dirty[user_id] = None
+        self._schedule_write()
+
+    # --- yozish (write-behind) ---
+
+    def _schedule_write(self):
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_dirty())
+
+    async def _write_dirty(self):
+        # Shu update_persistence davridagi boshqa foydalanuvchilar ham yig'ilsin
+        await asyncio.sleep(0)
+        while self._dirty:
+            batch, self._dirty = self._dirty, {}
+            self._inflight = batch
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                logger.error(f"user_data yozilmadi ({len(batch)} ta): {e}")
+                # Keyingi urinishda qayta yoziladi (yangiroq qiymat bo'lsa - o'shasi)
+                for user_id, encoded in batch.items():
+                    self._dirty.setdefault(user_id, encoded)
+                return
+            finally:
+                self._inflight = {}
+            for user_id, encoded in batch.items():
+                if encoded is not None and user_id in self._loaded:
+                    self._written[user_id] = hash(encoded)
+
+    def _write_batch(self, batch: dict):
+        now = time.time()
+        upserts = [(user_id, encoded, now) for user_id, encoded in batch.items() if encoded is not None]
+        deletes = [(user_id,) for user_id, encoded in batch.items() if encoded is None]
+        with self._writer_db:
+            if upserts:
+                self._writer_db.executemany("INSERT OR REPLACE INTO user_data VALUES (?, ?, ?)", upserts)
+            if deletes:
+                self._writer_db.executemany("DELETE FROM user_data WHERE user_id = ?", deletes)
+        self.stats["written"] += len(upserts)
+        self.stats["deleted"] += len(deletes)
+        self.stats["batches"] += 1
+
+    async def flush(self) -> None:
+        """To'xtashda: navbatdagi yozuvlarni tugatib, ulanishlarni yopish"""
+        if self._writer is not None:
+            await self._writer
+        if self._dirty:
+            await self._write_dirty()
+        self._writer_db.close()
+        self._reader.close()
+        logger.info("💾 user_data saqlandi: %s", self.path)
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "in_memory": len(self._loaded), "pending": len(self._dirty)}
+
+    # --- ishlatilmaydi (store_data da o'chirilgan) ---
+
+    async def get_chat_data(self) -> dict:
+        return {}
+
+    async def get_bot_data(self) -> dict:
+        return {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def get_conversations(self, name: str) -> dict:
+        return {}
+
+    async def update_conversation(self, name: str, key, new_state) -> None:
+        pass
+
+    async def update_chat_data(self, chat_id: int, data: dict) -> None:
+        pass
+
+    async def update_bot_data(self, data: dict) -> None:
+        pass
+
+    async def update_callback_data(self, data) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: dict) -> None:
+        pass
@@ -0,0 +1,174 @@
+import logging
+from datetime import date, datetime, timedelta, timezone
+from math import degrees, radians, sin, cos, tan, asin, acos, atan, atan2, floor
+
+from hijridate import Gregorian
+
+logger = logging.getLogger(__name__)
+
+# O'zbekiston vaqti (UTC+5, yozgi vaqt yo'q)
+TOSHKENT_TZ = timezone(timedelta(hours=5))
+TZ_SOAT = 5
+
+# Muslim World League (method 2) burchaklari
+BOMDOD_BURCHAGI = 18.0
+XUFTON_BURCHAGI = 17.0
+# Quyosh chiqishi/botishi (refraksiya + quyosh radiusi)
+UFQ_BURCHAGI = 0.833
+# Hanafiy Asr (school 1): soya = 2 x narsa uzunligi
+ASR_SOYA = 2
+
+# Shaharlar koordinatalari (API_VILOYATLAR qiymatlari bo'yicha)
+KOORDINATALAR = {
+    "Tashkent": (41.2995, 69.2401),
+    "Samarkand": (39.6270, 66.9750),
+    "Bukhara": (39.7747, 64.4286),
+    "Khiva": (41.3783, 60.3639),
+    "Karshi": (38.8606, 65.7891),
+    "Namangan": (40.9983, 71.6726),
+    "Andijan": (40.7821, 72.3442),
+    "Fergana": (40.3894, 71.7843),
+    "Jizzakh": (40.1158, 67.8422),
+    "Gulistan": (40.4897, 68.7842),
+    "Navoi": (40.0844, 65.3792),
+    "Urgench": (41.5500, 60.6333),
+    "Termez": (37.2242, 67.2783),
+    "Nukus": (42.4531, 59.6103)
+}
+
+HAFTA_KUNLARI = ['Dushanba', 'Seshanba', 'Chorshanba', 'Payshanba', 'Juma', 'Shanba', 'Yakshanba']
+
+OYLAR = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# Aladhan qaytaradigan hijriy oy nomlari
+HIJRIY_OYLAR = [
+    "Muḥarram", "Ṣafar", "Rabīʿ al-awwal", "Rabīʿ al-thānī",
+    "Jumādá al-ūlá", "Jumādá al-ākhirah", "Rajab", "Shaʿbān",
+    "Ramaḍān", "Shawwāl", "Dhū al-Qaʿdah", "Dhū al-Ḥijjah"
+]
+
+
+def bugun() -> date:
+    """Toshkent vaqti bo'yicha bugungi sana"""
+    return datetime.now(TOSHKENT_TZ).date()
+
+
+def _fix(a: float, b: float) -> float:
+    a = a - b * floor(a / b)
+    return a + b if a < 0 else a
+
+
+def julian_day(sana: date) -> float:
+    """Grigorian sanadan Julian kun (yarim tun, UT)"""
+    year, month, day = sana.year, sana.month, sana.day
+    if month <= 2:
+        year -= 1
+        month += 12
+    a = floor(year / 100)
+    b = 2 - a + floor(a / 4)
+    return floor(365.25 * (year + 4716)) + floor(30.6001 * (month + 1)) + day + b - 1524.5
+
+
+def sun_position(jd: float):
+    """Quyosh og'ishi (gradus) va vaqt tenglamasi (soat)"""
+    d = jd - 2451545.0
+    g = _fix(357.529 + 0.98560028 * d, 360)
+    q = _fix(280.459 + 0.98564736 * d, 360)
+    ecl_lon = _fix(q + 1.915 * sin(radians(g)) + 0.020 * sin(radians(2 * g)), 360)
+    e = 23.439 - 0.00000036 * d
+
+    ra = degrees(atan2(cos(radians(e)) * sin(radians(ecl_lon)), cos(radians(ecl_lon)))) / 15
+    eqt = q / 15 - _fix(ra, 24)
+    decl = degrees(asin(sin(radians(e)) * sin(radians(ecl_lon))))
+    return decl, eqt
+
+
+def calculate_prayer_times(lat: float, lon: float, sana: date, tz: float = TZ_SOAT) -> dict:
+    """
+    Namoz vaqtlarini hisoblash (MWL burchaklari, Hanafiy Asr).
+    Natija - mahalliy soatlarda (float).
+    """
+    jd = julian_day(sana) - lon / (15 * 24)
+    lat_r = radians(lat)
+
+    def mid_day(t):
+        eqt = sun_position(jd + t)[1]
+        return _fix(12 - eqt, 24)
+
+    def sun_angle_time(angle, t, ccw=False):
+        decl = radians(sun_position(jd + t)[0])
+        noon = mid_day(t)
+        cos_h = (-sin(radians(angle)) - sin(decl) * sin(lat_r)) / (cos(decl) * cos(lat_r))
+        h = degrees(acos(max(-1.0, min(1.0, cos_h)))) / 15
+        return noon - h if ccw else noon + h
+
+    def asr_time(factor, t):
+        decl = sun_position(jd + t)[0]
+        angle = -degrees(atan(1 / (factor + tan(radians(abs(lat - decl))))))
+        return sun_angle_time(angle, t)
+
+    vaqtlar = {
+        "bomdod": sun_angle_time(BOMDOD_BURCHAGI, 5 / 24, ccw=True),
+        "quyosh": sun_angle_time(UFQ_BURCHAGI, 6 / 24, ccw=True),
+        "peshin": mid_day(12 / 24),
+        "asr": asr_time(ASR_SOYA, 13 / 24),
+        "shom": sun_angle_time(UFQ_BURCHAGI, 18 / 24),
+        "xufton": sun_angle_time(XUFTON_BURCHAGI, 18 / 24)
+    }
+
+    farq = tz - lon / 15
+    for k in vaqtlar:
+        vaqtlar[k] += farq
+
+    # Yuqori kengliklar uchun (angle based) tuzatish
+    tun = _fix(vaqtlar["quyosh"] - vaqtlar["shom"], 24)
+    bomdod_ulush = BOMDOD_BURCHAGI / 60 * tun
+    if _fix(vaqtlar["quyosh"] - vaqtlar["bomdod"], 24) > bomdod_ulush:
+        vaqtlar["bomdod"] = vaqtlar["quyosh"] - bomdod_ulush
+    xufton_ulush = XUFTON_BURCHAGI / 60 * tun
+    if _fix(vaqtlar["xufton"] - vaqtlar["shom"], 24) > xufton_ulush:
+        vaqtlar["xufton"] = vaqtlar["shom"] + xufton_ulush
+
+    return vaqtlar
+
+
+def format_vaqt(soat: float) -> str:
+    """Soatni 'HH:MM' ko'rinishiga o'tkazish (eng yaqin daqiqaga)"""
+    daqiqa = int(_fix(soat + 0.5 / 60, 24) * 60)
+    return f"{daqiqa // 60:02d}:{daqiqa % 60:02d}"
+
+
+def hijri_sana(sana: date):
+    """
+    Grigorian sanadan hijriy sana (kun, oy, yil) - Umm al-Qura taqvimi (Aladhan ham shunga tayanadi).
+    Umm al-Qura oralig'idan (1924-2077) tashqarida - arifmetik usul.
+    """
+    try:
+        h = Gregorian(sana.year, sana.month, sana.day).to_hijri()
+    except OverflowError:
+        return _hijri_arifmetik(sana)
+    return h.day, h.month, h.year
+
+
+def _hijri_arifmetik(sana: date):
+    """Arifmetik (jadval) hijriy taqvim - oy boshi 1 kunga farq qilishi mumkin"""
+    jd = sana.toordinal() + 1721425
+    l = jd - 1948440 + 10632
+    n = (l - 1) // 10631
+    l = l - 10631 * n + 354
+    j = ((10985 - l) // 5316) * ((50 * l) // 17719) + (l // 5670) * ((43 * l) // 15238)
+    l = l - ((30 - j) // 15) * ((17719 * j) // 50) - (j // 16) * ((15238 * j) // 43) + 29
+    oy = (24 * l) // 709
+    kun = l - (709 * oy) // 24
+    yil = 30 * n + j - 30
+    return kun, oy, yil
+
+
+def get_kun_malumoti(sana: date) -> dict:
+    """Sana, hafta kuni va hijriy sana (natija lug'ati uchun)"""
+    kun, oy, yil = hijri_sana(sana)
+    return {
+        "sana": f"{sana.day:02d} {OYLAR[sana.month - 1]} {sana.year}",
+        "hafta_kuni": HAFTA_KUNLARI[sana.weekday()],
+        "hijriy": f"{kun:02d} {HIJRIY_OYLAR[oy - 1]} {yil}"
+    }
@@ -1,6 +1,6 @@
-import requests
 import logging
-from datetime import datetime
+from datetime import date
+from utils.timings import get_timings
 
 logger = logging.getLogger(__name__)
 
@@ -28,54 +28,26 @@ API_VILOYATLAR = {
 }
 
 
-async def get_namoz_vaqtlari(viloyat: str):
-    """Namoz vaqtlarini Aladhan API dan olish"""
+async def get_namoz_vaqtlari(viloyat: str, sana: date = None):
+    """Namoz vaqtlarini umumiy vaqtlar keshidan olish (MWL, Hanafiy)"""
     try:
         api_nom = API_VILOYATLAR.get(viloyat, "Tashkent")
-
-        url = "http://api.aladhan.com/v1/timingsByCity"
-        params = {
-            "city": api_nom,
-            "country": "Uzbekistan",
-            "method": 2,  # Muslim World League
-            "school": 1  # Hanafi
+        t = await get_timings(api_nom, sana)
+
+        return {
+            "success": True,
+            "viloyat": viloyat,
+            "sana": t["sana"],
+            "hafta_kuni": t["hafta_kuni"],
+            "hijriy": t["hijriy"],
+            "bomdod": t["bomdod"],
+            "quyosh": t["quyosh"],
+            "peshin": t["peshin"],
+            "asr": t["asr"],
+            "shom": t["shom"],
+            "xufton": t["xufton"]
         }
 
-        logger.info(f"API so'rov: {url}?city={api_nom}")
-
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
-
-        if data["code"] == 200:
-            timings = data["data"]["timings"]
-            date = data["data"]["date"]["readable"]
-            hijri = data["data"]["date"]["hijri"]
-            weekday = data["data"]["date"]["hijri"]["weekday"]["en"]
-
-            # Hafta kunini o'zbekchalashtirish
-            weekdays = {
-                'Monday': 'Dushanba', 'Tuesday': 'Seshanba', 'Wednesday': 'Chorshanba',
-                'Thursday': 'Payshanba', 'Friday': 'Juma', 'Saturday': 'Shanba', 'Sunday': 'Yakshanba'
-            }
-            weekday_uz = weekdays.get(weekday, weekday)
-
-            return {
-                "success": True,
-                "viloyat": viloyat,
-                "sana": date,
-                "hafta_kuni": weekday_uz,
-                "hijriy": f"{hijri['day']} {hijri['month']['en']} {hijri['year']}",
-                "bomdod": timings["Fajr"][:5],
-                "quyosh": timings["Sunrise"][:5],
-                "peshin": timings["Dhuhr"][:5],
-                "asr": timings["Asr"][:5],
-                "shom": timings["Maghrib"][:5],
-                "xufton": timings["Isha"][:5]
-            }
-        else:
-            logger.error(f"API xatolik: {data}")
-            return {"success": False}
-
     except Exception as e:
         logger.error(f"Xatolik: {e}")
         return {"success": False}
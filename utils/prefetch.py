@@ -0,0 +1,78 @@
+import logging
+import random
+from datetime import time
+
+from config import CALENDAR_INGEST, WORKER_INDEX
+from utils.calendar_ingest import ingest_missing
+from utils.prayer_calc import TOSHKENT_TZ, bugun
+from utils.prayer_times import VILOYATLAR
+from utils.render_cache import RENDERERS, TILLAR, render
+
+logger = logging.getLogger(__name__)
+
+# Yarim tundan keyin ishga tushish vaqti (Toshkent)
+PREFETCH_VAQTI = time(0, 1, tzinfo=TOSHKENT_TZ)
+
+# Qayta urinishlar: 30s, 60s, 120s ... (eng ko'pi 15 daqiqa) + tasodifiy jitter
+PREFETCH_URINISHLAR = 8
+BACKOFF_BOSHI = 30
+BACKOFF_CHEGARA = 15 * 60
+
+
+async def ingest_calendar(sana) -> int:
+    """Joriy va keyingi oy kalendarlarini yuklash (yo'qlari uchun)"""
+    keyingi = (sana.year + sana.month // 12, sana.month % 12 + 1)
+    soni = 0
+    for yil, oy in ((sana.year, sana.month), keyingi):
+        soni += await ingest_missing(yil, oy)
+    return soni
+
+
+async def warm_day(sana=None) -> int:
+    """Barcha viloyatlar uchun vaqtlar va matnlarni oldindan tayyorlash"""
+    sana = sana or bugun()
+    soni = 0
+    for viloyat in VILOYATLAR:
+        for kind in RENDERERS:
+            for lang in TILLAR:
+                if await render(kind, viloyat, lang, sana) is None:
+                    raise RuntimeError(f"{viloyat} ({kind}) tayyorlanmadi")
+                soni += 1
+    return soni
+
+
+def backoff_delay(urinish: int) -> float:
+    """Eksponensial kutish vaqti (sekund) + jitter"""
+    delay = min(BACKOFF_CHEGARA, BACKOFF_BOSHI * 2 ** urinish)
+    return delay * random.uniform(0.5, 1.5)
+
+
+async def prefetch_job(context):
+    """JobQueue vazifasi: yangi kun vaqtlarini keshga yuklash"""
+    urinish = context.job.data or 0
+    sana = bugun()
+
+    # Kalendar yuklanmasa ham mahalliy jadval bilan davom etamiz
+    # (klasterda faqat 0-worker yuklaydi, fayllarni hamma o'qiydi)
+    if CALENDAR_INGEST and WORKER_INDEX == 0:
+        try:
+            await ingest_calendar(sana)
+        except Exception as e:
+            logger.warning("Kalendar yuklanmadi: %s", e)
+
+    try:
+        soni = await warm_day(sana)
+        logger.info("🌙 %s uchun %d ta matn tayyorlandi", sana, soni)
+    except Exception as e:
+        if urinish + 1 >= PREFETCH_URINISHLAR:
+            logger.error("Prefetch muvaffaqiyatsiz (%d urinish): %s", urinish + 1, e)
+            return
+        delay = backoff_delay(urinish)
+        logger.warning("Prefetch xatolik: %s - %.0f s dan keyin qayta urinish", e, delay)
+        context.job_queue.run_once(prefetch_job, delay, data=urinish + 1, name="prefetch_retry")
+
+
+def schedule_prefetch(job_queue):
+    """Har kuni yarim tundan keyin va bot ishga tushganda darhol"""
+    job_queue.run_daily(prefetch_job, PREFETCH_VAQTI, name="prefetch")
+    job_queue.run_once(prefetch_job, 0, name="prefetch_startup")
@@ -0,0 +1,123 @@
+import logging
+from datetime import date
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from utils.prayer_calc import bugun
+from utils.prayer_times import VILOYATLAR, get_namoz_vaqtlari, format_namoz_vaqtlari
+from utils.iftar_times import get_roza_vaqtlari, format_roza_vaqtlari
+
+logger = logging.getLogger(__name__)
+
+TILLAR = ('uz_latin', 'uz_kiril', 'en')
+
+# Tur -> (ma'lumot olish, formatlash)
+RENDERERS = {
+    'namoz': (get_namoz_vaqtlari, format_namoz_vaqtlari),
+    'roza': (get_roza_vaqtlari, format_roza_vaqtlari)
+}
+
+# Tur -> (viloyat tugmasi prefiksi, menyu callback)
+CALLBACKS = {
+    'namoz': ("viloyat_", "namoz"),
+    'roza': ("iftar_", "iftar")
+}
+
+# (tur, viloyat, sana, til) -> (matn, tugmalar)
+_xabarlar = {}
+_oxirgi_sana = None
+
+# (tur, til) -> (sarlavha, tugmalar) - sanaga bog'liq emas
+_menyular = {}
+
+# Tur -> natija ostidagi tugmalar
+_natija_tugmalari = {}
+
+STATS = {"hit": 0, "miss": 0}
+
+
+def get_menu(kind: str, lang: str):
+    """Viloyat tanlash menyusi (sarlavha va tugmalar)"""
+    kalit = (kind, lang)
+    menyu = _menyular.get(kalit)
+    if menyu is None:
+        prefix = CALLBACKS[kind][0]
+
+        # Tugmalarni yaratish (3 qatorli)
+        keyboard = []
+        row = []
+        for i, viloyat in enumerate(VILOYATLAR):
+            row.append(InlineKeyboardButton(viloyat, callback_data=f"{prefix}{viloyat}"))
+            if (i + 1) % 3 == 0:
+                keyboard.append(row)
+                row = []
+        if row:
+            keyboard.append(row)
+
+        back_text = {
+            'uz_latin': "🔙 Asosiy menyu",
+            'uz_kiril': "🔙 Асосий меню",
+            'en': "🔙 Main menu"
+        }.get(lang, "🔙 Asosiy menyu")
+        keyboard.append([InlineKeyboardButton(back_text, callback_data="back_to_menu")])
+
+        title = {
+            'uz_latin': "🌍 Viloyatni tanlang:",
+            'uz_kiril': "🌍 Вилоятни танланг:",
+            'en': "🌍 Choose region:"
+        }.get(lang, "🌍 Viloyatni tanlang:")
+
+        menyu = (title, InlineKeyboardMarkup(keyboard))
+        _menyular[kalit] = menyu
+    return menyu
+
+
+def result_markup(kind: str) -> InlineKeyboardMarkup:
+    """Vaqtlar xabari ostidagi tugmalar"""
+    markup = _natija_tugmalari.get(kind)
+    if markup is None:
+        menyu = CALLBACKS[kind][1]
+        markup = InlineKeyboardMarkup([
+            [InlineKeyboardButton("🔄 Qaytadan", callback_data=menyu)],
+            [InlineKeyboardButton("🔙 Viloyatlar", callback_data=menyu)],
+            [InlineKeyboardButton("🔙 Asosiy menyu", callback_data="back_to_menu")]
+        ])
+        _natija_tugmalari[kind] = markup
+    return markup
+
+
+def _check_rollover():
+    """Sana o'zgarganda o'tgan kunlarga tegishli xabarlarni o'chirish"""
+    global _oxirgi_sana
+    today = bugun()
+    if today != _oxirgi_sana:
+        for kalit in [k for k in _xabarlar if k[2] < today]:
+            del _xabarlar[kalit]
+        _oxirgi_sana = today
+    return today
+
+
+async def render(kind: str, viloyat: str, lang: str, sana: date = None):
+    """Tayyor xabar (matn, tugmalar); xatolik bo'lsa None"""
+    today = _check_rollover()
+    sana = sana or today
+    kalit = (kind, viloyat, sana, lang)
+
+    xabar = _xabarlar.get(kalit)
+    if xabar is not None:
+        STATS["hit"] += 1
+        return xabar
+
+    STATS["miss"] += 1
+    get_data, format_data = RENDERERS[kind]
+    result = await get_data(viloyat, sana)
+    if not result["success"]:
+        return None
+
+    xabar = (format_data(result, lang), result_markup(kind))
+    _xabarlar[kalit] = xabar
+    return xabar
+
+
+def get_stats() -> dict:
+    return {**STATS, "size": len(_xabarlar), "menus": len(_menyular)}
@@ -0,0 +1,69 @@
+import logging
+import time
+
+from utils.metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+
+class CallbackRouter:
+    """
+    Callback tugmalari uchun jadvalga asoslangan yo'naltiruvchi.
+    Avval aniq moslik (O(1)), keyin eng uzun prefiks (O(prefiks uzunliklari)).
+    """
+
+    def __init__(self, fallback=None):
+        self._exact = {}
+        self._prefix = {}
+        self._prefix_lengths = []  # kamayish tartibida
+        self.fallback = fallback
+        self.latency = {}  # yo'nalish nomi -> LatencyHistogram
+
+    def exact(self, data: str, handler):
+        self._exact[data] = handler
+        self.latency.setdefault(data, LatencyHistogram())
+
+    def prefix(self, prefix: str, handler):
+        self._prefix[prefix] = handler
+        if len(prefix) not in self._prefix_lengths:
+            self._prefix_lengths.append(len(prefix))
+            self._prefix_lengths.sort(reverse=True)
+        self.latency.setdefault(f"{prefix}*", LatencyHistogram())
+
+    def resolve(self, data: str):
+        """(yo'nalish nomi, handler) yoki (None, fallback)"""
+        handler = self._exact.get(data)
+        if handler is not None:
+            return data, handler
+        for length in self._prefix_lengths:
+            key = data[:length]
+            handler = self._prefix.get(key)
+            if handler is not None:
+                return f"{key}*", handler
+        return None, self.fallback
+
+    async def dispatch(self, update, context):
+        """CallbackQueryHandler uchun: so'rovga bir marta javob berib, handlerni chaqirish"""
+        query = update.callback_query
+        data = query.data or ""
+        logger.debug("🔘 Tugma bosildi: %s", data)
+
+        # answerCallbackQuery faqat shu yerda - handlerlar qayta javob bermaydi
+        await query.answer()
+
+        route, handler = self.resolve(data)
+        if handler is None:
+            return
+
+        boshlanish = time.perf_counter()
+        try:
+            await handler(update, context)
+        finally:
+            name = route or "fallback"
+            histogram = self.latency.get(name)
+            if histogram is None:
+                histogram = self.latency[name] = LatencyHistogram()
+            histogram.observe(time.perf_counter() - boshlanish)
+
+    def get_stats(self) -> dict:
+        return {name: h.snapshot() for name, h in self.latency.items() if h.count}
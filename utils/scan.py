@@ -0,0 +1,82 @@
+import numpy as np
+from PIL import Image
+
+# Skaner rejimi: shundan katta rasmlar ikki barobar kichraytiriladi (~180 dpi A4)
+SCAN_MAX_PIXELS = 4_500_000
+
+# Moslashuvchan chegara: piksel atrofdagi o'rtachadan shuncha foiz qora bo'lsa - qora
+SCAN_FARQ = 15
+
+# Oyna yig'indilari shuncha qatorli bloklarda hisoblanadi (vaqtinchalik xotira ~ blok x kenglik)
+QATOR_BLOKI = 64
+
+# EXIF Orientation -> rasmni tik holatga keltiruvchi almashtirish (1 - o'zgarishsiz)
+EXIF_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90
+}
+
+
+def prepare_gray(image: Image.Image) -> np.ndarray:
+    """Rasmni kulrang (uint8) massivga o'tkazish; JPEG lar DCT bosqichida kichraytiriladi"""
+    orientation = image.getexif().get(0x0112, 1)
+    width, height = image.size
+    if width * height > SCAN_MAX_PIXELS:
+        # JPEG uchun draft dekodlashni o'zi tezlashtiradi, boshqalarga reduce
+        image.draft("L", (width // 2, height // 2))
+    image = image.convert("L")
+    while image.width * image.height > SCAN_MAX_PIXELS:
+        image = image.reduce(2)
+    # Telefon rasmlari (fayl sifatida) - kichraytirilgandan keyin burish arzon
+    if orientation in EXIF_TRANSPOSE:
+        image = image.transpose(EXIF_TRANSPOSE[orientation])
+    return np.asarray(image)
+
+
+def adaptive_threshold(gray: np.ndarray, oyna: int = None, farq: int = SCAN_FARQ) -> np.ndarray:
+    """
+    Bradley usuli: har bir piksel atrofidagi oyna o'rtachasi bilan solishtiriladi.
+    Integral rasm orqali vektorlashgan; oyna yig'indilari qator bloklari bo'yicha
+    hisoblanadi (to'liq kadr nusxalari yo'q). Natija - True = oq.
+    """
+    height, width = gray.shape
+    oyna = oyna or max(8, width // 16)
+    r = oyna // 2
+
+    # Eng katta yig'indi 255 * piksellar soni - SCAN_MAX_PIXELS da uint32 ga sig'adi
+    dtype = np.uint32 if gray.size * 255 < 2 ** 32 else np.uint64
+    integral = np.zeros((height + 1, width + 1), dtype=dtype)
+    # Bloklab: cumsum turini o'zgartirganda va joyida ishlaganda nusxa oladi - nusxa blok hajmida
+    for a in range(0, height, QATOR_BLOKI):
+        blok = integral[a + 1:a + 1 + QATOR_BLOKI, 1:]
+        np.cumsum(gray[a:a + QATOR_BLOKI], axis=1, dtype=dtype, out=blok)
+        np.cumsum(blok, axis=0, out=blok)
+        blok += integral[a, 1:]
+
+    y0 = np.clip(np.arange(height) - r, 0, height)
+    y1 = np.clip(np.arange(height) + r + 1, 0, height)
+    x0 = np.clip(np.arange(width) - r, 0, width)
+    x1 = np.clip(np.arange(width) + r + 1, 0, width)
+    kenglik = (x1 - x0).astype(np.int64)
+
+    oq = np.empty((height, width), dtype=bool)
+    for a in range(0, height, QATOR_BLOKI):
+        b = min(a + QATOR_BLOKI, height)
+        # Integral monoton o'suvchi - ayirmalar manfiy bo'lmaydi
+        qatorlar = integral[y1[a:b]] - integral[y0[a:b]]
+        yig = (qatorlar[:, x1] - qatorlar[:, x0]).astype(np.int64)
+        soni = (y1[a:b] - y0[a:b]).astype(np.int64)[:, None] * kenglik[None, :]
+        oq[a:b] = gray[a:b].astype(np.int64) * soni * 100 > yig * (100 - farq)
+    return oq
+
+
+def to_bilevel(image: Image.Image):
+    """Rasmdan (kenglik, balandlik, qatorlari baytlarga joylangan 1-bit ma'lumot)"""
+    oq = adaptive_threshold(prepare_gray(image))
+    height, width = oq.shape
+    return width, height, np.packbits(oq, axis=1).tobytes()
@@ -0,0 +1,54 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Bir xil kalit bo'yicha bir vaqtdagi so'rovlarni bitta "parvoz"ga birlashtirish.
+    Birinchi chaqiruvchi so'rovni boshlaydi, qolganlar uning natijasini kutadi.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights = {}  # kalit -> [task, chaqiruvchilar soni]
+        self.stats = {"flights": 0, "callers": 0, "collapsed": 0, "max_collapsed": 0}
+        # Har bir parvozga nechta chaqiruvchi qo'shilgani -> parvozlar soni
+        self.histogram = {}
+
+    async def do(self, key, fn):
+        """fn() ni kalit bo'yicha bir marta ishga tushirish va natijani ulashish"""
+        self.stats["callers"] += 1
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            flight[1] += 1
+            self.stats["collapsed"] += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            flight = [task, 0]
+            self._flights[key] = flight
+            self.stats["flights"] += 1
+            task.add_done_callback(lambda _, k=key, f=flight: self._finish(k, f))
+
+        # shield: bitta chaqiruvchi bekor qilinsa, boshqalar uchun so'rov davom etadi
+        return await asyncio.shield(flight[0])
+
+    def _finish(self, key, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        collapsed = flight[1]
+        self.histogram[collapsed] = self.histogram.get(collapsed, 0) + 1
+        if collapsed > self.stats["max_collapsed"]:
+            self.stats["max_collapsed"] = collapsed
+        # Hech kim kutmayotgan bo'lsa ham xatolik "retrieved" deb belgilansin
+        if not flight[0].cancelled():
+            flight[0].exception()
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "in_flight": len(self._flights),
+            "histogram": dict(sorted(self.histogram.items()))
+        }
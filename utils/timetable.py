@@ -0,0 +1,140 @@
+import logging
+import os
+import time
+from datetime import date
+
+import numpy as np
+
+from config import DATA_DIR
+from utils.prayer_calc import (
+    KOORDINATALAR, TZ_SOAT, BOMDOD_BURCHAGI, XUFTON_BURCHAGI, UFQ_BURCHAGI, ASR_SOYA, julian_day
+)
+
+logger = logging.getLogger(__name__)
+
+# Jadval o'lchamlari: kun (yil kuni) x shahar x namoz
+SHAHARLAR = list(KOORDINATALAR)
+NAMOZLAR = ["bomdod", "quyosh", "peshin", "asr", "shom", "xufton"]
+KUNLAR = 366
+
+_SHAHAR_INDEX = {nom: i for i, nom in enumerate(SHAHARLAR)}
+
+# 0..1439 daqiqa -> "HH:MM" (so'rov vaqtida satr yasamaslik uchun)
+SOAT_MATNLARI = tuple(f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60))
+
+# Ochilgan jadvallar: yil -> np.memmap
+_jadvallar = {}
+
+
+def _fix(a, b):
+    return a - b * np.floor(a / b)
+
+
+def _sun_position(jd):
+    d = jd - 2451545.0
+    g = np.radians(_fix(357.529 + 0.98560028 * d, 360))
+    q = _fix(280.459 + 0.98564736 * d, 360)
+    ecl_lon = np.radians(_fix(q + 1.915 * np.sin(g) + 0.020 * np.sin(2 * g), 360))
+    e = np.radians(23.439 - 0.00000036 * d)
+
+    ra = np.degrees(np.arctan2(np.cos(e) * np.sin(ecl_lon), np.cos(ecl_lon))) / 15
+    eqt = q / 15 - _fix(ra, 24)
+    decl = np.arcsin(np.sin(e) * np.sin(ecl_lon))
+    return decl, eqt
+
+
+def compute_year(yil: int) -> np.ndarray:
+    """
+    Butun yil uchun barcha shaharlar namoz vaqtlarini hisoblash (vektorlashtirilgan).
+    Natija: int16 massiv [kun, shahar, namoz] - yarim tundan beri daqiqalar.
+    """
+    kunlar = np.arange(KUNLAR)
+    jd0 = julian_day(date(yil, 1, 1)) + kunlar[:, None]
+    koord = np.array([KOORDINATALAR[nom] for nom in SHAHARLAR])
+    lat = np.radians(koord[:, 0])[None, :]
+    lon = koord[:, 1][None, :]
+    jd = jd0 - lon / (15 * 24)
+
+    def mid_day(t):
+        return _fix(12 - _sun_position(jd + t)[1], 24)
+
+    def sun_angle_time(angle, t, ccw=False):
+        decl = _sun_position(jd + t)[0]
+        cos_h = (-np.sin(angle) - np.sin(decl) * np.sin(lat)) / (np.cos(decl) * np.cos(lat))
+        h = np.degrees(np.arccos(np.clip(cos_h, -1.0, 1.0))) / 15
+        noon = mid_day(t)
+        return noon - h if ccw else noon + h
+
+    def asr_time(factor, t):
+        decl = _sun_position(jd + t)[0]
+        angle = -np.arctan(1 / (factor + np.tan(np.abs(lat - decl))))
+        return sun_angle_time(angle, t)
+
+    bomdod = sun_angle_time(np.radians(BOMDOD_BURCHAGI), 5 / 24, ccw=True)
+    quyosh = sun_angle_time(np.radians(UFQ_BURCHAGI), 6 / 24, ccw=True)
+    peshin = mid_day(12 / 24)
+    asr = asr_time(ASR_SOYA, 13 / 24)
+    shom = sun_angle_time(np.radians(UFQ_BURCHAGI), 18 / 24)
+    xufton = sun_angle_time(np.radians(XUFTON_BURCHAGI), 18 / 24)
+
+    vaqtlar = np.stack([bomdod, quyosh, peshin, asr, shom, xufton], axis=-1)
+    vaqtlar += (TZ_SOAT - lon / 15)[..., None]
+
+    # Yuqori kengliklar uchun (angle based) tuzatish
+    tun = _fix(vaqtlar[..., 1] - vaqtlar[..., 4], 24)
+    ulush = BOMDOD_BURCHAGI / 60 * tun
+    vaqtlar[..., 0] = np.where(_fix(vaqtlar[..., 1] - vaqtlar[..., 0], 24) > ulush,
+                               vaqtlar[..., 1] - ulush, vaqtlar[..., 0])
+    ulush = XUFTON_BURCHAGI / 60 * tun
+    vaqtlar[..., 5] = np.where(_fix(vaqtlar[..., 5] - vaqtlar[..., 4], 24) > ulush,
+                               vaqtlar[..., 4] + ulush, vaqtlar[..., 5])
+
+    daqiqalar = np.floor(_fix(vaqtlar + 0.5 / 60, 24) * 60)
+    return daqiqalar.astype(np.int16)
+
+
+def timetable_path(yil: int) -> str:
+    return os.path.join(DATA_DIR, f"timetable_{yil}.npy")
+
+
+def build_timetable(yil: int) -> str:
+    """Yillik jadvalni hisoblab faylga yozish (atomar)"""
+    path = timetable_path(yil)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    boshlanish = time.perf_counter()
+    jadval = compute_year(yil)
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, jadval)
+    os.replace(tmp, path)
+
+    logger.info("%d yil jadvali tayyor: %s (%.1f ms)", yil, path, (time.perf_counter() - boshlanish) * 1000)
+    return path
+
+
+def load_timetable(yil: int) -> np.ndarray:
+    """Jadvalni memory-map orqali ochish (yo'q bo'lsa yaratish)"""
+    jadval = _jadvallar.get(yil)
+    if jadval is None:
+        path = timetable_path(yil)
+        if not os.path.exists(path):
+            build_timetable(yil)
+        jadval = np.load(path, mmap_mode="r")
+        _jadvallar[yil] = jadval
+    return jadval
+
+
+def get_vaqtlar(api_nom: str, sana: date) -> tuple:
+    """Shahar va sana bo'yicha 6 ta vaqt ('HH:MM') - jadvaldan O(1)"""
+    qator = load_timetable(sana.year)[sana.timetuple().tm_yday - 1, _SHAHAR_INDEX[api_nom]]
+    return tuple(SOAT_MATNLARI[m] for m in qator.tolist())
+
+
+if __name__ == "__main__":
+    # Oflayn yig'ish: python -m utils.timetable 2026 2027
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    for arg in sys.argv[1:] or [str(date.today().year)]:
+        build_timetable(int(arg))
@@ -0,0 +1,68 @@
+import logging
+from datetime import date, datetime, time, timedelta
+
+from utils.calendar_ingest import load_day
+from utils.prayer_calc import TOSHKENT_TZ, bugun, get_kun_malumoti
+from utils.timetable import NAMOZLAR, get_vaqtlar
+from utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# (shahar, sana) -> (vaqtlar lug'ati, amal qilish muddati)
+_kesh = {}
+
+STATS = {"hit": 0, "miss": 0}
+
+# Bir xil (shahar, sana) uchun bir vaqtdagi yuklashlarni birlashtirish
+_flight = SingleFlight("timings")
+
+
+def _muddat(sana: date) -> datetime:
+    """Sana tugaydigan payt - Toshkent bo'yicha keyingi yarim tun"""
+    return datetime.combine(sana + timedelta(days=1), time(0), tzinfo=TOSHKENT_TZ)
+
+
+async def _load(api_nom: str, sana: date) -> dict:
+    # Avval saqlangan Aladhan kalendari, bo'lmasa - mahalliy jadval
+    kun = load_day(api_nom, sana)
+    if kun is not None:
+        return kun
+    vaqtlar = dict(zip(NAMOZLAR, get_vaqtlar(api_nom, sana)))
+    return {**get_kun_malumoti(sana), **vaqtlar}
+
+
+async def get_timings(api_nom: str, sana: date = None) -> dict:
+    """
+    Shahar va sana uchun vaqtlar (namoz va roza funksiyalari uchun umumiy).
+    Natija keshlanadi va Toshkent yarim tunida eskiradi.
+    """
+    sana = sana or bugun()
+    kalit = (api_nom, sana)
+
+    yozuv = _kesh.get(kalit)
+    if yozuv and datetime.now(TOSHKENT_TZ) < yozuv[1]:
+        STATS["hit"] += 1
+        return yozuv[0]
+
+    STATS["miss"] += 1
+    natija = await _flight.do(kalit, lambda: _load(api_nom, sana))
+    purge_expired()
+    _kesh[kalit] = (natija, _muddat(sana))
+    return natija
+
+
+def purge_expired():
+    """Eskirgan yozuvlarni o'chirish"""
+    hozir = datetime.now(TOSHKENT_TZ)
+    for kalit in [k for k, (_, muddat) in _kesh.items() if muddat <= hozir]:
+        del _kesh[kalit]
+
+
+def get_stats() -> dict:
+    jami = STATS["hit"] + STATS["miss"]
+    return {
+        **STATS,
+        "size": len(_kesh),
+        "hit_ratio": round(STATS["hit"] / jami, 3) if jami else 0.0,
+        "singleflight": _flight.get_stats()
+    }
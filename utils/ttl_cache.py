@@ -0,0 +1,129 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """LRU bo'yicha cheklangan, yozuvlari TTL dan keyin eskiradigan kesh"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # kalit -> (muddat, qiymat)
+        self.stats = {"hit": 0, "miss": 0, "expired": 0, "evicted": 0}
+
+    def get(self, key, default=None):
+        yozuv = self._data.get(key)
+        if yozuv is None:
+            self.stats["miss"] += 1
+            return default
+        if yozuv[0] <= time.monotonic():
+            del self._data[key]
+            self.stats["expired"] += 1
+            self.stats["miss"] += 1
+            return default
+        self._data.move_to_end(key)
+        self.stats["hit"] += 1
+        return yozuv[1]
+
+    def peek(self, key, default=None):
+        """Statistika va LRU tartibiga ta'sir qilmasdan o'qish"""
+        yozuv = self._data.get(key)
+        if yozuv is None or yozuv[0] <= time.monotonic():
+            return default
+        return yozuv[1]
+
+    def set(self, key, value, ttl: float = None):
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.stats["evicted"] += 1
+
+    def __len__(self):
+        return len(self._data)
+
+    def get_stats(self) -> dict:
+        jami = self.stats["hit"] + self.stats["miss"]
+        return {
+            **self.stats,
+            "size": len(self._data),
+            "hit_ratio": round(self.stats["hit"] / jami, 3) if jami else 0.0
+        }
+
+
+class SharedTTLCache(TTLCache):
+    """
+    TTLCache + SQLite fayli: klasterdagi barcha worker jarayonlar yozuvlarni ulashadi.
+    get/peek/set - faqat xotira (event loop ni to'smaydi). Fayl bilan ishlash - thread'da:
+    load() xotirada yo'q kalitlarni bitta so'rov bilan o'qiydi, store() faylga ham yozadi.
+    Qiymatlar JSON (tuple -> list).
+    """
+
+    PRUNE_EVERY = 100  # shuncha yozuvdan keyin fayldagi eskirganlar o'chiriladi
+
+    def __init__(self, path: str, table: str, maxsize: int, ttl: float):
+        super().__init__(maxsize, ttl)
+        self.path = path
+        self.table = table
+        self._db = None  # birinchi murojaatda (thread'da) ochiladi
+        self._db_lock = threading.Lock()
+        self.stats.update({"shared": 0, "stored": 0})
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._prune()
+        return self._db
+
+    def _prune(self):
+        self._db.execute(f"DELETE FROM {self.table} WHERE expires <= ?", (time.time(),))
+        self._db.commit()
+
+    def _read(self, keys) -> list:
+        with self._db_lock:
+            belgilar = ",".join("?" * len(keys))
+            return self._conn().execute(
+                f"SELECT key, data, expires FROM {self.table} WHERE key IN ({belgilar}) AND expires > ?",
+                (*keys, time.time())
+            ).fetchall()
+
+    def _write(self, key, data: str, expires: float, prune: bool):
+        with self._db_lock:
+            db = self._conn()
+            db.execute(f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?)", (key, data, expires))
+            if prune:
+                self._prune()
+            else:
+                db.commit()
+
+    async def load(self, keys):
+        """Xotirada yo'q kalitlarni fayldan (boshqa worker yozgan) qolgan muddati bilan yuklash"""
+        yoq = [key for key in keys if TTLCache.peek(self, key) is None]
+        if not yoq:
+            return
+        hozir = time.time()
+        for key, data, expires in await asyncio.to_thread(self._read, yoq):
+            if TTLCache.peek(self, key) is None:
+                TTLCache.set(self, key, json.loads(data), expires - hozir)
+                self.stats["shared"] += 1
+
+    async def store(self, key, value):
+        """Xotiraga va faylga yozish"""
+        self.set(key, value)
+        self.stats["stored"] += 1
+        await asyncio.to_thread(
+            self._write, key, json.dumps(value), time.time() + self.ttl,
+            self.stats["stored"] % self.PRUNE_EVERY == 0
+        )
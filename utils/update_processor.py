@@ -0,0 +1,137 @@
+import asyncio
+import time
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from utils.metrics import LatencyHistogram
+
+
+class ChatOrderedProcessor(BaseUpdateProcessor):
+    """
+    Turli chatlarning update lari parallel, bitta chatniki esa kelgan tartibida bajariladi.
+
+    PTB har bir update uchun darhol task yaratadi va ular PTB semaforida
+    (max_concurrent_updates = queue_limit) kutadi - ya'ni `queue_limit` navbatni emas,
+    processor ichiga bir vaqtda kiradiganlar sonini cheklaydi. Haqiqiy navbat `pending`
+    da ko'rinadi: update process_update ga kirgan paytdan (semafordan oldin) sanaladi.
+    Haqiqatda bir vaqtda ishlaydiganlar soni - `concurrency`.
+    Chat qulfi global slotdan oldin olinadi: bitta chatning navbati boshqalar slotini band qilmaydi.
+    """
+
+    __slots__ = ("concurrency", "_running_slots", "_chat_locks", "_counts", "queue_wait", "run_time", "stats",
+                 "_room")
+
+    def __init__(self, concurrency: int, queue_limit: int):
+        super().__init__(max(queue_limit, concurrency))
+        self.concurrency = concurrency
+        self._running_slots = asyncio.BoundedSemaphore(concurrency)
+        self._chat_locks = {}  # chat -> [qulf, foydalanuvchilar soni]
+        self._counts = {"pending": 0, "admitted": 0, "waiting_chat": 0, "waiting_slot": 0, "running": 0}
+        self.queue_wait = LatencyHistogram()
+        self.run_time = LatencyHistogram()
+        self.stats = {"processed": 0, "max_pending": 0, "max_waiting_chat": 0}
+        self._room = asyncio.Event()  # update tugaganda - navbatga joy bo'shadi
+
+    @property
+    def pending(self) -> int:
+        """Qabul qilingan, lekin hali tugamagan update lar (PTB semaforida kutayotganlari ham)"""
+        return self._counts["pending"]
+
+    @staticmethod
+    def _chat_key(update):
+        if isinstance(update, Update):
+            if update.effective_chat is not None:
+                return update.effective_chat.id
+            if update.effective_user is not None:
+                return update.effective_user.id
+        return None
+
+    async def process_update(self, update, coroutine) -> None:  # type: ignore[misc]
+        # PTB da @final (faqat tip tekshiruvi uchun); bu yerda faqat PTB semaforidan oldin
+        # sanaymiz, qolgani - asl process_update (semafor + do_process_update)
+        counts = self._counts
+        counts["pending"] += 1
+        self.stats["max_pending"] = max(self.stats["max_pending"], counts["pending"])
+        try:
+            await super().process_update(update, self._timed(coroutine, time.perf_counter()))
+        finally:
+            counts["pending"] -= 1
+            self._room.set()
+
+    async def room_freed(self) -> None:
+        """Keyingi update tugashini kutish (klaster workeri navbatni shu bilan cheklaydi)"""
+        self._room.clear()
+        await self._room.wait()
+
+    async def _timed(self, coroutine, qabul: float):
+        """Navbatda kutish (kirishdan bajarilish boshlanguncha) va bajarilish vaqti"""
+        boshlandi = time.perf_counter()
+        self.queue_wait.observe(boshlandi - qabul)
+        try:
+            await coroutine
+        finally:
+            self.run_time.observe(time.perf_counter() - boshlandi)
+
+    async def do_process_update(self, update, coroutine) -> None:
+        counts = self._counts
+        counts["admitted"] += 1
+
+        key = self._chat_key(update)
+        yozuv = None
+        if key is not None:
+            yozuv = self._chat_locks.get(key)
+            if yozuv is None:
+                yozuv = self._chat_locks[key] = [asyncio.Lock(), 0]
+            yozuv[1] += 1
+
+        olindi = False
+        try:
+            if yozuv is not None:
+                counts["waiting_chat"] += 1
+                self.stats["max_waiting_chat"] = max(self.stats["max_waiting_chat"], counts["waiting_chat"])
+                try:
+                    await yozuv[0].acquire()
+                    olindi = True
+                finally:
+                    counts["waiting_chat"] -= 1
+
+            counts["waiting_slot"] += 1
+            try:
+                await self._running_slots.acquire()
+            finally:
+                counts["waiting_slot"] -= 1
+
+            counts["running"] += 1
+            try:
+                await coroutine
+            finally:
+                counts["running"] -= 1
+                self._running_slots.release()
+                self.stats["processed"] += 1
+        finally:
+            if olindi:
+                yozuv[0].release()
+            counts["admitted"] -= 1
+            if yozuv is not None:
+                yozuv[1] -= 1
+                if not yozuv[1]:
+                    del self._chat_locks[key]
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            **self._counts,
+            "concurrency": self.concurrency,
+            "queue_limit": self.max_concurrent_updates,
+            "waiting_admission": self._counts["pending"] - self._counts["admitted"],
+            "chats_active": len(self._chat_locks),
+            "queue_wait": self.queue_wait.snapshot(),
+            "run_time": self.run_time.snapshot()
+        }
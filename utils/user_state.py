@@ -0,0 +1,126 @@
+import logging
+import sys
+import time
+from copy import deepcopy
+
+from config import SESSION_TTL
+
+logger = logging.getLogger(__name__)
+
+_YOQ = object()  # qiymat berilmagan maydon (slot bo'sh qoladi)
+
+
+class UserState:
+    """
+    Foydalanuvchi holati: aniq maydonlar, __slots__ bilan (har biriga dict ochilmaydi).
+    Handlerlar uchun dict kabi ishlaydi: get / [] / setdefault / pop.
+    Katta natijalar (masjidlar) bu yerda emas - umumiy keshda, bu yerda faqat kaliti.
+    """
+
+    MAYDONLAR = (
+        'language',
+        'waiting_for_image',
+        'waiting_for_location',
+        'mosque_ref',
+        'pdf_pages',
+        'pdf_bytes',
+        'pdf_scan',
+        'pdf_status_msg',
+        'pdf_building',
+    )
+
+    __slots__ = MAYDONLAR + ('last_seen',)
+
+    def __init__(self):
+        self.last_seen = time.monotonic()
+
+    def touch(self):
+        self.last_seen = time.monotonic()
+
+    def _check(self, key):
+        if key not in self.MAYDONLAR:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        value = getattr(self, key, _YOQ) if key in self.MAYDONLAR else _YOQ
+        return default if value is _YOQ else value
+
+    def __getitem__(self, key):
+        value = self.get(key, _YOQ)
+        if value is _YOQ:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._check(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return self.get(key, _YOQ) is not _YOQ
+
+    def setdefault(self, key, default=None):
+        self._check(key)
+        value = getattr(self, key, _YOQ)
+        if value is _YOQ:
+            setattr(self, key, default)
+            return default
+        return value
+
+    def pop(self, key, default=None):
+        value = self.get(key, _YOQ)
+        if value is _YOQ:
+            return default
+        delattr(self, key)
+        return value
+
+    def items(self):
+        """Berilgan maydonlar (persistence uchun)"""
+        return [(key, getattr(self, key)) for key in self.MAYDONLAR if hasattr(self, key)]
+
+    def __len__(self):
+        return len(self.items())
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        return f"UserState({dict(self.items())})"
+
+    def nbytes(self) -> int:
+        """Taxminiy xotira (obyekt + ichidagi konteynerlar)"""
+        hajm = sys.getsizeof(self)
+        for _, value in self.items():
+            if isinstance(value, (list, dict, str)):
+                hajm += sys.getsizeof(value)
+                if isinstance(value, list):
+                    hajm += sum(sys.getsizeof(v) for v in value)
+        return hajm
+
+
+def session_stats(user_data) -> dict:
+    """Xotiradagi sessiyalar soni va foydalanuvchi boshiga o'rtacha xotira"""
+    holatlar = [s for s in user_data.values() if isinstance(s, UserState)]
+    jami = sum(s.nbytes() for s in holatlar)
+    return {
+        "users_in_memory": len(holatlar),
+        "bytes_total": jami,
+        "bytes_per_user": round(jami / len(holatlar), 1) if holatlar else 0.0
+    }
+
+
+async def evict_idle_sessions(context):
+    """JobQueue: SESSION_TTL dan beri faol bo'lmagan foydalanuvchilarni xotiradan chiqarish"""
+    app = context.application
+    persistence = app.persistence
+    chegara = time.monotonic() - SESSION_TTL
+
+    eskilar = [
+        user_id for user_id, state in app.user_data.items()
+        if isinstance(state, UserState) and state.last_seen < chegara and not state.get('pdf_building')
+    ]
+    for user_id in eskilar:
+        if persistence is not None and hasattr(persistence, 'evict_user_data'):
+            await persistence.evict_user_data(user_id, deepcopy(app.user_data[user_id]))
+        app.drop_user_data(user_id)
+    if eskilar:
+        logger.info("🧹 %d ta faol bo'lmagan sessiya xotiradan chiqarildi", len(eskilar))
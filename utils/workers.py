@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+
+class PoolBusy(Exception):
+    """Navbat to'lgan - yangi ish qabul qilinmaydi"""
+
+
+class WorkerPool:
+    """
+    CPU-og'ir ishlar (Pillow) uchun cheklangan thread pool, foydalanuvchilar o'rtasida adolatli.
+    Pillow dekodlash/kodlash paytida GIL ni bo'shatadi, shuning uchun threadlar yetarli.
+
+    - bir vaqtda ko'pi bilan `workers` ta ish (global), har foydalanuvchidan `per_user` ta;
+    - navbat umumiy `queue_limit` va foydalanuvchi boshiga `user_limit` bilan cheklangan;
+    - bo'shagan worker navbatdagi foydalanuvchilarga navbat bilan (round-robin) beriladi.
+    """
+
+    def __init__(self, name: str, workers: int, queue_limit: int, per_user: int = 1, user_limit: int = 2):
+        self.name = name
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.per_user = per_user
+        self.user_limit = user_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._queues = OrderedDict()  # foydalanuvchi -> navbatdagi ishlar (Future) - round-robin tartibida
+        self._active = {}  # foydalanuvchi -> bajarilayotgan ishlar soni
+        self._pending = {}  # foydalanuvchi -> navbatdagi + bajarilayotgan
+        self._queued = 0
+        self._running = 0
+        self.queue_wait = LatencyHistogram()
+        self.run_time = LatencyHistogram()
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "rejected_user": 0}
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def is_full(self, user_id=None) -> bool:
+        """Yangi ish qabul qilinmaydimi (umumiy navbat yoki foydalanuvchi limiti)"""
+        if user_id is not None and self._pending.get(user_id, 0) >= self.user_limit:
+            return True
+        return self._running >= self.workers and self._queued >= self.queue_limit
+
+    def _dispatch(self):
+        """Bo'sh workerlarni navbatdagi foydalanuvchilarga navbat bilan berish"""
+        while self._running < self.workers:
+            for user_id in self._queues:
+                if self._active.get(user_id, 0) < self.per_user:
+                    break
+            else:
+                return
+            navbat = self._queues.pop(user_id)
+            turn = navbat.popleft()
+            if navbat:
+                self._queues[user_id] = navbat  # oxiriga - keyingi safar boshqalardan keyin
+            self._queued -= 1
+            if turn.done():
+                # Kutuvchi bekor qilingan, lekin uning except bloki hali ishlamagan
+                continue
+            self._running += 1
+            self._active[user_id] = self._active.get(user_id, 0) + 1
+            turn.set_result(None)
+
+    def _release(self, user_id):
+        self._running -= 1
+        self._active[user_id] -= 1
+        if not self._active[user_id]:
+            del self._active[user_id]
+        self._dispatch()
+
+    def _forget(self, user_id):
+        self._pending[user_id] -= 1
+        if not self._pending[user_id]:
+            del self._pending[user_id]
+
+    def _finish(self, user_id):
+        self._release(user_id)
+        self._forget(user_id)
+
+    async def run(self, user_id, fn, *args):
+        """fn(*args) ni pool'da bajarish; limitdan oshsa PoolBusy"""
+        if self._pending.get(user_id, 0) >= self.user_limit:
+            self.stats["rejected_user"] += 1
+            raise PoolBusy(self.name)
+        if self.is_full():
+            self.stats["rejected"] += 1
+            raise PoolBusy(self.name)
+
+        self._pending[user_id] = self._pending.get(user_id, 0) + 1
+        self.stats["submitted"] += 1
+        yuborildi = time.perf_counter()
+
+        turn = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(user_id, deque()).append(turn)
+        self._queued += 1
+        self._dispatch()
+
+        try:
+            await turn
+        except asyncio.CancelledError:
+            if turn.cancelled():
+                # Navbatdan chiqib ketish
+                navbat = self._queues.get(user_id)
+                if navbat is not None and turn in navbat:
+                    navbat.remove(turn)
+                    self._queued -= 1
+                    if not navbat:
+                        del self._queues[user_id]
+            else:
+                self._release(user_id)
+            self._forget(user_id)
+            raise
+
+        def job():
+            boshlandi = time.perf_counter()
+            try:
+                return True, fn(*args), boshlandi, time.perf_counter()
+            except Exception as e:
+                return False, e, boshlandi, time.perf_counter()
+
+        try:
+            bajarilmoqda = asyncio.get_running_loop().run_in_executor(self._executor, job)
+        except Exception:
+            self._finish(user_id)  # pool yopilgan
+            raise
+        try:
+            ok, natija, boshlandi, tugadi = await asyncio.shield(bajarilmoqda)
+        except asyncio.CancelledError:
+            # Threaddagi ishni to'xtatib bo'lmaydi - slot u tugagandagina bo'shaydi
+            bajarilmoqda.add_done_callback(lambda _: self._finish(user_id))
+            raise
+        self._finish(user_id)
+
+        self.queue_wait.observe(boshlandi - yuborildi)
+        self.run_time.observe(tugadi - boshlandi)
+        if not ok:
+            self.stats["failed"] += 1
+            raise natija
+        self.stats["completed"] += 1
+        return natija
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "workers": self.workers,
+            "per_user": self.per_user,
+            "queue_limit": self.queue_limit,
+            "user_limit": self.user_limit,
+            "running": self._running,
+            "queued": self._queued,
+            "users_waiting": len(self._queues),
+            "queue_wait": self.queue_wait.snapshot(),
+            "run_time": self.run_time.snapshot()
+        }